@@ -3,79 +3,335 @@ from pathlib import Path
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from api_clients.api_client_bitunix import ApiBitunix
+from api_clients.response_cache import BarBoundaryCache, DEFAULT_CACHE_DIR
 from utils.storage_manager import StorageManager
+from utils.rate_limiter import RateLimiter
+from utils.async_writer import AsyncWriter
+from utils.constants import interval_to_minutes, timeframe_label
+from data_processing.resampler import build_timeframes, validate_resampled
 
+# Define the list of symbols and timeframes
+# Todo - fix hardcoding
+symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'ARBUSDT']
+interval_timeframes = ['15', '30', '60', '240']  # Timeframes in minutes
 
-def main():
-    # Define the list of symbols and timeframes 
-    # Todo - fix hardcoding
-    symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'ARBUSDT']
-    interval_timeframes = ['15', '30', '60', '240']  # Timeframes in minutes
+# Concurrency defaults - one worker per request in flight, shared token bucket across all workers
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 10
 
-    # Initialize the API client and StorageManager
-    bitunix_api = ApiBitunix()
-    storage_manager = StorageManager()
+#CSV On/Off Switch - CSV is an opt-in export (--csv), Parquet is always written
+CSV_SWITCH = False #True = On, False = Off.
+
+# Background writer defaults, see utils/async_writer.py
+WRITER_WORKERS = 2
+PARQUET_COMPRESSION = 'zstd'
+
+
+def fetch_kline_frame(bitunix_api, symbol, interval, rate_limiter=None, start_time=None):
+    """
+    Fetches and cleans the Kline data for one symbol/interval.
+
+    Args:
+        bitunix_api (ApiBitunix): The API client.
+        symbol (str): The trading symbol, e.g. 'BTCUSDT'
+        interval (str): The interval in minutes, e.g. '15'
+        rate_limiter (RateLimiter): Optional shared limiter, acquired before the request.
+        start_time (int): Optional epoch ms, only ask the API for bars from here on.
+
+    Returns:
+        DataFrame: Typed bars sorted by ascending ts, or None if the fetch failed.
+    """
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+
+    # get_kline_data already returns typed columns, sorted ascending, with the bad 1st row removed
+    # df has columns: ['symbol', 'open', 'high', 'low', 'close', 'volume', 'ts']
+    if start_time is None:
+        return bitunix_api.get_kline_data(symbol=symbol, interval=interval)
+    return bitunix_api.get_kline_data(symbol=symbol, interval=interval, start_time=start_time)
+
+
+def save_kline_frame(storage_manager, df, symbol, interval, date_type='Date', csv_switch=CSV_SWITCH, writer=None):
+    """
+    Saves one symbol/interval frame as Parquet (and CSV if switched on).
+
+    With a writer the frame is queued and written in the background; the returned
+    path is where it will land once writer.flush() returns.
+
+    Args:
+        storage_manager (StorageManager): The storage manager.
+        df (DataFrame): The cleaned Kline data.
+        symbol (str): The trading symbol.
+        interval (str): The interval in minutes.
+        date_type (str): 'Date' or 'Historical' folder, or 'Dataset' for the
+                         partitioned symbol=/timeframe=/date= layout
+        csv_switch (bool): Also write a CSV copy (not for 'Dataset'). Ignored with a
+                           writer, whose formats decide.
+        writer (AsyncWriter): Optional background writer.
+
+    Returns:
+        Path: The Parquet file path (the last partition written for 'Dataset', or the
+              series' dataset folder when the write is queued on a writer).
+    """
+    if date_type == 'Dataset' and writer is not None:
+        writer.submit(storage_manager.write_partitioned, df, symbol, timeframe_label(interval),
+                      key=f'{symbol}/{interval}')
+        return storage_manager.get_dataset_path(symbol, timeframe_label(interval))
+    if date_type == 'Dataset':
+        written = storage_manager.write_partitioned(df, symbol, timeframe_label(interval))
+        print(f'Data saved to {len(written)} partitions under {storage_manager.get_dataset_path(symbol, timeframe_label(interval))}')
+        return written[-1] if written else None
+
+    # Get the storage path using StorageManager
+    path = storage_manager.get_kline_path(
+        date_type=date_type,
+        symbol=symbol,
+        timeframe=f'{interval}m'  # Append 'm' to indicate minutes
+    )
 
-    # Define the date type [todo- ALWAYS TILL WE HAVE APPENDABLE DBs (ServerSide Feature)]
-    date_type = 'Date'
+    if writer is not None:
+        return writer.save(df, f'{symbol}_{interval}m', path).get('parquet')
 
-    # Loop over each symbol and timeframe
+    # Save the DataFrame as a Parquet file (catalogued by the StorageManager)
+    file_path = storage_manager.save_parquet(df, f'{symbol}_{interval}m.parquet', path)
+    print(f'Data saved to {file_path}')
+
+    if csv_switch:
+        storage_manager.save_dataframe(df, f'{symbol}_{interval}m.csv', path)
+        print(f'Data saved to {path / f"{symbol}_{interval}m.csv"} as CSV')
+
+    return file_path
+
+
+def run_sequential(bitunix_api, storage_manager, date_type='Date', writer=None):
+    """
+    Original one-request-at-a-time loop. Wall time is the sum of every round trip
+    (plus every write, unless a background writer is passed).
+    """
     for symbol in symbols:
         for interval in interval_timeframes:
             print(f'Fetching data for {symbol} with interval {interval} minutes.')
 
             # Fetch the Kline data
             try:
-                df = bitunix_api.get_kline_data(symbol=symbol, interval=interval)
+                df = fetch_kline_frame(bitunix_api, symbol, interval)
             except Exception as e:
                 print(f'Error fetching data for {symbol} at interval {interval}: {e}')
                 continue
+            if df is None:
+                print(f'No data returned for {symbol} at interval {interval}')
+                continue
+
+            save_kline_frame(storage_manager, df, symbol, interval, date_type=date_type, writer=writer)
+
 
-            # Convert 'ts' column to datetime
-            df['ts'] = pd.to_datetime(df['ts'])
-            df['close'] = pd.to_numeric(df['close'])
-            
-            ###REMOVE 1st Row - has bad data in it
-            if len(df) > 1:
-                df = df.drop(df.index[0])
-                logging.info(f"Removed the second row for {symbol} {interval}")
+def run_concurrent(bitunix_api, storage_manager, date_type='Date', max_workers=MAX_WORKERS,
+                   requests_per_second=REQUESTS_PER_SECOND, writer=None):
+    """
+    Fans every symbol x interval request out over a bounded thread pool.
 
-            # Sort time to be Ascending
+    All workers share one RateLimiter so the pool never goes over the API limit,
+    and each result is written to storage as soon as its request finishes
+    (writes happen on this thread, or are queued on the writer, so the fetch
+    workers never wait on disk).
 
-            df = df.sort_values(by='ts', ascending=True).reset_index(drop=True)
-            logging.info(f"Sorted by Ascending for {symbol} {interval}")
+    Args:
+        bitunix_api (ApiBitunix): The API client.
+        storage_manager (StorageManager): The storage manager.
+        date_type (str): 'Date' or 'Historical' folder
+        max_workers (int): Max requests in flight at once.
+        requests_per_second (float): Shared rate limit across all workers.
+        writer (AsyncWriter): Optional background writer, flush it before reading the files.
+
+    Returns:
+        dict: {(symbol, interval): Path or None} for every job.
+    """
+    rate_limiter = RateLimiter(rate=requests_per_second, burst=max_workers)
+    jobs = [(s, i) for s in symbols for i in interval_timeframes]
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_kline_frame, bitunix_api, symbol, interval, rate_limiter): (symbol, interval)
+            for symbol, interval in jobs
+        }
+        for future in as_completed(futures):
+            symbol, interval = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f'Error fetching data for {symbol} at interval {interval}: {e}')
+                results[(symbol, interval)] = None
+                continue
+            if df is None:
+                print(f'No data returned for {symbol} at interval {interval}')
+                results[(symbol, interval)] = None
+                continue
 
-            # (Optional) Perform additional data manipulation here
-            # df has columns: ['symbol', 'open', 'high', 'low', 'close', 'volume', 'ts']
+            results[(symbol, interval)] = save_kline_frame(storage_manager, df, symbol, interval, date_type=date_type,
+                                                           writer=writer)
 
+    return results
 
-            # Get the storage path using StorageManager
-            path = storage_manager.get_kline_path(
-                date_type=date_type,
-                symbol=symbol,
-                timeframe=f'{interval}m'  # Append 'm' to indicate minutes
-            )
 
-            # Define the filename
-            filename = f'{symbol}_{interval}m.parquet'
+def drop_open_bars(df, interval, now=None):
+    """
+    Drops bars that have not closed yet (the API includes the bar still forming).
 
-            # Save the DataFrame as a Parquet file
-            file_path = path / filename
-            df.to_parquet(file_path, index=False)
-            print(f'Data saved to {file_path}')
+    Args:
+        df (DataFrame): Bars with a UTC 'ts' column (bar open time).
+        interval (str): The interval code.
+        now (Timestamp): Current time, defaults to now in UTC.
 
+    Returns:
+        DataFrame: Only the closed bars.
+    """
+    now = now if now is not None else pd.Timestamp.now(tz='UTC')
+    bar_length = pd.Timedelta(minutes=interval_to_minutes(interval))
+    return df[df['ts'] + bar_length <= now]
 
-            #CSV On/Off Switch
-            csv_switch = True #True = On, False = Off.
-            if csv_switch:
-                filename = f'{symbol}_{interval}m.csv'
 
-                file_path = path / filename
-                df.to_csv(file_path, index=False)
-                print(f'Data saved to {file_path} as CSV')
+def fetch_new_bars(bitunix_api, storage_manager, symbol, interval, rate_limiter=None):
+    """
+    Fetches the closed bars newer than the stored watermark for one series.
+
+    Returns:
+        DataFrame: New closed bars (may be empty), or None if the fetch failed.
+    """
+    watermark = storage_manager.get_watermark(symbol, timeframe_label(interval))
+    start_time = None if watermark is None else watermark.value // 1_000_000 + 1
+
+    df = fetch_kline_frame(bitunix_api, symbol, interval, rate_limiter, start_time=start_time)
+    if df is None:
+        return None
+
+    df = drop_open_bars(df, interval)
+    if watermark is not None:
+        df = df[df['ts'] > watermark]
+    return df
+
+
+def run_incremental(bitunix_api, storage_manager, max_workers=MAX_WORKERS,
+                    requests_per_second=REQUESTS_PER_SECOND, derive=False, validate=False):
+    """
+    Appends only the bars newer than each series' watermark to its Historical dataset.
+
+    Each run writes just the new bars, so disk I/O grows with new data instead of
+    with stored history. The append drops anything at or before the watermark,
+    so re-running is safe.
+
+    With derive=True only the 1m series is fetched and every timeframe in
+    interval_timeframes is resampled from the stored 1m history, one API call
+    per symbol instead of one per symbol x timeframe.
+
+    Args:
+        derive (bool): Fetch 1m only and build the higher timeframes locally.
+        validate (bool): With derive, also fetch each higher timeframe once and log
+                         how the derived bars compare.
+
+    Returns:
+        dict: {(symbol, interval): number of bars appended, or None if the fetch failed}
+    """
+    rate_limiter = RateLimiter(rate=requests_per_second, burst=max_workers)
+    fetch_intervals = ['1'] if derive else interval_timeframes
+    jobs = [(s, i) for s in symbols for i in fetch_intervals]
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_new_bars, bitunix_api, storage_manager, symbol, interval, rate_limiter): (symbol, interval)
+            for symbol, interval in jobs
+        }
+        for future in as_completed(futures):
+            symbol, interval = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f'Error fetching data for {symbol} at interval {interval}: {e}')
+                results[(symbol, interval)] = None
+                continue
+            if df is None:
+                print(f'No data returned for {symbol} at interval {interval}')
+                results[(symbol, interval)] = None
+                continue
+
+            appended = storage_manager.append_historical(df, symbol, timeframe_label(interval))
+            print(f'Appended {appended} new bars for {symbol} {interval}m')
+            results[(symbol, interval)] = appended
+
+    if derive:
+        for symbol in symbols:
+            derived = build_timeframes(storage_manager, symbol, interval_timeframes, source_interval='1')
+            for interval, bars in derived.items():
+                print(f'Derived {len(bars)} new bars for {symbol} {interval}m from 1m')
+                results[(symbol, interval)] = len(bars)
+                if validate and not bars.empty:
+                    fetched = fetch_kline_frame(bitunix_api, symbol, interval, rate_limiter)
+                    if fetched is not None:
+                        report = validate_resampled(bars, fetched)
+                        level = logging.INFO if report['ok'] else logging.WARNING
+                        logging.log(level, f'Derived vs fetched {symbol} {interval}: {report}')
+
+    return results
+
+
+def main(concurrent=True, max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND, incremental=False,
+         derive=False, validate=False, cache=False, dataset=False, csv=CSV_SWITCH, compression=PARQUET_COMPRESSION,
+         compression_level=None, row_group_size=None):
+    # Initialize the API client and StorageManager
+    # cache=True shares responses with other scripts run inside the same bar
+    bitunix_api = ApiBitunix(cache=BarBoundaryCache(cache_dir=DEFAULT_CACHE_DIR) if cache else None)
+    storage_manager = StorageManager()
+
+    if incremental or derive:
+        run_incremental(bitunix_api, storage_manager, max_workers=max_workers,
+                        requests_per_second=requests_per_second, derive=derive, validate=validate)
+        return
+
+    # Define the date type - dated snapshots, use --incremental for the appendable Historical dataset
+    date_type = 'Dataset' if dataset else 'Date'
+
+    # Writes run in the background while the next requests are in flight
+    formats = ('parquet', 'csv') if csv else ('parquet',)
+    with AsyncWriter(storage_manager, max_workers=WRITER_WORKERS, formats=formats, compression=compression,
+                     compression_level=compression_level, row_group_size=row_group_size) as writer:
+        if concurrent:
+            run_concurrent(bitunix_api, storage_manager, date_type=date_type, max_workers=max_workers,
+                           requests_per_second=requests_per_second, writer=writer)
+        else:
+            run_sequential(bitunix_api, storage_manager, date_type=date_type, writer=writer)
+        writer.flush()
+        print(f'Writer stats: {writer.stats()}')
+
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Fetch and save Kline data for every symbol/timeframe.')
+    parser.add_argument('--sequential', action='store_true', help='Fetch one request at a time')
+    parser.add_argument('--max-workers', type=int, default=MAX_WORKERS, help='Max requests in flight')
+    parser.add_argument('--rps', type=float, default=REQUESTS_PER_SECOND, help='Shared requests per second limit')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Append only bars newer than the stored watermark to Historical')
+    parser.add_argument('--derive', action='store_true',
+                        help='Incremental, but fetch 1m only and resample the other timeframes locally')
+    parser.add_argument('--validate', action='store_true',
+                        help='With --derive, compare derived bars against one fetch of each timeframe')
+    parser.add_argument('--cache', action='store_true',
+                        help='Serve repeat requests within the same bar from the response cache')
+    parser.add_argument('--dataset', action='store_true',
+                        help='Write snapshots into the partitioned symbol=/timeframe=/date= dataset')
+    parser.add_argument('--csv', action='store_true', default=CSV_SWITCH, help='Also export a CSV copy of each snapshot')
+    parser.add_argument('--compression', default=PARQUET_COMPRESSION, choices=['zstd', 'snappy', 'none'],
+                        help='Parquet codec')
+    parser.add_argument('--compression-level', type=int, default=None, help='Codec level, e.g. zstd 1-22')
+    parser.add_argument('--row-group-size', type=int, default=None, help='Rows per Parquet row group')
+    args = parser.parse_args()
+
+    main(concurrent=not args.sequential, max_workers=args.max_workers, requests_per_second=args.rps,
+         incremental=args.incremental, derive=args.derive, validate=args.validate, cache=args.cache,
+         dataset=args.dataset, csv=args.csv, compression=None if args.compression == 'none' else args.compression,
+         compression_level=args.compression_level, row_group_size=args.row_group_size)
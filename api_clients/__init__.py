@@ -1 +1,2 @@
-from .api_client_bitunix import ApiBitunix
\ No newline at end of file
+from .api_client_bitunix import ApiBitunix
+from .response_cache import BarBoundaryCache
\ No newline at end of file
@@ -1,11 +1,57 @@
 from .base_api_client import BaseApiClient
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
-import time, json, hashlib, hmac, random, string, os, logging
+import time, json, hashlib, hmac, random, string, os, logging, threading
+from collections import deque
 from pathlib import Path
 import datetime
 
 
+KLINE_PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def parse_kline_payload(rows, price_dtype=np.float64, drop_first=True):
+    """
+    Decodes the raw /kline 'data' list straight into typed columns.
+
+    Prices go into float arrays, 'ts' into datetime64[ms, UTC] and 'symbol' into
+    a categorical, then every column is put in ascending ts order in one take.
+    Nothing is built as object/string columns first, so callers don't need any
+    pd.to_numeric / pd.to_datetime patching afterwards.
+
+    Args:
+        rows (list[dict]): The 'data' list from the API response.
+        price_dtype: np.float64 (default) or np.float32 for the OHLCV columns.
+        drop_first (bool): Drop the first row of the payload (known stale/bad bar).
+
+    Returns:
+        DataFrame: Columns ['symbol', 'open', 'high', 'low', 'close', 'volume', 'ts'], sorted by ts.
+    """
+    if drop_first and len(rows) > 1:
+        rows = rows[1:]
+
+    raw_ts = [row['ts'] for row in rows]
+    #ts comes back as ISO strings on /kline, accept epoch ms too
+    first = raw_ts[0] if raw_ts else ''
+    if isinstance(first, (int, np.integer)) or str(first).isdigit():
+        ts = np.array(raw_ts, dtype=np.int64)
+    else:
+        ts = pd.to_datetime(raw_ts, utc=True, format='ISO8601').as_unit('ms').asi8
+    order = np.argsort(ts, kind='stable')
+
+    columns = {
+        'symbol': pd.Categorical([row['symbol'] for row in rows]).take(order)
+    }
+    for column in KLINE_PRICE_COLUMNS:
+        columns[column] = np.array([row[column] for row in rows], dtype=price_dtype)[order]
+    columns['ts'] = pd.to_datetime(ts[order], unit='ms', utc=True).as_unit('ms')
+
+    return pd.DataFrame(columns, copy=False)
+
+
 class ApiBitunix(BaseApiClient):
     """
     Client for interacting with the BitUnix API
@@ -13,13 +59,25 @@ class ApiBitunix(BaseApiClient):
 
     BASE_URL = "https://openapi.bitunix.com/api/spot/v1/market"
 
-    def __init__(self, api_key=None, secret_key=None):
+    #Statuses worth retrying - throttled or the server fell over
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, api_key=None, secret_key=None, pool_size=10, max_retries=3,
+                 backoff_factor=0.5, backoff_jitter=0.5, timeout=10, base_url=None, cache=None):
         """
         Initaliazes the BitUnix APiClient with Credentials
         
         Args:
             api_key (str): Your BitUnix API key.
             secret_key (str): our Bitunix secret key.
+            pool_size (int): Max keep-alive connections held open to the API host.
+            max_retries (int): Retries on connection errors and 429/5xx responses.
+            backoff_factor (float): Base for exponential backoff between retries (seconds).
+            backoff_jitter (float): Max random seconds added to each backoff.
+            timeout (float): Per-request timeout in seconds.
+            base_url (str): Override BASE_URL, e.g. to point at a MockBitunixServer.
+            cache (BarBoundaryCache): Optional response cache for get_kline_data, entries
+                                      expire when the next bar of the requested interval closes.
         """
         #New Feature 1.1
         #Adding Lists for the values of timeframe and symbol 
@@ -46,6 +104,70 @@ class ApiBitunix(BaseApiClient):
         self.storage_path = Path('storage')
         self.storage_path.mkdir(exist_ok=True)
 
+        #Keyed HMAC is built once, each request copies it and only hashes nonce + timestamp
+        self._hmac_base = hmac.new(self.secret_key.encode(), self.api_key.encode(), hashlib.sha256)
+
+        self.timeout = timeout
+        self.cache = cache
+        if base_url is not None:
+            self.BASE_URL = base_url.rstrip('/')
+        self.session = self.create_session(pool_size, max_retries, backoff_factor, backoff_jitter)
+
+        #Request counters, read them with get_stats()
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._request_count = 0
+        self._error_count = 0
+
+    def create_session(self, pool_size=10, max_retries=3, backoff_factor=0.5, backoff_jitter=0.5):
+        """
+        Creates the long-lived pooled session used for every request.
+
+        Connections are kept alive and reused across calls (and threads), so only
+        the first request to the host pays for the TCP + TLS handshake.
+
+        Args:
+            pool_size (int): Max keep-alive connections held open to the API host.
+            max_retries (int): Retries on connection errors and 429/5xx responses.
+            backoff_factor (float): Base for exponential backoff between retries (seconds).
+            backoff_jitter (float): Max random seconds added to each backoff.
+
+        Returns:
+            Session: The configured requests Session.
+        """
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=['GET'],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'api-key': self.api_key,
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        return session
+
+    def close(self):
+        """Closes the pooled session and all its connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
     def create_nonce(self, length=32):
         """Creates a random nonce"""
         return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
@@ -55,25 +177,88 @@ class ApiBitunix(BaseApiClient):
         return str(int(time.time()*1000))
     
     def create_signature(self, nonce, timestamp):
-        message = self.api_key + nonce + timestamp
-        return hmac.new(
-            self.secret_key.encode(),
-            message.encode(),
-            hashlib.sha256
-        ).hexdigest()
+        #signs api_key + nonce + timestamp, api_key is already in the base hmac
+        mac = self._hmac_base.copy()
+        mac.update((nonce + timestamp).encode())
+        return mac.hexdigest()
     
     def get_headers(self):
-        """ Constructs headers required for API requests """
+        """
+        Constructs the per-request auth headers.
+        api-key and Content-Type live on the session, nonce/timestamp must be fresh every call.
+        """
         nonce = self.create_nonce()
         timestamp = self.create_timestamp()
         signature = self.create_signature(nonce, timestamp)
         return {
-            'api-key': self.api_key,
             'nonce': nonce,
             'timestamp':timestamp,
-            'signature':signature,
-            'Content-Type':'application/json'
+            'signature':signature
         }
+
+    def _get(self, endpoint, params):
+        """
+        Sends a GET through the pooled session and records its latency.
+
+        Args:
+            endpoint (str): Path under BASE_URL, e.g. 'kline'
+            params (dict): Query parameters
+
+        Returns:
+            dict: The decoded JSON body
+        """
+        url = f'{self.BASE_URL}/{endpoint}'
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, headers=self.get_headers(), params=params, timeout=self.timeout)
+            return response.json()
+        except Exception:
+            with self._stats_lock:
+                self._error_count += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._request_count += 1
+                self._latencies.append(elapsed)
+
+    def get_stats(self):
+        """
+        Returns request latency and connection reuse counters for this client.
+
+        Returns:
+            dict: requests, errors, new_connections, reused_connections,
+                  latency_avg / latency_p50 / latency_max in seconds (last 1000 requests)
+                  and the cache hit/miss counters if a cache is attached
+        """
+        new_connections = 0
+        pool_requests = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                new_connections += pool.num_connections
+                pool_requests += pool.num_requests
+
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'requests': self._request_count,
+                'errors': self._error_count,
+                'new_connections': new_connections,
+                'reused_connections': max(0, pool_requests - new_connections),
+            }
+
+        if latencies:
+            stats['latency_avg'] = sum(latencies) / len(latencies)
+            stats['latency_p50'] = latencies[len(latencies) // 2]
+            stats['latency_max'] = latencies[-1]
+        else:
+            stats['latency_avg'] = stats['latency_p50'] = stats['latency_max'] = None
+
+        if self.cache is not None:
+            stats['cache'] = self.cache.stats()
+        return stats
     
     def get_latest_price(self, symbol):
         """
@@ -85,13 +270,10 @@ class ApiBitunix(BaseApiClient):
         Returns:
             dict: Latest price data
         """
-        url = f'{self.BASE_URL}/last_price'
-        headers = self.get_headers()
         params = {'symbol':symbol}
 
         try:
-            response = requests.get(url, headers=headers, params = params)
-            data = response.json()
+            data = self._get('last_price', params)
 
             if data['code'] == '0':
                 self.logger.info(f'Fetched latest price for {symbol}')
@@ -105,28 +287,52 @@ class ApiBitunix(BaseApiClient):
             return None
         
 
-    def get_kline_data(self, symbol, interval='1'):
+    def get_kline_data(self, symbol, interval='1', start_time=None, end_time=None, limit=None,
+                       typed=True, price_dtype=np.float64, drop_first=True):
         """
         Fetches K-Line (candlestick) data.
 
         Args:
             symbol (str): The trading pair symbol.
             interval (str): The interval for candlesticks.
+            start_time (int): Optional window start, epoch milliseconds.
+            end_time (int): Optional window end, epoch milliseconds.
+            limit (int): Optional max number of bars to return.
+            typed (bool): Parse into typed columns sorted by ascending ts (see parse_kline_payload).
+                          False returns the raw payload as string columns, in API order.
+            price_dtype: np.float64 or np.float32 for OHLCV when typed.
+            drop_first (bool): Drop the known-bad first row when typed.
 
         Returns:
             DataFrame: Pandas DataFrame containing K-Line data
         """
 
-        url = f'{self.BASE_URL}/kline'
-        headers = self.get_headers()
         params = {'symbol': symbol, 'interval': interval}
+        if start_time is not None:
+            params['startTime'] = int(start_time)
+        if end_time is not None:
+            params['endTime'] = int(end_time)
+        if limit is not None:
+            params['limit'] = int(limit)
+
+        cache_key, expires_at = None, None
+        if self.cache is not None:
+            # The host is part of the key, a shared disk cache never serves one server's bars to another
+            cache_key, expires_at = self.cache.make_key('kline', symbol, interval, base_url=self.BASE_URL,
+                                                        startTime=start_time, endTime=end_time, limit=limit)
 
         try:
-            response = requests.get(url, headers=headers, params=params)
-            data = response.json()
+            data = self.cache.get(cache_key) if cache_key is not None else None
+            if data is None:
+                data = self._get('kline', params)
+                if data['code'] == '0' and cache_key is not None:
+                    self.cache.put(cache_key, data, expires_at)
 
             if data['code'] == '0':
-                df = pd.DataFrame(data['data'])
+                if typed:
+                    df = parse_kline_payload(data['data'], price_dtype=price_dtype, drop_first=drop_first)
+                else:
+                    df = pd.DataFrame(data['data'])
                 self.logger.info(f"Fetched K-Line data for {symbol} at interval {interval}")
                 return df
             else:
@@ -204,4 +410,8 @@ if __name__ == "__main__":
     client.fetch_and_save_kline_data(symbol,interval)
 
     #Testing Fetch and save latest price to CSV
-    client.fetch_and_save_latest_price(symbol)
\ No newline at end of file
+    client.fetch_and_save_latest_price(symbol)
+
+    #Testing: connection reuse and latency counters
+    print(client.get_stats())
+    client.close()
\ No newline at end of file
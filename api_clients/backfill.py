@@ -0,0 +1,183 @@
+import os, sys
+import json
+import shutil
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api_clients.api_client_bitunix import ApiBitunix
+from utils.storage_manager import StorageManager
+from utils.rate_limiter import RateLimiter
+from utils.constants import interval_to_minutes, timeframe_label
+from utils.schema import to_epoch_ms
+
+logger = logging.getLogger(__name__)
+
+
+class KlineBackfiller:
+    """
+    Walks a time range in pages and fetches deep Kline history into the Historical tree.
+
+    Pages are aligned to a fixed grid (multiples of page_size bars since the epoch),
+    so two backfills over overlapping ranges share pages. Every finished page is
+    saved next to a checkpoint file straight away, so an interrupted backfill picks
+    up where it stopped instead of refetching completed pages.
+    """
+
+    def __init__(self, api=None, storage_manager=None, page_size=200, max_workers=4, requests_per_second=5):
+        """
+        Initializes the KlineBackfiller.
+
+        Args:
+            api (ApiBitunix): The API client (a new one is created if None).
+            storage_manager (StorageManager): Where the history is written.
+            page_size (int): Bars requested per page.
+            max_workers (int): Pages fetched in parallel.
+            requests_per_second (float): Shared rate limit across the workers.
+        """
+        self.api = api or ApiBitunix()
+        self.storage_manager = storage_manager or StorageManager()
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate=requests_per_second, burst=max_workers)
+
+    def plan_pages(self, interval, start_ms, end_ms):
+        """
+        Splits [start_ms, end_ms) into grid-aligned pages.
+
+        Returns:
+            list[tuple[int, int]]: (page_start_ms, page_end_ms) pairs.
+        """
+        step = interval_to_minutes(interval) * 60_000 * self.page_size
+        page_start = (start_ms // step) * step
+        pages = []
+        while page_start < end_ms:
+            pages.append((page_start, page_start + step))
+            page_start += step
+        return pages
+
+    def get_work_dir(self, symbol, interval):
+        """Folder holding the checkpoint and finished pages of an in-progress backfill"""
+        timeframe = timeframe_label(interval)
+        return self.storage_manager.get_kline_path(date_type='Historical', symbol=symbol, timeframe=timeframe) / '_backfill'
+
+    def load_checkpoint(self, work_dir):
+        checkpoint_path = work_dir / 'checkpoint.json'
+        if not checkpoint_path.exists():
+            return set()
+        with open(checkpoint_path) as f:
+            return set(json.load(f)['done'])
+
+    def save_checkpoint(self, work_dir, done):
+        checkpoint_path = work_dir / 'checkpoint.json'
+        tmp_path = work_dir / 'checkpoint.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'done': sorted(done)}, f)
+        os.replace(tmp_path, checkpoint_path)
+
+    def fetch_page(self, symbol, interval, page_start, page_end):
+        """
+        Fetches one page and trims it to its own window.
+
+        Returns:
+            DataFrame: Typed bars in [page_start, page_end), may be empty.
+
+        Raises:
+            RuntimeError: If the API call failed.
+        """
+        self.rate_limiter.acquire()
+        #Keep the first row, the window filter below removes it if it is the stale one
+        df = self.api.get_kline_data(symbol, interval, start_time=page_start,
+                                     end_time=page_end - 1, limit=self.page_size, drop_first=False)
+        if df is None:
+            raise RuntimeError(f'Kline request failed for {symbol} {interval} page {page_start}')
+        if df.empty:
+            return df
+
+        #Anything outside the window (including the stale first row the API sometimes sends) is dropped
+        window_start = pd.Timestamp(page_start, unit='ms', tz='UTC')
+        window_end = pd.Timestamp(page_end, unit='ms', tz='UTC')
+        return df[(df['ts'] >= window_start) & (df['ts'] < window_end)]
+
+    def backfill(self, symbol, interval, start, end):
+        """
+        Fetches every bar in [start, end) and merges it into the Historical file.
+
+        Args:
+            symbol (str): The trading symbol, e.g. 'BTCUSDT'
+            interval (str): The interval code, e.g. '15'
+            start: Range start (datetime, date string or epoch ms)
+            end: Range end (datetime, date string or epoch ms)
+
+        Returns:
+            Path: The Historical file, or None if some pages failed (rerun to resume).
+        """
+        start_ms, end_ms = to_epoch_ms(start), to_epoch_ms(end)
+        if end_ms <= start_ms:
+            raise ValueError('end must be after start')
+
+        work_dir = self.get_work_dir(symbol, interval)
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        pages = self.plan_pages(interval, start_ms, end_ms)
+        done = self.load_checkpoint(work_dir)
+        pending = [page for page in pages if page[0] not in done]
+        logger.info(f'Backfill {symbol} {interval}: {len(pages)} pages, {len(pages) - len(pending)} already done')
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_page, symbol, interval, page_start, page_end): page_start
+                for page_start, page_end in pending
+            }
+            for future in as_completed(futures):
+                page_start = futures[future]
+                try:
+                    df = future.result()
+                except Exception as e:
+                    logger.error(f'Page {page_start} for {symbol} {interval} failed: {e}')
+                    failed.append(page_start)
+                    continue
+
+                if not df.empty:
+                    df.to_parquet(work_dir / f'page_{page_start}.parquet', index=False)
+                done.add(page_start)
+                self.save_checkpoint(work_dir, done)
+
+        if failed:
+            logger.error(f'Backfill {symbol} {interval} incomplete, {len(failed)} pages failed. Rerun to resume.')
+            return None
+
+        frames = [pd.read_parquet(work_dir / f'page_{page_start}.parquet')
+                  for page_start, _ in pages if (work_dir / f'page_{page_start}.parquet').exists()]
+        if not frames:
+            logger.info(f'Backfill {symbol} {interval}: no bars in range')
+            shutil.rmtree(work_dir)
+            return None
+
+        df = pd.concat(frames, ignore_index=True)
+        window = (df['ts'] >= pd.Timestamp(start_ms, unit='ms', tz='UTC')) & \
+                 (df['ts'] < pd.Timestamp(end_ms, unit='ms', tz='UTC'))
+        df = df[window]
+
+        file_path = self.storage_manager.merge_historical(df, symbol, timeframe_label(interval))
+        shutil.rmtree(work_dir)
+        return file_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill Kline history into the Historical tree.')
+    parser.add_argument('symbol', help='e.g. BTCUSDT')
+    parser.add_argument('interval', help="e.g. '15'")
+    parser.add_argument('start', help='e.g. 2024-06-01')
+    parser.add_argument('end', help='e.g. 2024-10-01')
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--max-workers', type=int, default=4)
+    parser.add_argument('--rps', type=float, default=5)
+    args = parser.parse_args()
+
+    backfiller = KlineBackfiller(page_size=args.page_size, max_workers=args.max_workers, requests_per_second=args.rps)
+    print(backfiller.backfill(args.symbol, args.interval, args.start, args.end))
@@ -0,0 +1,219 @@
+import os, sys
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import interval_to_minutes
+from utils.rate_limiter import RateLimiter
+
+MARKET_PATH = '/api/spot/v1/market'
+
+# Rough price levels so the synthetic bars look like the real symbols
+BASE_PRICES = {'BTCUSDT': 60000.0, 'ETHUSDT': 2500.0, 'SOLUSDT': 140.0, 'SUIUSDT': 1.8, 'ARBUSDT': 0.55}
+
+
+def synthetic_price(symbol, minute):
+    """Deterministic price for a symbol at an epoch minute, so overlapping requests agree"""
+    base = BASE_PRICES.get(symbol, 100.0)
+    return base * (1 + 0.02 * math.sin(minute / 97.0) + 0.005 * math.sin(minute / 13.0))
+
+
+def synthetic_bar(symbol, bar_start_ms, minutes):
+    """Builds one bar in the same shape /kline returns (all values as strings)"""
+    first_minute = bar_start_ms // 60_000
+    prices = [synthetic_price(symbol, m) for m in range(first_minute, first_minute + minutes + 1)]
+    return {
+        'symbol': symbol,
+        'open': f'{prices[0]:.2f}',
+        'high': f'{max(prices) * 1.0005:.2f}',
+        'low': f'{min(prices) * 0.9995:.2f}',
+        'close': f'{prices[-1]:.2f}',
+        #volume adds up across bars, so coarse bars equal the sum of the fine ones
+        'volume': f'{sum(1 + (m % 7) * 0.25 for m in range(first_minute, first_minute + minutes)):.5f}',
+        'ts': datetime.fromtimestamp(bar_start_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    }
+
+
+class MockBitunixServer:
+    """
+    A localhost stand-in for the Bitunix spot market API.
+
+    Serves /kline and /last_price with the same response shape as the real
+    endpoint ({'code', 'msg', 'data'}), including the stale first row /kline
+    sends back. Latency, 5xx error rate and 429 throttling are configurable so
+    concurrency and retry behaviour can be measured without the exchange.
+
+    Usage:
+        with MockBitunixServer(latency=0.05) as server:
+            client = ApiBitunix(base_url=server.base_url)
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, latency_jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, max_rps=None, bars=200, seed=None):
+        """
+        Initializes the MockBitunixServer.
+
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind (0 picks a free one).
+            latency (float): Seconds added to every response.
+            latency_jitter (float): Max random seconds added on top of latency.
+            error_rate (float): Fraction of requests answered with HTTP 500.
+            throttle_rate (float): Fraction of requests answered with HTTP 429.
+            max_rps (float): If set, requests above this rate get HTTP 429.
+            bars (int): Default number of bars per /kline response.
+            seed (int): Seed for the error/throttle/jitter randomness.
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.limiter = RateLimiter(rate=max_rps) if max_rps else None
+        self.bars = bars
+        self.random = random.Random(seed)
+
+        self.counts = {'requests': 0, 'ok': 0, 'errors': 0, 'throttled': 0}
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}{MARKET_PATH}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _roll(self):
+        with self._lock:
+            return self.random.random(), self.random.random() * self.latency_jitter
+
+    def kline_rows(self, symbol, interval, start_time=None, end_time=None, limit=None):
+        """
+        Builds the /kline data list, newest first with a stale bar in front.
+
+        With startTime the page runs forward from startTime, otherwise it holds
+        the latest bars up to (and including) the one still forming.
+        """
+        step = interval_to_minutes(interval) * 60_000
+        limit = int(limit or self.bars)
+        now_ms = int(time.time() * 1000)
+        last = (min(int(end_time), now_ms) if end_time is not None else now_ms) // step * step
+
+        if start_time is not None:
+            first = -(-int(start_time) // step) * step
+            starts = list(range(first, last + 1, step))[:limit]
+        else:
+            starts = list(range(last - (limit - 1) * step, last + 1, step))
+
+        rows = [synthetic_bar(symbol, s, interval_to_minutes(interval)) for s in reversed(starts)]
+        if rows:
+            #the real endpoint puts an old, unrelated bar first
+            rows.insert(0, synthetic_bar(symbol, starts[0] - 1000 * step, interval_to_minutes(interval)))
+        return rows
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            #headers and body go out as separate writes, don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                server._count('requests')
+                roll, jitter = server._roll()
+                if server.latency or jitter:
+                    time.sleep(server.latency + jitter)
+
+                throttled = server.limiter is not None and not server.limiter.try_acquire()
+                if throttled or roll < server.throttle_rate:
+                    server._count('throttled')
+                    return self._send(429, {'code': '429', 'msg': 'Too many requests', 'data': None})
+                if roll < server.throttle_rate + server.error_rate:
+                    server._count('errors')
+                    return self._send(500, {'code': '500', 'msg': 'Internal server error', 'data': None})
+
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                endpoint = url.path[len(MARKET_PATH):] if url.path.startswith(MARKET_PATH) else url.path
+                symbol = params.get('symbol')
+
+                if not symbol:
+                    return self._send(200, {'code': '10001', 'msg': 'symbol is required', 'data': None})
+
+                if endpoint == '/kline':
+                    try:
+                        rows = server.kline_rows(symbol, params.get('interval', '1'), params.get('startTime'),
+                                                 params.get('endTime'), params.get('limit'))
+                    except ValueError as e:
+                        return self._send(200, {'code': '10002', 'msg': str(e), 'data': None})
+                    server._count('ok')
+                    return self._send(200, {'code': '0', 'msg': 'Success', 'data': rows})
+
+                if endpoint == '/last_price':
+                    price = synthetic_price(symbol, int(time.time() // 60))
+                    server._count('ok')
+                    return self._send(200, {'code': '0', 'msg': 'Success', 'data': f'{price:.2f}'})
+
+                return self._send(404, {'code': '404', 'msg': f'Unknown endpoint {url.path}', 'data': None})
+
+        return Handler
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Run a local mock of the Bitunix market API.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--max-rps', type=float, default=None)
+    args = parser.parse_args()
+
+    server = MockBitunixServer(port=args.port, latency=args.latency, error_rate=args.error_rate,
+                               throttle_rate=args.throttle_rate, max_rps=args.max_rps)
+    print(f'Mock Bitunix API on {server.base_url}')
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
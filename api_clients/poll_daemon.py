@@ -0,0 +1,157 @@
+import os, sys
+import time
+import heapq
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api_clients.api_client_bitunix import ApiBitunix
+from api_clients.Daily_Saver import fetch_new_bars
+from utils.storage_manager import StorageManager
+from utils.rate_limiter import RateLimiter
+from utils.constants import INTERVAL_MINUTES, next_bar_close, timeframe_label
+
+logger = logging.getLogger(__name__)
+
+
+class BarClosePoller:
+    """
+    Long-running scheduler that polls each symbol/interval right after its bar closes.
+
+    A 1m series is polled every minute, a 240m series every four hours. Intervals
+    whose closes fall on the same instant (e.g. 15m, 60m and 240m at 00:00) are
+    coalesced into one batch. A series whose previous request is still in flight
+    is skipped for that round instead of piling up behind itself. New bars are
+    appended to Historical storage and handed to on_new_bars straight away.
+    """
+
+    def __init__(self, api=None, storage_manager=None, symbols=None, intervals=None, grace_seconds=2,
+                 max_workers=8, requests_per_second=10, on_new_bars=None):
+        """
+        Initializes the BarClosePoller.
+
+        Args:
+            api (ApiBitunix): The API client.
+            storage_manager (StorageManager): Where new bars are appended.
+            symbols (list[str]): Symbols to poll (defaults to api.list_trading_symbols).
+            intervals (list[str]): Intervals to poll (defaults to api.list_time_intervals,
+                                   minus the ones without a fixed length like 'M').
+            grace_seconds (float): Wait this long after the close so the exchange has the final bar.
+            max_workers (int): Max requests in flight.
+            requests_per_second (float): Shared rate limit across the workers.
+            on_new_bars (callable): Called as on_new_bars(symbol, interval, df) with each batch of new bars.
+        """
+        self.api = api or ApiBitunix()
+        self.storage_manager = storage_manager or StorageManager()
+        self.symbols = symbols or self.api.list_trading_symbols
+        self.intervals = [str(i) for i in (intervals or self.api.list_time_intervals) if str(i) in INTERVAL_MINUTES]
+        self.grace_ms = int(grace_seconds * 1000)
+        self.on_new_bars = on_new_bars
+
+        self.rate_limiter = RateLimiter(rate=requests_per_second, burst=max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.in_flight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._schedule = []
+
+    def build_schedule(self, now_ms):
+        """Seeds the schedule with the next close of every interval"""
+        self._schedule = [(next_bar_close(interval, now_ms), interval) for interval in self.intervals]
+        heapq.heapify(self._schedule)
+
+    def pop_due(self, now_ms):
+        """
+        Pops every interval whose close (+ grace) has passed and reschedules it.
+
+        Returns:
+            list[str]: The intervals due now, coalesced into one batch.
+        """
+        due = []
+        while self._schedule and self._schedule[0][0] + self.grace_ms <= now_ms:
+            close_ms, interval = heapq.heappop(self._schedule)
+            if interval not in due:
+                due.append(interval)
+            heapq.heappush(self._schedule, (next_bar_close(interval, max(close_ms, now_ms - self.grace_ms)), interval))
+        return due
+
+    def poll_series(self, symbol, interval):
+        """
+        Fetches, stores and publishes new bars for one series.
+
+        Returns:
+            int: Bars appended (0 if nothing new or the fetch failed).
+        """
+        try:
+            df = fetch_new_bars(self.api, self.storage_manager, symbol, interval, self.rate_limiter)
+            if df is None or df.empty:
+                return 0
+            appended = self.storage_manager.append_historical(df, symbol, timeframe_label(interval))
+            if appended and self.on_new_bars is not None:
+                self.on_new_bars(symbol, interval, df)
+            return appended
+        except Exception as e:
+            logger.error(f'Polling {symbol} {interval} failed: {e}')
+            return 0
+        finally:
+            with self._lock:
+                self.in_flight.discard((symbol, interval))
+
+    def dispatch(self, intervals):
+        """
+        Submits one request per symbol for the due intervals, skipping series still in flight.
+
+        Returns:
+            list[Future]: The submitted jobs.
+        """
+        futures = []
+        for interval in intervals:
+            for symbol in self.symbols:
+                key = (symbol, interval)
+                with self._lock:
+                    if key in self.in_flight:
+                        logger.info(f'Skipping {symbol} {interval}, previous request still in flight')
+                        continue
+                    self.in_flight.add(key)
+                futures.append(self.executor.submit(self.poll_series, symbol, interval))
+        return futures
+
+    def run(self):
+        """Polls until stop() is called"""
+        self.build_schedule(int(time.time() * 1000))
+        logger.info(f'Polling {len(self.symbols)} symbols on intervals {self.intervals}')
+
+        while not self._stop.is_set():
+            now_ms = int(time.time() * 1000)
+            due = self.pop_due(now_ms)
+            if due:
+                logger.info(f'Bar close for intervals {due}')
+                self.dispatch(due)
+                continue
+
+            wait_ms = self._schedule[0][0] + self.grace_ms - now_ms
+            self._stop.wait(max(wait_ms, 0) / 1000)
+
+        self.executor.shutdown(wait=True)
+
+    def stop(self):
+        self._stop.set()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Poll Bitunix Kline data right after each bar closes.')
+    parser.add_argument('--symbols', nargs='*', default=None, help='Defaults to ApiBitunix.list_trading_symbols')
+    parser.add_argument('--intervals', nargs='*', default=None, help='Defaults to ApiBitunix.list_time_intervals')
+    parser.add_argument('--grace', type=float, default=2, help='Seconds to wait after each close')
+    parser.add_argument('--max-workers', type=int, default=8)
+    parser.add_argument('--rps', type=float, default=10)
+    args = parser.parse_args()
+
+    poller = BarClosePoller(symbols=args.symbols, intervals=args.intervals, grace_seconds=args.grace,
+                            max_workers=args.max_workers, requests_per_second=args.rps)
+    try:
+        poller.run()
+    except KeyboardInterrupt:
+        poller.stop()
@@ -0,0 +1,169 @@
+import os, sys
+import time
+import pickle
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import INTERVAL_MINUTES, next_bar_close
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path('storage') / 'cache' / 'api'
+
+
+class BarBoundaryCache:
+    """
+    Two-tier (memory LRU + on-disk) cache for API responses that expires on bar close.
+
+    Entries are keyed by (endpoint, symbol, interval, next bar close, other params such as the base URL),
+    so every request for the same series within one bar period is served from the
+    cache, and the entry dies the moment the next bar closes. The disk tier lets
+    separate scripts (main.py, Daily_Saver.py, ...) share responses within a bar.
+    """
+
+    def __init__(self, max_entries=256, cache_dir=None):
+        """
+        Initializes the BarBoundaryCache.
+
+        Args:
+            max_entries (int): Max entries held in memory (least recently used is dropped first).
+            cache_dir (str or Path): Folder for the disk tier, None to keep the cache in memory only.
+        """
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'expired': 0, 'evictions': 0}
+
+    def make_key(self, endpoint, symbol, interval, now_ms=None, **params):
+        """
+        Builds the cache key for a request.
+
+        Returns:
+            tuple: (key, expires_at_ms), or (None, None) if the interval has no fixed bar length.
+        """
+        if str(interval) not in INTERVAL_MINUTES:
+            return None, None
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        boundary = next_bar_close(interval, now_ms)
+        extra = tuple(sorted((k, v) for k, v in params.items() if v is not None))
+        return (endpoint, symbol, str(interval), boundary, extra), boundary
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return self.cache_dir / f'{digest}.pkl'
+
+    def _count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def get(self, key, now_ms=None):
+        """
+        Looks a key up in memory, then on disk.
+
+        Returns:
+            The cached value, or None on a miss or if the entry has expired.
+        """
+        if key is None:
+            return None
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if now_ms < expires_at:
+                    self._memory.move_to_end(key)
+                    self.metrics['memory_hits'] += 1
+                    return value
+                del self._memory[key]
+                self.metrics['expired'] += 1
+
+        if self.cache_dir is not None:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    expires_at, value = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                expires_at = None
+            if expires_at is not None:
+                if now_ms < expires_at:
+                    self._store_memory(key, expires_at, value)
+                    self._count('disk_hits')
+                    return value
+                path.unlink(missing_ok=True)
+                self._count('expired')
+
+        self._count('misses')
+        return None
+
+    def _store_memory(self, key, expires_at, value):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.metrics['evictions'] += 1
+
+    def put(self, key, value, expires_at):
+        """
+        Stores a value in both tiers until expires_at (epoch ms).
+        """
+        if key is None:
+            return
+        self._store_memory(key, expires_at, value)
+        self._count('stores')
+
+        if self.cache_dir is not None:
+            path = self._disk_path(key)
+            tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+
+    def purge_expired(self, now_ms=None):
+        """
+        Deletes expired entries from both tiers.
+
+        Returns:
+            int: Entries removed.
+        """
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        removed = 0
+        with self._lock:
+            for key in [k for k, (expires_at, _) in self._memory.items() if expires_at <= now_ms]:
+                del self._memory[key]
+                removed += 1
+
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob('*.pkl'):
+                try:
+                    with open(path, 'rb') as f:
+                        expires_at, _ = pickle.load(f)
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    expires_at = 0
+                if expires_at <= now_ms:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    def stats(self):
+        """
+        Returns hit/miss counters plus the hit rate.
+
+        Returns:
+            dict: memory_hits, disk_hits, misses, stores, expired, evictions, hit_rate
+        """
+        with self._lock:
+            stats = dict(self.metrics)
+            stats['entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else None
+        return stats
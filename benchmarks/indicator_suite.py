@@ -0,0 +1,285 @@
+"""
+Indicator benchmark suite with a JSON history and regression checks.
+
+Times every Indicator method and the full daily_cruncher.process_symbol_timeframe
+pipeline (read raw Parquet, compute, write processed Parquet) on synthetic OHLCV
+from 10^3 to 10^7 rows. Each case records the best wall time of --repeat runs,
+the tracemalloc peak of one extra run, and rows/sec; every run is appended to the
+history file along with the git commit and library versions.
+
+    python benchmarks/indicator_suite.py
+    python benchmarks/indicator_suite.py --sizes 1000 100000 --cases rsi hma pipeline
+    python benchmarks/indicator_suite.py --compare --threshold 0.15
+
+--compare checks the new run against the previous one in the history (or --baseline N,
+an index into the history) and exits with status 1 if any case got slower or used more
+memory by more than --threshold. Times under --min-seconds are too noisy to judge and
+only count for memory.
+"""
+import os, sys
+import gc
+import json
+import logging
+import time
+import uuid
+import shutil
+import platform
+import tempfile
+import argparse
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_processing.indicators import Indicator
+from data_processing import daily_cruncher
+from utils.storage_manager import StorageManager
+
+HISTORY_PATH = Path(__file__).resolve().parent / 'indicator_history.json'
+SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+THRESHOLD = 0.10
+MIN_SECONDS = 0.005
+
+
+def make_ohlcv(rows, seed=0, symbol='BTCUSDT'):
+    """
+    Random-walk 1m bars in the typed layout the cruncher reads.
+
+    Returns:
+        DataFrame: symbol, open, high, low, close, volume, ts
+    """
+    rng = np.random.default_rng(seed)
+    close = 60000 + np.cumsum(rng.normal(0, 25, rows))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 10, rows))
+    return pd.DataFrame({
+        'symbol': pd.Categorical([symbol] * rows),
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.gamma(2.0, 5.0, rows),
+        'ts': pd.date_range('2015-01-01', periods=rows, freq='1min', tz='UTC').as_unit('ms'),
+    })
+
+
+class PipelineCase:
+    """
+    process_symbol_timeframe end to end, inside a throwaway storage tree.
+
+    The raw file is written once per size (setup is not timed); each run reads it,
+    computes the configured indicators and writes the processed Parquet. The
+    indicator cache is off so every run does the full compute.
+    """
+
+    def __init__(self):
+        self.workdir = None
+        self.raw_files = {}
+
+    def __enter__(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp(prefix='indicator_suite_')
+        os.chdir(self.workdir)
+        self.use_cache = daily_cruncher.USE_INDICATOR_CACHE
+        daily_cruncher.set_indicator_cache(False)
+        # Per-file "saved to" lines would drown the results
+        self.log_levels = {logger: logger.level for logger in (daily_cruncher.logger, logging.getLogger('utils'))}
+        for logger in self.log_levels:
+            logger.setLevel(logging.WARNING)
+        return self
+
+    def __exit__(self, *exc):
+        for logger, level in self.log_levels.items():
+            logger.setLevel(level)
+        daily_cruncher.set_indicator_cache(self.use_cache)
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def prepare(self, df):
+        rows = len(df)
+        if rows not in self.raw_files:
+            storage_manager = StorageManager()
+            timeframe = f'{rows}r'
+            path = storage_manager.get_kline_path(date_type='Date', date=daily_cruncher.get_todays_date(),
+                                                  symbol='BTCUSDT', timeframe=timeframe)
+            file_path = storage_manager.save_parquet(df, f'BTCUSDT_{timeframe}.parquet', path)
+            storage_manager.catalog.close()
+            self.raw_files[rows] = ('BTCUSDT', timeframe, file_path)
+        return self.raw_files[rows]
+
+    def __call__(self, df):
+        daily_cruncher.process_symbol_timeframe(self.prepare(df))
+
+
+CASES = {
+    'ema': lambda df: Indicator(df, copy=False).ema(20),
+    'sma': lambda df: Indicator(df, copy=False).sma(20),
+    'rsi': lambda df: Indicator(df, copy=False).rsi(14),
+    'wma': lambda df: Indicator(df, copy=False).wma(10),
+    'hma': lambda df: Indicator(df, copy=False).hma(20),
+    'moving_average_envelopes': lambda df: Indicator(df, copy=False).moving_average_envelopes(20, 0.02, 'ema'),
+    'stocastic_rsi': lambda df: Indicator(df, copy=False).stocastic_rsi(14, 3, 3),
+    'pipeline': None,  # PipelineCase, needs a storage tree
+}
+
+
+def run_case(fn, df, repeat=3):
+    """
+    Times fn(df) and measures its peak traced allocation.
+
+    Returns:
+        dict: seconds (best of repeat), peak_mb, rows_per_s
+    """
+    if hasattr(fn, 'prepare'):
+        fn.prepare(df)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - start)
+
+    # Separate run, tracemalloc slows allocation-heavy code down
+    gc.collect()
+    tracemalloc.start()
+    fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(times)
+    return {'seconds': seconds, 'peak_mb': peak / 2**20, 'rows_per_s': len(df) / seconds if seconds else None}
+
+
+def run_suite(sizes=SIZES, cases=None, repeat=3, log=print):
+    """
+    Runs every case at every size.
+
+    Returns:
+        list[dict]: One result per (case, rows).
+    """
+    cases = cases or list(CASES)
+    results = []
+    with PipelineCase() as pipeline:
+        for rows in sizes:
+            df = make_ohlcv(rows)
+            for name in cases:
+                fn = pipeline if name == 'pipeline' else CASES[name]
+                result = {'case': name, 'rows': rows, **run_case(fn, df, repeat)}
+                results.append(result)
+                if log:
+                    log(f"{name:>25} {rows:>10} {result['seconds']:>10.4f}s {result['peak_mb']:>9.1f} MB "
+                        f"{result['rows_per_s']:>14,.0f} rows/s")
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path=HISTORY_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_history(history, path=HISTORY_PATH):
+    #Temp file then rename, a killed run never leaves half a history behind
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def compare(current, baseline, threshold=THRESHOLD, min_seconds=MIN_SECONDS):
+    """
+    Lists the cases that regressed from baseline to current.
+
+    Args:
+        current (list[dict]): run_suite() results.
+        baseline (list[dict]): Results of an earlier run.
+        threshold (float): Allowed relative increase, 0.10 = 10%.
+        min_seconds (float): Time changes are ignored when both runs are faster than this.
+
+    Returns:
+        list[str]: One line per regression, empty if none.
+    """
+    before = {(r['case'], r['rows']): r for r in baseline}
+    regressions = []
+    for result in current:
+        old = before.get((result['case'], result['rows']))
+        if old is None:
+            continue
+        label = f"{result['case']} @ {result['rows']} rows"
+        if max(result['seconds'], old['seconds']) >= min_seconds and \
+                result['seconds'] > old['seconds'] * (1 + threshold):
+            regressions.append(f"{label}: time {old['seconds']:.4f}s -> {result['seconds']:.4f}s "
+                               f"(+{result['seconds'] / old['seconds'] - 1:.0%})")
+        if old['peak_mb'] > 0 and result['peak_mb'] > old['peak_mb'] * (1 + threshold):
+            regressions.append(f"{label}: peak memory {old['peak_mb']:.1f} MB -> {result['peak_mb']:.1f} MB "
+                               f"(+{result['peak_mb'] / old['peak_mb'] - 1:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Indicator methods and the cruncher pipeline.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=SIZES)
+    parser.add_argument('--cases', nargs='*', default=list(CASES), choices=list(CASES))
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case, the best one is kept')
+    parser.add_argument('--history', default=str(HISTORY_PATH), help='JSON file the runs are appended to')
+    parser.add_argument('--no-save', action='store_true', help="Don't append this run to the history")
+    parser.add_argument('--compare', action='store_true', help='Fail if this run regressed against the baseline')
+    parser.add_argument('--baseline', type=int, default=-1, help='History index to compare against (default: last run)')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='Allowed relative regression')
+    parser.add_argument('--min-seconds', type=float, default=MIN_SECONDS)
+    parser.add_argument('--label', default=None, help='Free-form note stored with the run')
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    print(f"{'case':>25} {'rows':>10} {'time':>11} {'peak':>12} {'throughput':>21}")
+    results = run_suite(args.sizes, args.cases, args.repeat)
+
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'label': args.label,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'results': results,
+    }
+
+    status = 0
+    if args.compare:
+        if not history:
+            print('No baseline in the history yet, nothing to compare against')
+        else:
+            baseline = history[args.baseline]
+            regressions = compare(results, baseline['results'], args.threshold, args.min_seconds)
+            print(f"\nCompared against {baseline.get('commit')} ({baseline['timestamp']}), threshold {args.threshold:.0%}")
+            for line in regressions:
+                print(f'REGRESSION {line}')
+            if regressions:
+                status = 1
+            else:
+                print('No regressions')
+
+    if not args.no_save:
+        history.append(run)
+        save_history(history, args.history)
+        print(f'Run saved to {args.history}')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
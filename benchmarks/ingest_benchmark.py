@@ -0,0 +1,133 @@
+"""
+Ingestion throughput benchmark against the local MockBitunixServer.
+
+Drives a Daily_Saver-style workload (every symbol x interval, fetched, cleaned
+and written to storage) and reports requests/sec, p50/p99 request latency and
+bars/sec ingested. Nothing touches the real exchange.
+
+    python benchmarks/ingest_benchmark.py --latency 0.05 --rounds 3
+    python benchmarks/ingest_benchmark.py --mode sequential --error-rate 0.05
+"""
+import os, sys
+import time
+import shutil
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api_clients.api_client_bitunix import ApiBitunix
+from api_clients.mock_bitunix import MockBitunixServer
+from api_clients.Daily_Saver import fetch_kline_frame, save_kline_frame
+from utils.storage_manager import StorageManager
+from utils.rate_limiter import RateLimiter
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'SUIUSDT', 'ARBUSDT']
+INTERVALS = ['1', '5', '15', '30', '60', '240']
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def timed_fetch(client, symbol, interval, rate_limiter):
+    start = time.perf_counter()
+    df = fetch_kline_frame(client, symbol, interval, rate_limiter)
+    return df, time.perf_counter() - start
+
+
+def run_workload(client, storage_manager, jobs, mode='concurrent', max_workers=8, requests_per_second=1000,
+                 write=True):
+    """
+    Runs one pass of the workload.
+
+    Returns:
+        dict: wall time, per-request latencies, bar and failure counts.
+    """
+    rate_limiter = RateLimiter(rate=requests_per_second, burst=max_workers)
+    latencies, bars, failures = [], 0, 0
+    start = time.perf_counter()
+
+    def handle(symbol, interval, df, latency):
+        nonlocal bars, failures
+        latencies.append(latency)
+        if df is None:
+            failures += 1
+            return
+        bars += len(df)
+        if write:
+            save_kline_frame(storage_manager, df, symbol, interval, csv_switch=False)
+
+    if mode == 'sequential':
+        for symbol, interval in jobs:
+            df, latency = timed_fetch(client, symbol, interval, rate_limiter)
+            handle(symbol, interval, df, latency)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(timed_fetch, client, s, i, rate_limiter): (s, i) for s, i in jobs}
+            for future in as_completed(futures):
+                symbol, interval = futures[future]
+                df, latency = future.result()
+                handle(symbol, interval, df, latency)
+
+    return {'wall': time.perf_counter() - start, 'latencies': latencies, 'bars': bars, 'failures': failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Kline ingestion against the mock Bitunix API.')
+    parser.add_argument('--mode', choices=['sequential', 'concurrent'], default='concurrent')
+    parser.add_argument('--rounds', type=int, default=3, help='Passes over every symbol x interval')
+    parser.add_argument('--max-workers', type=int, default=8)
+    parser.add_argument('--rps', type=float, default=1000, help='Client-side rate limit')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock server latency (s)')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Mock server latency jitter (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--server-max-rps', type=float, default=None, help='Mock server 429s above this rate')
+    parser.add_argument('--bars', type=int, default=200, help='Bars per /kline response')
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--no-write', action='store_true', help='Skip writing to storage')
+    args = parser.parse_args()
+
+    jobs = [(s, i) for s in SYMBOLS for i in INTERVALS]
+    storage_dir = tempfile.mkdtemp(prefix='bitunix_bench_')
+
+    with MockBitunixServer(latency=args.latency, latency_jitter=args.jitter, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, max_rps=args.server_max_rps,
+                           bars=args.bars, seed=0) as server:
+        client = ApiBitunix(base_url=server.base_url, pool_size=max(args.max_workers, 1),
+                            max_retries=args.retries, backoff_factor=0.05, backoff_jitter=0.05)
+        storage_manager = StorageManager(base_path=storage_dir)
+
+        totals = {'wall': 0.0, 'latencies': [], 'bars': 0, 'failures': 0}
+        try:
+            for _ in range(args.rounds):
+                result = run_workload(client, storage_manager, jobs, mode=args.mode, max_workers=args.max_workers,
+                                      requests_per_second=args.rps, write=not args.no_write)
+                totals['wall'] += result['wall']
+                totals['latencies'] += result['latencies']
+                totals['bars'] += result['bars']
+                totals['failures'] += result['failures']
+            client_stats = client.get_stats()
+        finally:
+            client.close()
+            shutil.rmtree(storage_dir, ignore_errors=True)
+
+        requests = len(totals['latencies'])
+        print(f"mode={args.mode} workers={args.max_workers} rounds={args.rounds} jobs/round={len(jobs)}")
+        print(f"wall time      : {totals['wall']:.3f} s")
+        print(f"requests/sec   : {requests / totals['wall']:.1f}")
+        print(f"latency p50    : {percentile(totals['latencies'], 50) * 1000:.1f} ms")
+        print(f"latency p99    : {percentile(totals['latencies'], 99) * 1000:.1f} ms")
+        print(f"bars/sec       : {totals['bars'] / totals['wall']:.0f}")
+        print(f"failed jobs    : {totals['failures']}")
+        print(f"server counts  : {server.counts}")
+        print(f"client stats   : {client_stats}")
+
+
+if __name__ == '__main__':
+    main()
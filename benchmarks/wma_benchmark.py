@@ -0,0 +1,62 @@
+"""
+WMA / HMA benchmark: vectorized Indicator kernels vs the old rolling().apply() version.
+
+Times both on random-walk closes from 10^4 up to 10^7 bars and checks they agree.
+The reference is skipped above --reference-limit bars (it runs a Python lambda per
+row and takes minutes at 10^7).
+
+    python benchmarks/wma_benchmark.py
+    python benchmarks/wma_benchmark.py --sizes 10000 100000 --window 55
+"""
+import os, sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_processing.indicators import Indicator
+
+
+def reference_wma(series, window):
+    weights = np.arange(1, window + 1)
+    return series.rolling(window).apply(lambda prices: np.dot(prices, weights) / weights.sum(), raw=True)
+
+
+def reference_hma(series, window):
+    diff = 2 * reference_wma(series, int(window / 2)) - reference_wma(series, window)
+    return reference_wma(diff, int(np.sqrt(window)))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vectorized WMA/HMA kernels.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10**4, 10**5, 10**6, 10**7])
+    parser.add_argument('--window', type=int, default=21)
+    parser.add_argument('--reference-limit', type=int, default=10**6,
+                        help='Largest size the rolling().apply() reference is run on')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'bars':>10} {'kernel':>6} {'vectorized s':>13} {'reference s':>12} {'speedup':>8} {'max abs diff':>13}")
+    for size in args.sizes:
+        close = pd.Series(60000 + np.cumsum(rng.normal(0, 25, size)), name='close')
+        indicator = Indicator(pd.DataFrame({'close': close}), copy=False)
+
+        for name, fast, slow in (('wma', indicator.wma, reference_wma), ('hma', indicator.hma, reference_hma)):
+            result, fast_time = timed(fast, args.window)
+            if size <= args.reference_limit:
+                expected, slow_time = timed(slow, close, args.window)
+                diff = float(np.nanmax(np.abs(result - expected)))
+                print(f'{size:>10} {name:>6} {fast_time:>13.4f} {slow_time:>12.3f} {slow_time / fast_time:>7.0f}x {diff:>13.2e}')
+            else:
+                print(f"{size:>10} {name:>6} {fast_time:>13.4f} {'skipped':>12} {'-':>8} {'-':>13}")
+
+
+if __name__ == '__main__':
+    main()
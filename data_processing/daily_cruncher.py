@@ -1,16 +1,22 @@
 import os, sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+import time
 import logging
-from multiprocessing import Pool
+import argparse
+import pyarrow.parquet as pq
 
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.storage_manager import StorageManager
-from data_processing.indicators import Indicator
+from data_processing.indicator_plan import IndicatorPlan
+from data_processing.panel import compute_panel
+from data_processing.indicator_cache import IndicatorCache
+from data_processing.executor import TaskExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,6 +26,54 @@ logger = logging.getLogger(__name__)
 symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'ARBUSDT']
 timeframes = ['15m', '30m', '60m', '240m'] #timeframes with m to match foldernames
 
+# Processed output - Parquet always, CSV only as an opt-in export
+CSV_EXPORT = False
+PARQUET_OPTIONS = {'compression': 'zstd'}
+
+# Compute every symbol of a timeframe as one (time x symbol) panel, see data_processing/panel.py
+PANEL_MODE = False
+
+# Only recompute bars that are new since the last processed output (plus the plan's warm-up),
+# VERIFY_INCREMENTAL also runs the full recompute and falls back to it on any mismatch
+INCREMENTAL = False
+VERIFY_INCREMENTAL = False
+
+# Reuse indicator results from storage/cache/indicators when a raw file hasn't changed
+USE_INDICATOR_CACHE = True
+_indicator_cache = None
+
+def get_indicator_cache():
+    #One cache per process, disk tier only: a run never re-reads a block it computed, so holding
+    #them in memory would just grow every worker by its outputs; across runs the disk tier is shared
+    global _indicator_cache
+    if USE_INDICATOR_CACHE and _indicator_cache is None:
+        _indicator_cache = IndicatorCache(max_entries=0)
+    return _indicator_cache if USE_INDICATOR_CACHE else None
+
+def set_indicator_cache(enabled):
+    global USE_INDICATOR_CACHE
+    USE_INDICATOR_CACHE = enabled
+
+# Set up once per executor worker by init_worker, reused by every task it runs
+_worker_state = {}
+
+def init_worker(use_cache=USE_INDICATOR_CACHE, incremental=INCREMENTAL, verify=VERIFY_INCREMENTAL):
+    set_indicator_cache(use_cache)
+    _worker_state['incremental'] = incremental
+    _worker_state['verify'] = verify
+    _worker_state['storage_manager'] = StorageManager()
+    _worker_state['plan'] = IndicatorPlan.from_config()
+
+def task_rows(storage_manager, file_path):
+    #Bar count from the catalog, or the Parquet footer for uncatalogued files
+    entry = storage_manager.catalog.get(file_path)
+    if entry and entry['row_count'] is not None:
+        return entry['row_count']
+    try:
+        return pq.ParquetFile(file_path).metadata.num_rows
+    except Exception:
+        return 0
+
 def get_todays_date():
     target_date = datetime.now()
     formatted_date = target_date.strftime('%m-%d-%Y')
@@ -31,80 +85,126 @@ def get_yesterday_date():
     formatted_date = target_date.strftime('%m-%d-%Y')
     return formatted_date
 
+def find_raw_files(storage_manager, date):
+    """
+    Looks up the day's raw Kline Parquet files in the storage catalog (no directory probing).
+
+    Returns:
+        dict: {(symbol, timeframe): Path}
+    """
+    day_path = storage_manager.get_kline_path(date_type='Date', date=date, create=False)
+    return {
+        (file_path.parent.parent.name, file_path.parent.name): file_path
+        for file_path in storage_manager.find_files(kind='raw', under=day_path, suffix='.parquet')
+    }
+
 def process_symbol_timeframe(args):
-    symbol, timeframe = args
-    # Initialize the StorageManager
-    storage_manager = StorageManager()
+    """
+    Computes and saves the indicators for one symbol/timeframe.
+
+    Args:
+        args (tuple): (symbol, timeframe) or (symbol, timeframe, raw file path).
+
+    Returns:
+        dict: rows plus read/compute/write seconds, None if there was nothing to process.
+
+    Raises:
+        Exception: Whatever reading the raw file raised, so the executor reports the task as failed.
+    """
+    symbol, timeframe = args[:2]
+    file_path = args[2] if len(args) > 2 else None
+    # Initialize the StorageManager (a warm executor worker already has one)
+    storage_manager = _worker_state.get('storage_manager') or StorageManager()
     
     # Get the target date
     date = get_todays_date()
     
     logger.info(f'Processing data for {symbol} with timeframe {timeframe} on date {date}.')
     
-    # Construct the path to the stored Parquet file
-    kline_path = Path(storage_manager.get_kline_path(
-        date_type='Date',
-        date=date,
-        symbol=symbol,
-        timeframe=timeframe
-    ))
-    filename = f'{symbol}_{timeframe}.parquet'
-    file_path = kline_path / filename
-    
-    # Check if the file exists
-    if not file_path.exists():
-        logger.info(f'File not found: {file_path}')
+    # Look the stored Parquet file up in the catalog
+    if file_path is None:
+        file_path = find_raw_files(storage_manager, date).get((symbol, timeframe))
+
+    if file_path is None:
+        logger.info(f'No raw file catalogued for {symbol} {timeframe} on {date}')
         return
     
+    timings = {}
+    start = time.perf_counter()
     try:
         # Load the data
-        df = pd.read_parquet(file_path)
-        # Initialize the Indicator object
-        indicator = Indicator(df)
+        df = storage_manager.read_parquet(file_path)
     except Exception as e:
-        logger.info(f'Error loading data from {file_path}: {e}')
-        return
+        logger.error(f'Error loading data from {file_path}: {e}')
+        raise
+    timings['rows'] = len(df)
+    timings['read'] = time.perf_counter() - start
 
-    # Compute RSI indicators with periods 3, 5, 8, 13, 21
-    periods = [3, 5, 8, 13, 21]
-    for period in periods:
-        df[f'RSI_{period}'] = indicator.rsi(period)
-    
-    # Weighted Moving Average
-    # Todo - naming upgrade, if i enter WMA_20 i need column name below 'WMA_10' to reflect that
-    df[f'WMA_10'] = indicator.wma(window=10)
-    #wma_10 = indicator.wma(window=10)
-    #indicator.add_indicator('WMA10', wma_10)
+    # Every indicator in config/config.yaml ('indicators'), computed in one pass with
+    # shared intermediates (diff/gains/losses for all RSI periods, WMAs for HMA, ...)
+    start = time.perf_counter()
+    plan = _worker_state.get('plan') or IndicatorPlan.from_config()
+    if _worker_state.get('incremental', INCREMENTAL):
+        previous = load_processed(storage_manager, symbol, timeframe, date)
+        raw = df
+        df, first_new = plan.apply_incremental(raw, previous)
+        timings['recomputed'] = len(df) - first_new
+        if first_new == len(df) and previous is not None and len(previous) == len(df):
+            timings['compute'] = time.perf_counter() - start
+            logger.info(f'No new bars for {symbol} {timeframe}, processed output is up to date')
+            return timings
+        if _worker_state.get('verify', VERIFY_INCREMENTAL):
+            full = plan.apply(raw)
+            timings['verified'] = outputs_match(plan, df, full)
+            if not timings['verified']:
+                logger.warning(f'Incremental result for {symbol} {timeframe} differs from a full recompute, '
+                               f'saving the full recompute')
+                df = full
+    else:
+        df = plan.apply(df, cache=get_indicator_cache())
+    timings['compute'] = time.perf_counter() - start
 
-    # Hull Moving Average
-    df[f'HMA_20'] = indicator.hma(window=20)
-    #hma_20 = indicator.hma(window=20)
-    #indicator.add_indicator('HMA20', hma_20)
 
-    
-    
-    ma, upper_env, lower_env = indicator.moving_average_envelopes(window=20, percentage=0.02, ma_type='ema')
-    #indicator.add_indicator('EMA20', ma)
-    #indicator.add_indicator('UpperEnvelope', upper_env)
-    #indicator.add_indicator('LowerEnvelope', lower_env)
+    # (Optional) Perform additional data manipulation here
 
-    # Moving Average Envelopes
-    df[f'EMA20'] = ma
-    df[f'UpperEnvelope'] = upper_env
-    df[f'LowerEnvelope'] = lower_env
+    start = time.perf_counter()
+    save_processed(storage_manager, df, symbol, timeframe, date)
+    timings['write'] = time.perf_counter() - start
+    return timings
 
+def load_processed(storage_manager, symbol, timeframe, date):
+    #The last saved output for the day, None if there isn't one yet
+    processed_path = storage_manager.get_processed_path(date=date, symbol=symbol, timeframe=timeframe, create=False)
+    file_path = processed_path / f'{symbol}_{timeframe}.parquet'
+    if not file_path.exists():
+        return None
+    try:
+        return storage_manager.read_parquet(file_path)
+    except Exception as e:
+        logger.info(f'Error loading processed data from {file_path}, recomputing everything: {e}')
+        return None
 
-    # Stochastic RSI
-    stoch_rsi_df = indicator.stocastic_rsi(periods=14, smooth_k=3, smooth_d=3)
-    df[f'Stoch_RSI_%K'] = stoch_rsi_df['StochRSI_%K']
-    df[f'Stoch_RSI_%D'] = stoch_rsi_df['StochRSI_%D']
+def outputs_match(plan, result, expected, rtol=1e-9, atol=1e-6):
+    """
+    Checks an incremental result against a full recompute.
 
-    #indicator.add_indicator('StochRSI_%K', stoch_rsi_df['StochRSI_%K'])
-    #indicator.add_indicator('StochRSI_%D', stoch_rsi_df['StochRSI_%D'])
+    Rolling sums restart at the recomputed tail, so values agree to float rounding
+    rather than bit for bit; atol covers oscillators sitting near 0.
 
+    Returns:
+        bool: Same length, same NaN positions and values within tolerance for every plan column.
+    """
+    if len(result) != len(expected):
+        return False
+    for column in plan.columns:
+        a = result[column].to_numpy(dtype=np.float64)
+        b = expected[column].to_numpy(dtype=np.float64)
+        if not np.allclose(a, b, rtol=rtol, atol=atol, equal_nan=True) or \
+                not np.array_equal(np.isnan(a), np.isnan(b)):
+            return False
+    return True
 
-    # (Optional) Perform additional data manipulation here
-    
+def save_processed(storage_manager, df, symbol, timeframe, date):
     # Get the storage path for processed data
     processed_path = storage_manager.get_processed_path(
         date=date,
@@ -118,14 +218,81 @@ def process_symbol_timeframe(args):
     processed_file_path = processed_path / f'{processed_filename}_processed.csv'
     processed_file_path_parquet = processed_path / f'{processed_filename}.parquet'
     
-    # Save the processed DataFrame as a CSV file
-    df.to_csv(processed_file_path, index=False)
-    df.to_parquet(processed_file_path_parquet, index=False)
-    logger.info(f'Processed data saved to {processed_file_path}')
+    # Save the processed DataFrame as Parquet, plus a CSV copy if exporting
+    storage_manager.save_parquet(df, processed_file_path_parquet.name, processed_path, **PARQUET_OPTIONS)
+    if CSV_EXPORT:
+        storage_manager.save_dataframe(df, processed_file_path.name, processed_path)
+    logger.info(f'Processed data saved to {processed_file_path_parquet}')
+
+def process_timeframe_panel(args):
+    """
+    Panel mode: computes the indicators of every symbol for one timeframe together.
+
+    All symbols are aligned into one (time x symbol) array and each indicator runs as
+    one vectorized pass across all of them (data_processing/panel.py), then each
+    symbol's output is written exactly as process_symbol_timeframe would.
+
+    Args:
+        args (tuple): (timeframe, {symbol: raw file path}).
+    """
+    timeframe, files = args
+    storage_manager = _worker_state.get('storage_manager') or StorageManager()
+    date = get_todays_date()
+    logger.info(f'Processing {len(files)} symbols as a panel for timeframe {timeframe} on date {date}.')
+
+    frames, failed = {}, []
+    for symbol, file_path in files.items():
+        try:
+            frames[symbol] = storage_manager.read_parquet(file_path)
+        except Exception as e:
+            logger.error(f'Error loading data from {file_path}: {e}')
+            failed.append(symbol)
+
+    plan = _worker_state.get('plan') or IndicatorPlan.from_config()
+    for symbol, df in compute_panel(plan, frames, cache=get_indicator_cache()).items():
+        save_processed(storage_manager, df, symbol, timeframe, date)
+    # The readable symbols are saved, the task still counts as failed
+    if failed:
+        raise OSError(f'Could not load {timeframe} data for {failed}')
+
+def main(panel=PANEL_MODE, use_cache=USE_INDICATOR_CACHE, workers=None, incremental=INCREMENTAL,
+         verify=VERIFY_INCREMENTAL):
+    # One catalog query for the whole day instead of an exists() probe per symbol/timeframe
+    storage_manager = StorageManager()
+    raw_files = find_raw_files(storage_manager, get_todays_date())
+    tasks = [(s, t, raw_files[(s, t)]) for s in symbols for t in timeframes if (s, t) in raw_files]
+    logger.info(f'{len(tasks)} of {len(symbols) * len(timeframes)} symbol/timeframes have data today')
+    rows = {task: task_rows(storage_manager, task[2]) for task in tasks}
+    storage_manager.catalog.close()
+
+    if panel and incremental:
+        logger.info('--incremental only applies per symbol/timeframe, panel mode recomputes everything')
+    if panel:
+        # One task per timeframe, each covering every symbol in wide numpy passes
+        jobs = [(t, {s: f for s, tf, f in tasks if tf == t}) for t in timeframes]
+        jobs = [(t, files) for t, files in jobs if files]
+        sizes = [sum(rows[(s, t, f)] for s, f in files.items()) for t, files in jobs]
+        fn = process_timeframe_panel
+    else:
+        # Largest series first so a long 15m history doesn't finish last on its own
+        jobs, sizes, fn = tasks, [rows[task] for task in tasks], process_symbol_timeframe
 
-def main():
-    with Pool() as pool:
-        pool.map(process_symbol_timeframe, [(s, t) for s in symbols for t in timeframes])
+    workers = workers or min(len(jobs), os.cpu_count() or 1) or 1
+    with TaskExecutor(max_workers=workers, initializer=init_worker, initargs=(use_cache, incremental, verify)) as executor:
+        results = executor.map(fn, jobs, sizes=sizes)
+    logger.info(TaskExecutor.report(results))
+    return results
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Compute indicators for the day\'s raw Kline files.')
+    parser.add_argument('--panel', action='store_true', default=PANEL_MODE,
+                        help='Compute all symbols of a timeframe together instead of one process per symbol/timeframe')
+    parser.add_argument('--no-cache', action='store_true', help='Recompute every indicator, ignoring cached results')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per core)')
+    parser.add_argument('--incremental', action='store_true', default=INCREMENTAL,
+                        help='Only recompute bars added since the last processed output')
+    parser.add_argument('--verify', action='store_true', default=VERIFY_INCREMENTAL,
+                        help='With --incremental, also run a full recompute and check the results match')
+    args = parser.parse_args()
+    main(panel=args.panel, use_cache=not args.no_cache, workers=args.workers, incremental=args.incremental,
+         verify=args.verify)
@@ -0,0 +1,192 @@
+import os, sys
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_processing.indicator_plan import IndicatorPlan
+
+logger = logging.getLogger(__name__)
+
+# Process pool for the cruncher's CPU-bound work.
+#
+# - Largest first: tasks are sorted by size (row count) before they're queued, so a
+#   long 15m history starts right away instead of being picked up last and running
+#   alone while the other cores sit idle. Workers pull the next task as soon as they
+#   are free, so the small ones fill in around it.
+# - Warm workers: processes live for the whole run; the initializer (and anything a
+#   task caches in module globals) is paid once per worker, not per task.
+# - Shared memory: compute_frames() hands close prices to the workers and gets the
+#   output block back through multiprocessing.shared_memory, only the block names
+#   and shapes are pickled.
+# - Every task reports its wall time, queue wait and worker pid.
+
+
+class TaskExecutor:
+    """
+    Runs tasks on a pool of long-lived worker processes, largest first.
+
+    Example:
+        with TaskExecutor(max_workers=4) as executor:
+            results = executor.map(crunch_file, tasks, sizes=[rows_of(t) for t in tasks])
+        print(executor.report(results))
+    """
+
+    def __init__(self, max_workers=None, initializer=None, initargs=()):
+        """
+        Initializes the TaskExecutor.
+
+        Args:
+            max_workers (int): Worker processes, defaults to os.cpu_count().
+            initializer (callable): Run once in every worker when it starts.
+            initargs (tuple): Arguments for the initializer.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=initializer, initargs=initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def map(self, fn, tasks, sizes=None):
+        """
+        Runs fn(task) for every task, largest size first.
+
+        Args:
+            fn (callable): A picklable (module-level) function.
+            tasks (list): The task arguments.
+            sizes (list[int]): Size of each task (e.g. rows), same order as tasks. None = queue order.
+
+        Returns:
+            list[dict]: In the order of tasks: task, size, result, error, seconds (in the worker),
+                        waited (queued before a worker picked it up), pid.
+        """
+        sizes = list(sizes) if sizes is not None else [0] * len(tasks)
+        order = sorted(range(len(tasks)), key=lambda i: sizes[i], reverse=True)
+        submitted = {}
+        for i in order:
+            future = self._pool.submit(_timed_call, fn, tasks[i], time.time())
+            submitted[future] = i
+
+        results = [None] * len(tasks)
+        for future in as_completed(submitted):
+            i = submitted[future]
+            entry = {'task': tasks[i], 'size': sizes[i], 'result': None, 'error': None,
+                     'seconds': None, 'waited': None, 'pid': None}
+            try:
+                entry.update(future.result())
+            except Exception as e:
+                # The worker process died (BrokenProcessPool) or the result didn't unpickle
+                entry['error'] = repr(e)
+            if entry['error']:
+                logger.warning(f"Task {tasks[i]} failed: {entry['error']}")
+            results[i] = entry
+        return results
+
+    @staticmethod
+    def report(results, top=5):
+        """
+        Summarizes per-task timings.
+
+        Returns:
+            str: Totals plus the slowest successful tasks, one per line.
+        """
+        #A task that raised still has a time, only its error marks it as failed
+        timed = [r for r in results if r['seconds'] is not None]
+        done = [r for r in timed if not r['error']]
+        busy = sum(r['seconds'] for r in timed)
+        failed = sum(1 for r in results if r['error'])
+        lines = [f'{len(results)} tasks, {failed} failed, {busy:.2f}s of worker time '
+                 f'on {len({r["pid"] for r in timed})} workers']
+        for r in sorted(done, key=lambda r: r['seconds'], reverse=True)[:top]:
+            lines.append(f"  {r['seconds']:8.3f}s  (waited {r['waited']:.3f}s, size {r['size']}, pid {r['pid']})  {r['task']}")
+        return '\n'.join(lines)
+
+
+def _timed_call(fn, task, queued_at):
+    started = time.time()
+    entry = {'pid': os.getpid(), 'waited': started - queued_at}
+    try:
+        entry['result'] = fn(task)
+    except Exception as e:
+        entry['error'] = repr(e)
+    entry['seconds'] = time.time() - started
+    return entry
+
+
+#Shared-memory handoff
+
+def _attach(name, shape):
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+
+
+_worker_plans = {}
+
+
+def _compute_shared(task):
+    #Worker side: read close from one block, write the plan's outputs into the other
+    spec_key, spec, close_name, out_name, rows = task
+    plan = _worker_plans.get(spec_key)
+    if plan is None:
+        plan = _worker_plans[spec_key] = IndicatorPlan(spec)
+    close_block, close = _attach(close_name, (rows,))
+    out_block, out = _attach(out_name, (rows, len(plan.columns)))
+    try:
+        plan.compute(close, out=out)
+    finally:
+        del close, out
+        close_block.close()
+        out_block.close()
+    return rows
+
+
+def compute_frames(executor, plan, frames):
+    """
+    Computes an IndicatorPlan over many in-memory frames on the executor's workers.
+
+    Each frame's close prices are copied once into a shared memory block and the
+    worker writes its output block straight into another; nothing array-sized is
+    pickled in either direction.
+
+    Args:
+        executor (TaskExecutor): The pool to run on.
+        plan (IndicatorPlan): The indicators to compute.
+        frames (dict): key -> DataFrame with a 'close' column.
+
+    Returns:
+        tuple: (dict key -> DataFrame with the plan's columns appended, per-task results from map())
+    """
+    blocks, tasks = {}, []
+    spec_key = repr(plan.groups)
+    try:
+        for key, df in frames.items():
+            rows = len(df)
+            close_block = shared_memory.SharedMemory(create=True, size=max(rows, 1) * 8)
+            blocks[close_block.name] = close_block
+            out_block = shared_memory.SharedMemory(create=True, size=max(rows * len(plan.columns), 1) * 8)
+            blocks[out_block.name] = out_block
+            np.ndarray((rows,), dtype=np.float64, buffer=close_block.buf)[:] = df['close'].to_numpy(dtype=np.float64)
+            tasks.append((spec_key, plan.spec, close_block.name, out_block.name, rows))
+
+        results = executor.map(_compute_shared, tasks, sizes=[task[-1] for task in tasks])
+        outputs = {}
+        for (key, df), task, result in zip(frames.items(), tasks, results):
+            if result['error']:
+                continue
+            out = np.ndarray((len(df), len(plan.columns)), dtype=np.float64, buffer=blocks[task[3]].buf)
+            # Copy out of the block so it can be unlinked
+            outputs[key] = plan.join(df, out.copy())
+            del out
+        return outputs, results
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
@@ -0,0 +1,246 @@
+import os
+import pickle
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path('storage') / 'cache' / 'indicators'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_MEMORY_BYTES = 128 * 1024 * 1024
+
+# Part of every key: bump it whenever indicator math changes so stale results are never served
+CACHE_VERSION = 1
+
+
+def fingerprint(*inputs):
+    """
+    Fast content hash (BLAKE2b, 128 bit) of arrays, Series, Indexes or plain values.
+
+    Dtype and shape are hashed along with the raw bytes, so equal-looking data in a
+    different dtype gets a different fingerprint. A RangeIndex hashes as its bounds.
+
+    Returns:
+        str: Hex digest.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for item in inputs:
+        if isinstance(item, pd.RangeIndex):
+            h.update(repr(('range', item.start, item.stop, item.step)).encode())
+            continue
+        if isinstance(item, (pd.Series, pd.Index)):
+            item = item.to_numpy()
+        if isinstance(item, np.ndarray):
+            if item.dtype == object:
+                item = item.astype(str)
+            h.update(repr((str(item.dtype), item.shape)).encode())
+            h.update(np.ascontiguousarray(item).data)
+        else:
+            h.update(repr(item).encode())
+    return h.hexdigest()
+
+
+def _nbytes(value):
+    #Approximate in-memory size of a cached result
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+        return int(np.sum(value.memory_usage(index=True)))
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value)
+    return 0
+
+
+class IndicatorCache:
+    """
+    Two-tier (size-bounded memory LRU + size-bounded on-disk LRU) memo for indicator results.
+
+    Keys are (input fingerprint, indicator name, params), so a result is reused for as
+    long as the input data is byte-for-byte the same, across calls within a run (memory)
+    and across runs and processes (disk). The disk tier drops the least recently used
+    files once it grows past max_bytes; reads touch a file's mtime to mark it as used.
+    """
+
+    def __init__(self, max_entries=128, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES):
+        """
+        Initializes the IndicatorCache.
+
+        Args:
+            max_entries (int): Max results held in memory (least recently used is dropped first),
+                               0 to use the disk tier only.
+            cache_dir (str or Path): Folder for the disk tier, None to keep the cache in memory only.
+            max_bytes (int): Size limit of the disk tier.
+            max_memory_bytes (int): Size limit of the memory tier.
+        """
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_bytes = max_bytes
+        self.max_memory_bytes = max_memory_bytes
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        self.metrics = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0,
+                        'disk_evictions': 0}
+
+    def make_key(self, fingerprint, name, **params):
+        return (CACHE_VERSION, fingerprint, name, tuple(sorted(params.items())))
+
+    def _disk_path(self, key):
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return self.cache_dir / f'{digest}.pkl'
+
+    def _count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def get(self, key):
+        """
+        Looks a key up in memory, then on disk.
+
+        Returns:
+            tuple: (hit (bool), value)
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.metrics['memory_hits'] += 1
+                return True, self._memory[key][0]
+
+        if self.cache_dir is not None:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    stored_key, value = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                stored_key = None
+            if stored_key == key:
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                self._store_memory(key, value)
+                self._count('disk_hits')
+                return True, value
+
+        self._count('misses')
+        return False, None
+
+    def _store_memory(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key)[1]
+            #Too big to ever fit: the disk tier still has it
+            if self.max_entries <= 0 or size > self.max_memory_bytes:
+                return
+            self._memory[key] = (value, size)
+            self._memory_bytes += size
+            while len(self._memory) > self.max_entries or self._memory_bytes > self.max_memory_bytes:
+                self._memory_bytes -= self._memory.popitem(last=False)[1][1]
+                self.metrics['evictions'] += 1
+
+    def put(self, key, value):
+        """
+        Stores a value in both tiers, then trims the disk tier to max_bytes.
+        """
+        self._store_memory(key, value)
+        self._count('stores')
+        if self.cache_dir is None:
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._disk_path(key)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = tmp_path.stat().st_size
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+            over = self._disk_bytes is None or self._disk_bytes > self.max_bytes
+        if over:
+            self.trim()
+
+    def trim(self):
+        """
+        Deletes the least recently used disk entries until the tier fits in max_bytes.
+
+        Returns:
+            int: Files removed.
+        """
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return 0
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+
+        removed = 0
+        for _, size, file_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(file_path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._disk_bytes = total
+            self.metrics['disk_evictions'] += removed
+        return removed
+
+    def memoize(self, fingerprint, name, compute, **params):
+        """
+        Returns the cached result for (fingerprint, name, params), computing and storing it on a miss.
+
+        Args:
+            fingerprint (str): fingerprint() of the inputs.
+            name (str): The indicator name.
+            compute (callable): Called with no arguments on a miss.
+            params: The indicator parameters.
+        """
+        key = self.make_key(fingerprint, name, **params)
+        hit, value = self.get(key)
+        if not hit:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Empties both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.cache_dir is not None and self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.pkl'):
+                path.unlink(missing_ok=True)
+            with self._lock:
+                self._disk_bytes = 0
+
+    def stats(self):
+        """
+        Returns hit/miss counters plus the hit rate.
+
+        Returns:
+            dict: memory_hits, disk_hits, misses, stores, evictions, disk_evictions, entries, memory_bytes, hit_rate
+        """
+        with self._lock:
+            stats = dict(self.metrics)
+            stats['entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_bytes
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else None
+        return stats
@@ -0,0 +1,403 @@
+import os, sys
+import logging
+import itertools
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_processing.indicators import weighted_moving_average
+from data_processing.indicator_cache import fingerprint
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'config.yaml'
+
+# What daily_cruncher computed before the spec moved into config/config.yaml
+DEFAULT_SPEC = [
+    {'name': 'rsi', 'params': {'periods': [3, 5, 8, 13, 21]}},
+    {'name': 'wma', 'params': {'window': 10}},
+    {'name': 'hma', 'params': {'window': 20}},
+    {'name': 'envelope', 'params': {'window': 20, 'percentage': 0.02, 'ma_type': 'ema'},
+     'columns': ['EMA20', 'UpperEnvelope', 'LowerEnvelope']},
+    {'name': 'stoch_rsi', 'params': {'periods': 14, 'smooth_k': 3, 'smooth_d': 3},
+     'columns': ['Stoch_RSI_%K', 'Stoch_RSI_%D']},
+]
+
+# Indicator name -> (default params, default output column templates)
+INDICATORS = {
+    'ema': ({'span': 20}, ['EMA{span}']),
+    'sma': ({'window': 20}, ['SMA{window}']),
+    'rsi': ({'periods': 14}, ['RSI_{periods}']),
+    'wma': ({'window': 10}, ['WMA_{window}']),
+    'hma': ({'window': 20}, ['HMA_{window}']),
+    'envelope': ({'window': 20, 'percentage': 0.025, 'ma_type': 'sma'},
+                 ['{MA}{window}', 'UpperEnvelope_{window}', 'LowerEnvelope_{window}']),
+    'stoch_rsi': ({'periods': 14, 'smooth_k': 3, 'smooth_d': 3},
+                  ['Stoch_RSI_%K_{periods}', 'Stoch_RSI_%D_{periods}']),
+}
+
+
+def load_spec(config_path=CONFIG_PATH):
+    """
+    Reads the 'indicators' list from the YAML config.
+
+    Falls back to DEFAULT_SPEC if the file has no 'indicators' section, or if
+    PyYAML is not installed.
+
+    Returns:
+        list[dict]: The spec entries ({'name', 'params', 'columns'}).
+    """
+    try:
+        import yaml
+    except ImportError:
+        logger.warning('PyYAML is not installed, using the built-in indicator spec')
+        return DEFAULT_SPEC
+    with open(config_path) as f:
+        config = yaml.safe_load(f) or {}
+    return config.get('indicators') or DEFAULT_SPEC
+
+
+def expand_spec(spec):
+    """
+    Turns spec entries into one (name, params, columns) per output group.
+
+    List-valued params expand into one entry per value (every combination if
+    several params are lists).
+
+    Returns:
+        list[tuple[str, dict, list[str]]]
+    """
+    expanded = []
+    for entry in spec:
+        name = entry['name'].lower()
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{entry['name']}', expected one of {sorted(INDICATORS)}")
+        defaults, templates = INDICATORS[name]
+        params = dict(defaults, **(entry.get('params') or {}))
+
+        keys = list(params)
+        choices = [params[k] if isinstance(params[k], (list, tuple)) else [params[k]] for k in keys]
+        combos = [dict(zip(keys, combo)) for combo in itertools.product(*choices)]
+        if entry.get('columns') and len(combos) > 1:
+            raise ValueError(f"'columns' can only be given for a single {name} output, not {len(combos)}")
+
+        for combo in combos:
+            if entry.get('columns'):
+                columns = list(entry['columns'])
+            else:
+                columns = [t.format(MA=str(combo.get('ma_type', '')).upper(), **combo) for t in templates]
+            if len(columns) != len(templates):
+                raise ValueError(f'{name} produces {len(templates)} columns, got names {columns}')
+            expanded.append((name, combo, columns))
+    return expanded
+
+
+def rolling_mean_cumsum(values, window):
+    """
+    rolling(window).mean() for many windows over the same values, from one cumulative sum.
+
+    NaN wherever the window is short or holds a NaN (same as pandas with min_periods=window).
+    Meant for bounded series (gains, losses, oscillators): the cumulative sum grows with
+    the series, so prefer rolling() for raw prices.
+
+    Args:
+        values (tuple): (cumsum of values with NaN as 0, cumsum of NaN flags), see _cumsums.
+                        1-D, or 2-D with time on axis 0.
+        window (int): The number of periods.
+
+    Returns:
+        ndarray: The rolling mean.
+    """
+    total, nans = values
+    n = len(total) - 1
+    out = np.full((n,) + total.shape[1:], np.nan)
+    if window < 1 or n < window:
+        return out
+    sums = total[window:] - total[:-window]
+    valid = (nans[window:] - nans[:-window]) == 0
+    out[window - 1:] = np.where(valid, sums / window, np.nan)
+    return out
+
+
+def _cumsums(values):
+    isnan = np.isnan(values)
+    zeros = np.zeros((1,) + values.shape[1:])
+    total = np.concatenate((zeros, np.cumsum(np.where(isnan, 0.0, values), axis=0)))
+    nans = np.concatenate((zeros.astype(np.int64), np.cumsum(isnan, axis=0)))
+    return total, nans
+
+
+def _rolling_min_max(values, window):
+    #rolling(window).min()/max(), NaN if the window holds a NaN
+    if values.ndim == 1:
+        rolling = pd.Series(values).rolling(window=window)
+        return rolling.min().to_numpy(), rolling.max().to_numpy()
+    # A panel: strided windows reduce every symbol at once instead of pandas' loop over columns
+    low, high = np.full(values.shape, np.nan), np.full(values.shape, np.nan)
+    if 1 <= window <= len(values):
+        windows = sliding_window_view(values, window, axis=0)
+        low[window - 1:], high[window - 1:] = windows.min(axis=-1), windows.max(axis=-1)
+    return low, high
+
+
+def _lookback(name, params):
+    #Bars before a bar that its value depends on
+    if name == 'rsi':
+        return params['periods']
+    if name in ('sma', 'wma'):
+        return params['window'] - 1
+    if name == 'hma':
+        return params['window'] - 1 + int(np.sqrt(params['window'])) - 1
+    if name == 'envelope':
+        return params['window'] - 1 if params['ma_type'].lower() == 'sma' else 0
+    if name == 'stoch_rsi':
+        return 2 * params['periods'] - 1 + params['smooth_k'] - 1 + params['smooth_d'] - 1
+    return 0
+
+
+def _comparable(series):
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return series.array.asi8
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(str).to_numpy()
+    return series.to_numpy()
+
+
+def _first_change(df, previous, columns):
+    #First row where any of the columns differ (NaN == NaN), or the shorter length
+    m = min(len(df), len(previous))
+    changed = np.zeros(m, dtype=bool)
+    for column in columns:
+        a, b = _comparable(df[column].iloc[:m]), _comparable(previous[column].iloc[:m])
+        same = a == b
+        if a.dtype.kind == 'f' and b.dtype.kind == 'f':
+            same |= np.isnan(a) & np.isnan(b)
+        changed |= ~np.asarray(same, dtype=bool)
+    return int(np.argmax(changed)) if changed.any() else m
+
+
+def _pandas(values):
+    #Series for one symbol, DataFrame (one column per symbol) for a panel
+    return pd.Series(values) if values.ndim == 1 else pd.DataFrame(values)
+
+
+class IndicatorPlan:
+    """
+    A compiled multi-indicator computation.
+
+    The spec is expanded into outputs, and every output is built from a graph of
+    memoized intermediates: the price diff, gains/losses (and their cumulative
+    sums) are computed once for every RSI period, WMAs are shared between WMA and
+    HMA outputs, EMAs/SMAs between moving averages and envelopes, and RSI between
+    RSI and Stochastic RSI outputs. Results go straight into one preallocated
+    (bars x outputs) block that becomes a DataFrame in a single step.
+
+    Outputs match the Indicator methods of the same name. compute() also takes a
+    2-D (time x symbol) panel and evaluates every node across all symbols at once,
+    see data_processing/panel.py.
+    """
+
+    def __init__(self, spec=None):
+        """
+        Compiles a spec.
+
+        Args:
+            spec (list[dict]): Entries like {'name': 'rsi', 'params': {'periods': [3, 5]}},
+                               defaults to load_spec().
+        """
+        self.spec = spec if spec is not None else load_spec()
+        self.groups = expand_spec(self.spec)
+        self.columns = [column for _, _, columns in self.groups for column in columns]
+        duplicates = {c for c in self.columns if self.columns.count(c) > 1}
+        if duplicates:
+            raise ValueError(f'Duplicate output columns {sorted(duplicates)}')
+
+    @classmethod
+    def from_config(cls, config_path=CONFIG_PATH):
+        return cls(load_spec(config_path))
+
+    @property
+    def warmup(self):
+        """
+        Bars of history every output needs before a bar to come out the same as a full
+        recompute (EMAs excluded, they're seeded instead, see apply_incremental).
+        """
+        return max([_lookback(name, params) for name, params, _ in self.groups] or [0])
+
+    def ema_columns(self):
+        """
+        Output columns holding an EMA, by span (the state apply_incremental seeds from).
+
+        Returns:
+            dict: span -> column name
+        """
+        columns = {}
+        for name, params, names in self.groups:
+            if name == 'ema':
+                columns.setdefault(params['span'], names[0])
+            elif name == 'envelope' and params['ma_type'].lower() == 'ema':
+                columns.setdefault(params['window'], names[0])
+        return columns
+
+    def compute(self, close, out=None, cache=None, ema_seeds=None):
+        """
+        Evaluates the plan over a close price array.
+
+        Args:
+            close (ndarray or Series): Close prices, oldest first. A 2-D (time x symbol)
+                                       array computes every symbol in the same passes.
+            out (ndarray): Optional preallocated float64 block, see Returns for the shape.
+            cache (IndicatorCache): Optional memo, the whole block is reused while the
+                                    close prices and the plan stay the same.
+            ema_seeds (dict): span -> EMA value at the bar before close[0], continues an
+                              EMA from an earlier run instead of restarting it (1-D only).
+
+        Returns:
+            ndarray: The output block, (bars, outputs) or (bars, outputs, symbols) for a panel,
+                     outputs in the order of self.columns.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        if cache is not None and not ema_seeds:
+            block = cache.memoize(fingerprint(close), 'plan', lambda: self.compute(close), groups=repr(self.groups))
+            if out is None:
+                return block.copy()
+            out[...] = block
+            return out
+        if out is None:
+            out = np.empty((len(close), len(self.columns)) + close.shape[1:], dtype=np.float64)
+        memo = {'ema_seeds': ema_seeds or {}}
+        col = 0
+        for name, params, columns in self.groups:
+            values = getattr(self, f'_{name}')(memo, close, **params)
+            for value in (values if isinstance(values, tuple) else (values,)):
+                out[:, col] = value
+                col += 1
+        return out
+
+    def apply(self, df, cache=None):
+        """
+        Computes the plan over df['close'] and returns df with the outputs appended.
+
+        Args:
+            df (DataFrame): Bars with a 'close' column.
+            cache (IndicatorCache): Optional memo, see compute().
+
+        Returns:
+            DataFrame: A new frame, the input columns followed by self.columns.
+        """
+        return self.join(df, self.compute(df['close'].to_numpy(dtype=np.float64), cache=cache))
+
+    def apply_incremental(self, df, previous):
+        """
+        Brings an earlier apply() output up to date with df, recomputing only what changed.
+
+        The first row where df differs from previous (a new bar, or a revised one such as
+        the bar that was still open last run) is found by comparing their shared columns.
+        Indicators are recomputed from `warmup` bars before it, with every EMA seeded from
+        its value in previous, and the untouched rows of previous are kept as they are.
+        Matches apply(df) to float rounding (rolling sums restart at the tail).
+
+        Args:
+            df (DataFrame): The full, current bars.
+            previous (DataFrame): apply() output for an earlier version of df, or None.
+
+        Returns:
+            tuple: (DataFrame like apply(df), index of the first recomputed row)
+        """
+        if previous is None or any(c not in previous.columns for c in self.columns):
+            return self.apply(df), 0
+        inputs = [c for c in df.columns if c in previous.columns and c not in self.columns]
+        first_new = _first_change(df, previous, inputs)
+        if first_new == len(df) == len(previous):
+            return previous, first_new
+
+        close = df['close'].to_numpy(dtype=np.float64)
+        start = max(first_new - self.warmup, 0)
+        # An EMA state carries over exactly only after an observed close
+        while start > 0 and np.isnan(close[start - 1]):
+            start -= 1
+        seeds = {span: float(previous[column].iloc[start - 1]) for span, column in self.ema_columns().items()} \
+            if start > 0 else None
+
+        block = self.compute(close[start:], ema_seeds=seeds)
+        tail = self.join(df.iloc[first_new:], block[first_new - start:])
+        return pd.concat([previous.iloc[:first_new], tail[previous.columns]]), first_new
+
+    def join(self, df, block):
+        """
+        Appends a (len(df), len(self.columns)) output block to df, replacing same-named columns.
+
+        Returns:
+            DataFrame: A new frame, the input columns followed by self.columns.
+        """
+        outputs = pd.DataFrame(block, columns=self.columns, index=df.index, copy=False)
+        return pd.concat([df.drop(columns=[c for c in self.columns if c in df.columns]), outputs], axis=1)
+
+    #Intermediates, memoized per compute() call
+
+    def _node(self, memo, key, fn):
+        if key not in memo:
+            memo[key] = fn()
+        return memo[key]
+
+    def _gain_loss_sums(self, memo, close):
+        def build():
+            delta = np.diff(close, axis=0, prepend=np.full((1,) + close.shape[1:], np.nan))
+            gain = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+            loss = np.where(np.isnan(delta), np.nan, -np.minimum(delta, 0.0))
+            return _cumsums(gain), _cumsums(loss)
+        return self._node(memo, ('gain_loss_sums',), build)
+
+    def _ema(self, memo, close, span):
+        def build():
+            seed = memo['ema_seeds'].get(span)
+            if seed is None:
+                return _pandas(close).ewm(span=span, adjust=False).mean().to_numpy()
+            # The seed as a first observation continues the recursion exactly where it left off
+            return pd.Series(np.concatenate(([seed], close))).ewm(span=span, adjust=False).mean().to_numpy()[1:]
+        return self._node(memo, ('ema', span), build)
+
+    def _sma(self, memo, close, window):
+        return self._node(memo, ('sma', window),
+                          lambda: _pandas(close).rolling(window=window).mean().to_numpy())
+
+    def _wma(self, memo, close, window, source='close'):
+        return self._node(memo, ('wma', source, window), lambda: weighted_moving_average(close, window))
+
+    def _rsi(self, memo, close, periods):
+        def build():
+            gains, losses = self._gain_loss_sums(memo, close)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rs = rolling_mean_cumsum(gains, periods) / rolling_mean_cumsum(losses, periods)
+                return 100 - (100 / (1 + rs))
+        return self._node(memo, ('rsi', periods), build)
+
+    def _hma(self, memo, close, window):
+        def build():
+            half = self._wma(memo, close, int(window / 2))
+            full = self._wma(memo, close, window)
+            diff = 2 * half - full
+            return self._wma(memo, diff, int(np.sqrt(window)), source=('hma_diff', window))
+        return self._node(memo, ('hma', window), build)
+
+    def _envelope(self, memo, close, window, percentage, ma_type):
+        if ma_type.lower() == 'sma':
+            ma = self._sma(memo, close, window)
+        elif ma_type.lower() == 'ema':
+            ma = self._ema(memo, close, window)
+        else:
+            raise ValueError("ma_type must be 'sma' or 'ema'")
+        return ma, ma + ma * percentage, ma - ma * percentage
+
+    def _stoch_rsi(self, memo, close, periods, smooth_k, smooth_d):
+        def build():
+            rsi = self._rsi(memo, close, periods)
+            low, high = _rolling_min_max(rsi, periods)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                stoch = (rsi - low) / (high - low)
+            k = rolling_mean_cumsum(_cumsums(stoch), smooth_k)
+            d = rolling_mean_cumsum(_cumsums(k), smooth_d)
+            return k * 100, d * 100
+        return self._node(memo, ('stoch_rsi', periods, smooth_k, smooth_d), build)
@@ -1,22 +1,125 @@
+import functools
+import inspect
 import pandas as pd
 import numpy as np
+from data_processing.indicator_cache import fingerprint
+
+# Rolling statistics run over chunks of this many bars (plus window-1 bars of overlap),
+# so pandas' per-call buffers (a float64 copy of the input, window start/end indexes)
+# are sized to the chunk instead of the whole history
+ROLLING_CHUNK = 1 << 20
+
+def weighted_moving_average(values, window):
+    """
+    Vectorized WMA over a 1-D array, weights 1..window (newest bar heaviest).
+
+    One C-level sliding dot product (np.correlate) instead of a Python call per row.
+    Matches rolling(window).apply(...) exactly on warm-up: the first window-1 values,
+    and any value whose window contains a NaN, are NaN.
+
+    A 2-D (time x symbol) array is handled column-wise in `window` whole-array passes
+    (one shifted, weighted add per lag) rather than a loop over columns.
+
+    Args:
+        values (ndarray): The input values, 1-D or 2-D with time on axis 0. float32 input
+                          is computed and returned in float32, anything else in float64.
+        window (int): The number of periods.
+
+    Returns:
+        ndarray: WMA values, same shape as the input.
+    """
+    dtype = np.float32 if np.asarray(values).dtype == np.float32 else np.float64
+    out = np.full(np.shape(values), np.nan, dtype=dtype)
+    if window < 1 or len(values) < window:
+        return out
+    weights = np.arange(1, window + 1, dtype=dtype)
+    if np.ndim(values) == 1:
+        out[window - 1:] = np.correlate(values, weights, mode='valid') / weights.sum()
+        return out
+    n = len(values) - window + 1
+    total = np.zeros((n,) + np.shape(values)[1:], dtype=dtype)
+    for lag, weight in enumerate(weights):
+        total += weight * values[lag:lag + n]
+    out[window - 1:] = total / weights.sum()
+    return out
+
+def _copy_result(value):
+    #Cached results are shared, hand out copies so callers can't edit the cache
+    if isinstance(value, tuple):
+        return tuple(_copy_result(v) for v in value)
+    return value.copy()
+
+def _as_dtype(value, dtype):
+    if isinstance(value, tuple):
+        return tuple(_as_dtype(v, dtype) for v in value)
+    return value.astype(dtype)
+
+def _memoized(method):
+    """
+    Serves an Indicator method from self.cache when the close prices and arguments
+    were seen before (no-op when the Indicator has no cache), and casts results to
+    the Indicator's dtype.
+    """
+    signature = inspect.signature(method)
+
+    def compute(self, *args, **kwargs):
+        value = method(self, *args, **kwargs)
+        return value if self.dtype is None else _as_dtype(value, self.dtype)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.cache is None:
+            return compute(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = {k: v for k, v in bound.arguments.items() if k != 'self'}
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint(self.df['close'], self.df.index)
+        value = self.cache.memoize(self._fingerprint, method.__name__, lambda: compute(self, *args, **kwargs), **params)
+        return _copy_result(value)
+    return wrapper
 
 class Indicator:
     """
     A class to calculate various technical indicators on a given DataFrame.
     """
 
-    def __init__(self,df):
+    def __init__(self,df, copy=True, cache=None, dtype=None, outputs=None):
         """
         Initializes the Indicator class with a DataFrame.
         Base Columns Available: ['open']['high']['low']['close']['volume']['ts']
 
+        For big histories, the lean combination is Indicator(df, copy=False, dtype=np.float32,
+        outputs=[...]): no copy of the source, float32 close and results, and one
+        preallocated output block instead of a frame that grows column by column.
+
         Args:
             df (DataFrame): The input DataFrame containing market data
+            copy (bool): Deep-copy the input. Pass False to wrap the caller's columns as-is,
+                         e.g. read-only views from a BarStore; added indicator columns
+                         never touch the caller's frame either way.
+            cache (IndicatorCache): Optional memo (data_processing/indicator_cache.py), results
+                                    are reused while the close prices stay the same.
+            dtype: Optional result dtype, e.g. np.float32. The close column is converted once
+                   and every result is returned in this dtype. pandas' rolling/ewm still
+                   accumulate in float64 internally (rolling results are stored straight
+                   into float32); diffs and WMA/HMA run in float32.
+            outputs (list[str]): Column names to preallocate one (bars x outputs) block for.
+                                 add_indicator() writes those in place and get_dataframe()
+                                 attaches the block in one step.
         """
-        self.df = df.copy()
-        if 'close' not in self.df.columns:
+        if 'close' not in df.columns:
             raise ValueError ("DataFrame must contain a 'close' column for indicator calculations.")
+        self.df = df.copy(deep=copy)
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+        if self.dtype is not None and self.df['close'].dtype != self.dtype:
+            self.df['close'] = self.df['close'].astype(self.dtype)
+        self.cache = cache
+        self._fingerprint = None
+
+        self.outputs = list(outputs or [])
+        self._block = np.full((len(self.df), len(self.outputs)), np.nan, dtype=self.dtype or np.float64)
+        self._slots = {name: i for i, name in enumerate(self.outputs)}
     
     def add_indicator(self, indicator_name, data_series):
         """
@@ -26,17 +129,47 @@ class Indicator:
             indicator_name(str): The name of the indicator to add as a column
             data_series (Series): The Pandas Series containing the indicator data.
         """
+        if indicator_name in self._slots:
+            self._block[:, self._slots[indicator_name]] = np.asarray(data_series)
+            return
         self.df[indicator_name] = data_series
+        self._fingerprint = None
 
     def get_dataframe(self):
         """
         Returns the DataFrame with added indicators. Combo with a .copy()
 
+        Preallocated outputs (see __init__) are attached as they are when this is called,
+        unfilled ones as NaN.
+
         Returns:
             DataFrame: the DataFrame containing market data and indicators.
         """
-        return self.df
+        if not self.outputs:
+            return self.df
+        block = pd.DataFrame(self._block, columns=self.outputs, index=self.df.index, copy=False)
+        return pd.concat([self.df, block], axis=1)
+
+    def _rolling(self, series, window, stat):
+        """
+        series.rolling(window).<stat>() computed in ROLLING_CHUNK pieces, in the Indicator's dtype.
 
+        Args:
+            series (Series): The input values.
+            window (int): The number of periods.
+            stat (str): 'mean', 'min' or 'max'.
+
+        Returns:
+            Series: Same index as the input.
+        """
+        out = np.empty(len(series), dtype=self.dtype or np.float64)
+        for start in range(0, len(series), ROLLING_CHUNK):
+            lead = min(start, max(window - 1, 0))
+            piece = getattr(series.iloc[start - lead:start + ROLLING_CHUNK].rolling(window=window), stat)()
+            out[start:start + ROLLING_CHUNK] = piece.to_numpy()[lead:]
+        return pd.Series(out, index=series.index, name=series.name, copy=False)
+
+    @_memoized
     def ema (self, span, adjust=False):
         """
         Calculates the Exponential Moving Average (EMA).
@@ -52,6 +185,7 @@ class Indicator:
         ema_series = self.df['close'].ewm(span=span, adjust=adjust).mean()
         return ema_series
     
+    @_memoized
     def sma (self, window):
         """
         Calculates the Simple Moving Average (SMA).
@@ -62,10 +196,11 @@ class Indicator:
         Returns:
             Series: A Pandas Series containing the SMA values.
         """
-        sma_series = self.df['close'].rolling(window=window).mean()
+        sma_series = self._rolling(self.df['close'], window, 'mean')
         return sma_series
 
 
+    @_memoized
     def rsi(self, periods=14):
         """
         Calculates sthe Relative Strength Index (RSI).
@@ -76,15 +211,17 @@ class Indicator:
         Returns:
             Series: A Pandas Series containing the RSI Values
         """
+        #Intermediates are dropped as soon as they're used, keeps the peak memory down on long histories
         delta = self.df['close'].diff()
-        gain = delta.clip(lower = 0)
-        loss = -delta.clip(upper = 0)
-        avg_gain = gain.rolling(window=periods).mean()
-        avg_loss = loss.rolling(window=periods).mean()
+        avg_gain = self._rolling(delta.clip(lower = 0), periods, 'mean')
+        avg_loss = self._rolling(-delta.clip(upper = 0), periods, 'mean')
+        del delta
         rs = avg_gain / avg_loss
+        del avg_gain, avg_loss
         rsi = 100 - (100 / (1 + rs))
         return rsi
     
+    @_memoized
     def wma(self,window):
         """
         Calculates the Weighted Moving Average (WMA).
@@ -97,10 +234,7 @@ class Indicator:
         Returns:
             Series: A Pandas Series containing the WMA values.
         """
-        weights = np.arange(1, window + 1)
-        wma_series = self.df['close'].rolling(window).apply(
-            lambda prices: np.dot(prices,weights) / weights.sum(), raw=True)
-        return wma_series
+        return self.wma_on_series(self.df['close'], window)
     
     def wma_on_series(self, series, window):
         """
@@ -114,11 +248,11 @@ class Indicator:
             Series: A PAndas Series containing te WMA values.
         """
 
-        weights = np.arange(1, window + 1)
-        wma_series = series.rolling(window).apply(
-            lambda prices:np.dot(prices,weights) / weights.sum(), raw=True)
-        return wma_series
+        dtype = np.float32 if series.dtype == np.float32 else np.float64
+        return pd.Series(weighted_moving_average(series.to_numpy(dtype=dtype), window),
+                         index=series.index, name=series.name)
     
+    @_memoized
     def hma(self, window):
         """
         Calculates the Hull Moving Average (HMA).
@@ -144,6 +278,7 @@ class Indicator:
         hma_series = self.wma_on_series(diff, sqrt_window)
         return hma_series
     
+    @_memoized
     def moving_average_envelopes(self, window, percentage=0.025, ma_type='sma'):
         """
         Calculates the Moving Average Envelopes.
@@ -167,15 +302,16 @@ class Indicator:
 
         if ma_type.lower() == 'sma':
             ma = self.sma(window)
-        if ma_type.lower() == 'ema':
+        elif ma_type.lower() == 'ema':
             ma = self.ema(window)
         else:
             raise ValueError("ma_type must be 'sma' or 'ema'")
         
         upper_envelope = ma + (ma * percentage)
-        lower_envelope = ma + (ma * percentage)
+        lower_envelope = ma - (ma * percentage)
         return ma, upper_envelope, lower_envelope
     
+    @_memoized
     def stocastic_rsi(self, periods=14, smooth_k=3, smooth_d=3):
         """
         Calculates the Stochastic RSI.
@@ -198,16 +334,19 @@ class Indicator:
         """
 
         rsi = self.rsi(periods)
-        min_rsi = rsi.rolling(window=periods).min()
-        max_rsi = rsi.rolling(window=periods).max()
-        stoch_rsi = (rsi - min_rsi) / (max_rsi - min_rsi)
+        min_rsi = self._rolling(rsi, periods, 'min')
+        range_rsi = self._rolling(rsi, periods, 'max') - min_rsi
+        stoch_rsi = (rsi - min_rsi) / range_rsi
+        del rsi, min_rsi, range_rsi
 
-        stoch_rsi_k = stoch_rsi.rolling(window=smooth_k).mean()
-        stoch_rsi_d = stoch_rsi_k.rolling(window=smooth_d).mean()
+        stoch_rsi_k = self._rolling(stoch_rsi, smooth_k, 'mean')
+        del stoch_rsi
+        stoch_rsi_d = self._rolling(stoch_rsi_k, smooth_d, 'mean')
 
+        # copy=False keeps %K and %D as separate columns instead of consolidating them into a new block
         stoch_rsi_df = pd.DataFrame({
             'StochRSI_%K': stoch_rsi_k * 100,
             'StochRSI_%D': stoch_rsi_d * 100
-        })
+        }, copy=False)
         return stoch_rsi_df
     
@@ -0,0 +1,74 @@
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Cross-symbol ("panel") indicator computation. Instead of one process per symbol
+# working on a single close column, all symbols of a timeframe are aligned on their
+# timestamps into one (time x symbol) array and every indicator node of an
+# IndicatorPlan runs once across all columns.
+#
+# Symbols that start late or stop early are padded with NaN before/after their own
+# bars; every indicator is causal and NaN-aware, so the padding leaves their values
+# unchanged. A symbol missing bars *inside* its range (a timestamp the others have)
+# would get extra NaN gaps, so those are computed on their own instead.
+
+
+def build_panel(frames):
+    """
+    Aligns the close prices of several symbols on the union of their timestamps.
+
+    Args:
+        frames (dict[str, DataFrame]): symbol -> bars with 'ts' and 'close'.
+
+    Returns:
+        tuple: (ts (DatetimeIndex), symbols (list), close (ndarray, time x symbol),
+                rows (dict symbol -> row positions of its bars in the panel))
+    """
+    symbols = list(frames)
+    if not symbols:
+        return pd.DatetimeIndex([]), [], np.empty((0, 0)), {}
+    stamps = {s: frames[s]['ts'].to_numpy(dtype='datetime64[ms]').view(np.int64) for s in symbols}
+    union = np.unique(np.concatenate(list(stamps.values())))
+    close = np.full((len(union), len(symbols)), np.nan)
+    rows = {}
+    for j, symbol in enumerate(symbols):
+        positions = np.searchsorted(union, stamps[symbol])
+        close[positions, j] = frames[symbol]['close'].to_numpy(dtype=np.float64)
+        rows[symbol] = positions
+    ts = pd.DatetimeIndex(pd.to_datetime(union, unit='ms', utc=True))
+    return ts, symbols, close, rows
+
+
+def _contiguous(positions):
+    return len(positions) > 0 and bool(np.all(np.diff(positions) == 1))
+
+
+def compute_panel(plan, frames, cache=None):
+    """
+    Runs an IndicatorPlan over many symbols in one set of wide numpy passes.
+
+    Args:
+        plan (IndicatorPlan): The indicators to compute.
+        frames (dict[str, DataFrame]): symbol -> bars with 'ts' and 'close', ascending.
+        cache (IndicatorCache): Optional memo, passed to plan.compute / plan.apply.
+
+    Returns:
+        dict[str, DataFrame]: symbol -> its bars with the plan's columns appended,
+                              identical to plan.apply(frames[symbol]).
+    """
+    ts, symbols, close, rows = build_panel(frames)
+    gapped = [s for s in symbols if not _contiguous(rows[s])]
+    if gapped:
+        logger.info(f'{gapped} have bars missing mid-range (or unsorted/duplicate ts), computing them on their own')
+
+    results = {symbol: plan.apply(frames[symbol], cache=cache) for symbol in gapped}
+    columns = [j for j, s in enumerate(symbols) if s not in results]
+    if columns:
+        block = plan.compute(close[:, columns], cache=cache)
+        for k, j in enumerate(columns):
+            symbol = symbols[j]
+            start, stop = rows[symbol][0], rows[symbol][-1] + 1
+            results[symbol] = plan.join(frames[symbol], block[start:stop, :, k])
+    return {symbol: results[symbol] for symbol in symbols}
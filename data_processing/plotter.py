@@ -8,59 +8,53 @@ import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from utils.storage_manager import StorageManager
 
-# initialize the storage manager
-storage_manager = StorageManager()
-
 # Define the list of symbols and timeframes
 symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'ARBUSDT']
 timeframes = ['15m', '30m', '60m', '240m']
 
-# Get the target date
-date = datetime.now().strftime('%m-%d-%Y')
 
-# Loop over each symbol and timeframe
+def main():
+    # initialize the storage manager
+    storage_manager = StorageManager()
+
+    # Get the target date
+    date = datetime.now().strftime('%m-%d-%Y')
 
-for symbol in symbols:
-    for timeframe in timeframes:
-        # Construct the path to the stored Parquet file
+    # Look up every processed Parquet file for the day in the catalog (one query, no exists() probes)
+    day_path = storage_manager.get_processed_path(date=date, create=False)
+    processed_files = {
+        (file_path.parent.parent.name, file_path.parent.name): file_path
+        for file_path in storage_manager.find_files(kind='processed', under=day_path, suffix='.parquet')
+    }
 
-        processed_data_path = Path(storage_manager.get_processed_path(
-            date_type='Date',
-            date=date,
-            symbol=symbol,
-            timeframe=timeframe
-        ))
+    # Loop over each symbol and timeframe
+    for symbol in symbols:
+        for timeframe in timeframes:
+            processed_file_path = processed_files.get((symbol, timeframe))
+            if processed_file_path is None:
+                print(f'No processed file catalogued for {symbol} {timeframe} on {date}')
+                continue
 
-        kline_path = Path(storage_manager.get_kline_path(
-            date_type='Date',
-            date=date,
-            symbol=symbol,
-            timeframe=timeframe
-        ))
-        filename = f'{symbol}_{timeframe}.parquet'
-        processed_file_path = processed_data_path / filename
+            # Load the data
+            df = storage_manager.read_parquet(processed_file_path)
 
-        # Check if the file exists
-        if not  processed_file_path.exists():
-            print(f'File not found: { processed_file_path }')
-            continue
+            # Plot the data
+            fig = plt.figure()
+            plt.plot(df['ts'], df['close'])
+            plt.title(f'{symbol} {timeframe} Close Prices')
+            plt.xlabel('Time')
+            plt.ylabel('Price')
+            plt.xticks(rotation=45)
+            plt.tight_layout()
 
-        # Load the data
-        df = pd.read_parquet( processed_file_path )
+            # Save the plot next to the processed file
+            storage_manager.save_figure(fig, f'{symbol}_{timeframe}_plot.png', processed_file_path.parent)
+            print(f'Plot saved to {processed_file_path.parent / f"{symbol}_{timeframe}_plot.png"}')
 
-        # Plot the data
-        plt.plot(df['ts'], df['close'])
-        plt.title(f'{symbol} {timeframe} Close Prices')
-        plt.xlabel('Time')
-        plt.ylabel('Price')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+            # Show the plot
+            plt.show()
+            plt.close(fig)
 
-        # Save the plot
-        plot_path = processed_file_path / f'{symbol}_{timeframe}_plot.png'
-        plt.savefig(plot_path)
-        print(f'Plot saved to {plot_path}')
 
-        # Show the plot
-        plt.show()
-        plt.close()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import os, sys
+import logging
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.constants import BAR_OFFSET_MS, interval_to_minutes, timeframe_label
+from utils.schema import ts_to_epoch_ms
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def resample_ohlcv(df, interval, source_interval='1', drop_incomplete=True):
+    """
+    Builds higher-timeframe bars from finer bars in a few vectorized numpy passes.
+
+    Buckets line up with the exchange's bars: multiples of the bar length since
+    the epoch (Monday 00:00 UTC for weekly). Each bucket gets the first open,
+    max high, min low, last close and summed volume of the bars inside it.
+
+    Args:
+        df (DataFrame): Source bars with 'ts' and OHLCV columns, sorted ascending.
+        interval (str): Target interval code, e.g. '15' or '240'.
+        source_interval (str): Interval code of the source bars.
+        drop_incomplete (bool): Drop buckets missing source bars (a partial first/last
+                                bucket, or gaps in the source).
+
+    Returns:
+        DataFrame: Resampled bars with the same columns, 'ts' = bucket open time.
+    """
+    step = interval_to_minutes(interval) * 60_000
+    source_step = interval_to_minutes(source_interval) * 60_000
+    if step % source_step:
+        raise ValueError(f'{interval} is not a multiple of {source_interval}')
+
+    if df.empty:
+        return df.iloc[0:0].copy()
+
+    ts = ts_to_epoch_ms(df['ts']).to_numpy()
+    if np.any(np.diff(ts) < 0):
+        order = np.argsort(ts, kind='stable')
+        df, ts = df.iloc[order], ts[order]
+
+    offset = BAR_OFFSET_MS.get(str(interval), 0)
+    bucket = (ts - offset) // step
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+    ends = np.append(starts[1:], len(bucket))
+
+    columns = {}
+    if 'symbol' in df.columns:
+        columns['symbol'] = df['symbol'].iloc[starts].to_numpy()
+    columns['open'] = df['open'].to_numpy()[starts]
+    columns['high'] = np.maximum.reduceat(df['high'].to_numpy(), starts)
+    columns['low'] = np.minimum.reduceat(df['low'].to_numpy(), starts)
+    columns['close'] = df['close'].to_numpy()[ends - 1]
+    columns['volume'] = np.add.reduceat(df['volume'].to_numpy(), starts)
+    columns['ts'] = pd.to_datetime(bucket[starts] * step + offset, unit='ms', utc=True).as_unit('ms')
+
+    out = pd.DataFrame(columns)
+    if 'symbol' in df.columns and isinstance(df['symbol'].dtype, pd.CategoricalDtype):
+        out['symbol'] = out['symbol'].astype(df['symbol'].dtype)
+
+    if drop_incomplete:
+        complete = (ends - starts) == step // source_step
+        out = out[complete].reset_index(drop=True)
+    return out
+
+
+def validate_resampled(derived, fetched, rtol=1e-6, atol=1e-9):
+    """
+    Compares locally derived bars against bars fetched from the API.
+
+    Only bars present in both are compared (matched on 'ts').
+
+    Args:
+        derived (DataFrame): Output of resample_ohlcv.
+        fetched (DataFrame): Bars of the same timeframe from get_kline_data.
+        rtol (float): Relative tolerance.
+        atol (float): Absolute tolerance.
+
+    Returns:
+        dict: {'compared': n, 'mismatches': {column: count}, 'max_abs_diff': {column: value}, 'ok': bool}
+    """
+    merged = pd.merge(derived[['ts'] + OHLCV_COLUMNS], fetched[['ts'] + OHLCV_COLUMNS],
+                      on='ts', suffixes=('_derived', '_fetched'))
+    report = {'compared': len(merged), 'mismatches': {}, 'max_abs_diff': {}}
+
+    for column in OHLCV_COLUMNS:
+        a = merged[f'{column}_derived'].to_numpy(dtype=np.float64)
+        b = merged[f'{column}_fetched'].to_numpy(dtype=np.float64)
+        report['mismatches'][column] = int((~np.isclose(a, b, rtol=rtol, atol=atol)).sum())
+        report['max_abs_diff'][column] = float(np.abs(a - b).max()) if len(a) else 0.0
+
+    report['ok'] = not any(report['mismatches'].values())
+    return report
+
+
+def build_timeframes(storage_manager, symbol, intervals, source_interval='1', append=True):
+    """
+    Derives higher timeframes for a symbol from its stored Historical source bars.
+
+    Only source bars from the first unfinished bucket of each target onward are
+    resampled, and the complete new bars are appended to that timeframe's
+    Historical dataset (the append drops anything at or before its watermark).
+
+    Args:
+        storage_manager (StorageManager): The storage manager.
+        symbol (str): The trading symbol.
+        intervals (list[str]): Target interval codes, e.g. ['15', '30', '60', '240'].
+        source_interval (str): Interval code of the stored source bars.
+        append (bool): Append the derived bars to Historical.
+
+    Returns:
+        dict: {interval: DataFrame of derived bars}
+    """
+    source = storage_manager.load_historical(symbol, timeframe_label(source_interval))
+    if source is None or source.empty:
+        logger.info(f'No {source_interval} bars stored for {symbol}')
+        return {}
+
+    derived = {}
+    for interval in intervals:
+        if str(interval) == str(source_interval):
+            continue
+        timeframe = timeframe_label(interval)
+
+        watermark = storage_manager.get_watermark(symbol, timeframe)
+        frame = source
+        if watermark is not None:
+            frame = source[source['ts'] > watermark]
+
+        bars = resample_ohlcv(frame, interval, source_interval=source_interval)
+        derived[interval] = bars
+        if append and not bars.empty:
+            storage_manager.append_historical(bars, symbol, timeframe)
+
+    return derived
@@ -0,0 +1,359 @@
+import os
+import json
+import math
+import uuid
+from collections import deque
+import numpy as np
+
+# Streaming counterparts of the Indicator methods. Each state object takes one bar
+# at a time through update(bar) and returns the newest value, in amortized O(1)
+# regardless of how much history came before, and matches the batch Indicator
+# output bar for bar (to float rounding). States serialize to plain dicts so a
+# live process can snapshot them to disk and pick up where it left off.
+
+NAN = float('nan')
+
+
+def _price(bar, field='close'):
+    """Accepts a bare number or anything indexable by field (dict, Series row, namedtuple via _asdict)"""
+    if isinstance(bar, (int, float, np.integer, np.floating)):
+        return float(bar)
+    return float(bar[field])
+
+
+def _divide(a, b):
+    #Float division with numpy semantics (x/0 -> inf, 0/0 -> nan) to match the pandas math
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / np.float64(b))
+
+
+class StreamingState:
+    """Base class: update(bar) -> latest value, state_dict() / from_state() for snapshots"""
+
+    field = 'close'
+
+    def update(self, bar):
+        raise NotImplementedError
+
+    def state_dict(self):
+        state = {'type': type(self).__name__}
+        for key, value in self.__dict__.items():
+            if isinstance(value, StreamingState):
+                value = value.state_dict()
+            elif isinstance(value, deque):
+                value = list(value)
+            state[key] = value
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        state = dict(state)
+        kind = state.pop('type')
+        obj = STATE_TYPES[kind].__new__(STATE_TYPES[kind])
+        for key, value in state.items():
+            if isinstance(value, dict) and 'type' in value:
+                value = StreamingState.from_state(value)
+            setattr(obj, key, value)
+        obj._restore()
+        return obj
+
+    def _restore(self):
+        #Turns plain lists from a snapshot back into the containers update() expects
+        pass
+
+
+class RollingWindow(StreamingState):
+    """
+    Last `window` values with running sum and linearly weighted sum (weights 1..window).
+
+    Sums are updated incrementally and recomputed exactly every `window` updates (or
+    once a NaN leaves the window), which keeps the per-bar cost amortized O(1) while
+    stopping floating point drift from building up.
+    """
+
+    def __init__(self, window):
+        self.window = int(window)
+        self.values = deque(maxlen=max(self.window, 1))
+        self.total = 0.0
+        self.weighted = 0.0
+        self.nan_count = 0
+        self.since_refresh = 0
+
+    def _restore(self):
+        self.values = deque(self.values, maxlen=max(self.window, 1))
+
+    def push(self, value):
+        full = len(self.values) == self.window
+        oldest = self.values[0] if full else None
+        self.values.append(value)
+
+        if math.isnan(value):
+            self.nan_count += 1
+        if oldest is not None and math.isnan(oldest):
+            self.nan_count -= 1
+
+        self.since_refresh += 1
+        if self.nan_count or self.since_refresh >= self.window or (oldest is not None and math.isnan(oldest)) \
+                or math.isnan(self.total):
+            self._refresh()
+        elif full:
+            self.weighted += self.window * value - self.total
+            self.total += value - oldest
+        else:
+            self.total += value
+            self.weighted += len(self.values) * value
+
+    def _refresh(self):
+        if self.nan_count:
+            self.total = self.weighted = NAN
+            return
+        values = np.fromiter(self.values, dtype=np.float64, count=len(self.values))
+        self.total = float(values.sum())
+        self.weighted = float(np.dot(values, np.arange(1, len(values) + 1, dtype=np.float64)))
+        self.since_refresh = 0
+
+    @property
+    def ready(self):
+        return self.window >= 1 and len(self.values) == self.window and not self.nan_count
+
+    def mean(self):
+        return self.total / self.window if self.ready else NAN
+
+    def weighted_mean(self):
+        return self.weighted / (self.window * (self.window + 1) / 2) if self.ready else NAN
+
+
+class RollingExtremes(StreamingState):
+    """Rolling min and max over `window` values (monotonic deques, amortized O(1)); NaN if the window has a NaN"""
+
+    def __init__(self, window):
+        self.window = int(window)
+        self.count = 0
+        self.last_nan = None
+        self.mins = deque()
+        self.maxs = deque()
+
+    def _restore(self):
+        self.mins = deque(tuple(item) for item in self.mins)
+        self.maxs = deque(tuple(item) for item in self.maxs)
+
+    def push(self, value):
+        index = self.count
+        self.count += 1
+        if math.isnan(value):
+            self.last_nan = index
+        else:
+            while self.mins and self.mins[-1][1] >= value:
+                self.mins.pop()
+            self.mins.append((index, value))
+            while self.maxs and self.maxs[-1][1] <= value:
+                self.maxs.pop()
+            self.maxs.append((index, value))
+
+        for side in (self.mins, self.maxs):
+            while side and side[0][0] <= index - self.window:
+                side.popleft()
+
+        if self.count < self.window or (self.last_nan is not None and self.last_nan > index - self.window):
+            return NAN, NAN
+        return self.mins[0][1], self.maxs[0][1]
+
+
+class EMAState(StreamingState):
+    """Matches Indicator.ema / Series.ewm(span, adjust=False).mean(), NaN gaps included"""
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+        self.old_weight = 1.0
+
+    def update(self, bar):
+        price = _price(bar, self.field)
+        is_observation = not math.isnan(price)
+        if not math.isnan(self.value):
+            self.old_weight *= 1.0 - self.alpha
+            if is_observation:
+                if self.value != price:
+                    self.value = (self.old_weight * self.value + self.alpha * price) / (self.old_weight + self.alpha)
+                self.old_weight = 1.0
+        elif is_observation:
+            self.value = price
+        return self.value
+
+
+class SMAState(StreamingState):
+    """Matches Indicator.sma / rolling(window).mean()"""
+
+    def __init__(self, window):
+        self.window = RollingWindow(window)
+
+    def update(self, bar):
+        self.window.push(_price(bar, self.field))
+        return self.window.mean()
+
+
+class WMAState(StreamingState):
+    """Matches Indicator.wma / wma_on_series"""
+
+    def __init__(self, window):
+        self.window = RollingWindow(window)
+
+    def update(self, bar):
+        self.window.push(_price(bar, self.field))
+        return self.window.weighted_mean()
+
+
+class HMAState(StreamingState):
+    """Matches Indicator.hma: WMA(2 * WMA(n/2) - WMA(n), sqrt(n))"""
+
+    def __init__(self, window):
+        self.half = WMAState(int(window / 2))
+        self.full = WMAState(window)
+        self.smooth = WMAState(int(np.sqrt(window)))
+
+    def update(self, bar):
+        price = _price(bar, self.field)
+        diff = 2 * self.half.update(price) - self.full.update(price)
+        return self.smooth.update(diff)
+
+
+class RSIState(StreamingState):
+    """Matches Indicator.rsi (simple rolling averages of gains and losses)"""
+
+    def __init__(self, periods=14):
+        self.previous = NAN
+        self.gains = RollingWindow(periods)
+        self.losses = RollingWindow(periods)
+
+    def update(self, bar):
+        price = _price(bar, self.field)
+        delta = price - self.previous
+        self.previous = price
+        if math.isnan(delta):
+            self.gains.push(NAN)
+            self.losses.push(NAN)
+        else:
+            self.gains.push(max(delta, 0.0))
+            self.losses.push(-min(delta, 0.0))
+        rs = _divide(self.gains.mean(), self.losses.mean())
+        return 100 - _divide(100, 1 + rs)
+
+
+class EnvelopeState(StreamingState):
+    """Matches Indicator.moving_average_envelopes, returns (ma, upper, lower)"""
+
+    def __init__(self, window, percentage=0.025, ma_type='sma'):
+        if ma_type.lower() == 'sma':
+            self.ma = SMAState(window)
+        elif ma_type.lower() == 'ema':
+            self.ma = EMAState(window)
+        else:
+            raise ValueError("ma_type must be 'sma' or 'ema'")
+        self.percentage = percentage
+
+    def update(self, bar):
+        ma = self.ma.update(bar)
+        return ma, ma + ma * self.percentage, ma - ma * self.percentage
+
+
+class StochRSIState(StreamingState):
+    """Matches Indicator.stocastic_rsi, returns (%K, %D)"""
+
+    def __init__(self, periods=14, smooth_k=3, smooth_d=3):
+        self.rsi = RSIState(periods)
+        self.extremes = RollingExtremes(periods)
+        self.k = RollingWindow(smooth_k)
+        self.d = RollingWindow(smooth_d)
+
+    def update(self, bar):
+        rsi = self.rsi.update(bar)
+        low, high = self.extremes.push(rsi)
+        self.k.push(_divide(rsi - low, high - low))
+        k = self.k.mean()
+        self.d.push(k)
+        return k * 100, self.d.mean() * 100
+
+
+STATE_TYPES = {cls.__name__: cls for cls in (RollingWindow, RollingExtremes, EMAState, SMAState, WMAState, HMAState,
+                                             RSIState, EnvelopeState, StochRSIState)}
+
+
+class StreamingIndicators:
+    """
+    A named set of streaming states fed from the same bars.
+
+    Example:
+        stream = StreamingIndicators({'EMA5': EMAState(5), 'RSI_14': RSIState(14)})
+        stream.warm_up(history_df)
+        latest = stream.update({'close': 61234.5})  # {'EMA5': ..., 'RSI_14': ...}
+        stream.save('storage/state/BTCUSDT_15m.json')
+    """
+
+    def __init__(self, states=None, last_ts=None):
+        """
+        Initializes the StreamingIndicators.
+
+        Args:
+            states (dict[str, StreamingState]): Output name -> state.
+            last_ts (int): Epoch ms of the last bar fed in, kept in snapshots.
+        """
+        self.states = states or {}
+        self.last_ts = last_ts
+
+    def update(self, bar, ts=None):
+        """
+        Feeds one bar to every state.
+
+        Args:
+            bar: A close price, or a mapping with 'close' (and 'ts').
+            ts (int): The bar's epoch ms, recorded so a restored stream knows where it stopped.
+
+        Returns:
+            dict: Output name -> latest value (a tuple for envelopes / Stochastic RSI).
+        """
+        latest = {name: state.update(bar) for name, state in self.states.items()}
+        if ts is None and not isinstance(bar, (int, float, np.integer, np.floating)) and 'ts' in bar:
+            ts = bar['ts']
+        if ts is not None:
+            self.last_ts = ts if isinstance(ts, (int, np.integer)) else int(ts.value // 1_000_000)
+        return latest
+
+    def warm_up(self, df):
+        """
+        Feeds historical bars in order (e.g. after a restart without a snapshot).
+
+        Args:
+            df (DataFrame): Bars with 'close' (and 'ts'), ascending.
+
+        Returns:
+            dict: The values after the last bar.
+        """
+        latest = {}
+        ts = df['ts'] if 'ts' in df.columns else None
+        for i, price in enumerate(df['close'].to_numpy(dtype=np.float64)):
+            latest = self.update(float(price), ts=ts.iloc[i] if ts is not None else None)
+        return latest
+
+    def state_dict(self):
+        return {'last_ts': self.last_ts, 'states': {name: state.state_dict() for name, state in self.states.items()}}
+
+    @classmethod
+    def from_state(cls, state):
+        states = {name: StreamingState.from_state(s) for name, s in state['states'].items()}
+        return cls(states, last_ts=state.get('last_ts'))
+
+    def save(self, file_path):
+        """Snapshots every state to a JSON file (temp file then rename)"""
+        file_path = os.fspath(file_path)
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        tmp_path = f'{file_path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state_dict(), f)
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        """Restores a stream saved with save()"""
+        with open(file_path) as f:
+            return cls.from_state(json.load(f))
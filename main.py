@@ -1,14 +1,16 @@
+import argparse
 import pandas as pd
-from api_clients import ApiBitunix
+from api_clients import ApiBitunix, BarBoundaryCache
+from api_clients.response_cache import DEFAULT_CACHE_DIR
 from data_processing import Indicator
 from dotenv import load_dotenv
 
 #Load Environment Variables
 load_dotenv()
 
-def main():
-    #Initialize the API
-    client = ApiBitunix()
+def main(cache=False):
+    #Initialize the API - with cache=True repeat runs inside the same bar are served from the cache
+    client = ApiBitunix(cache=BarBoundaryCache(cache_dir=DEFAULT_CACHE_DIR) if cache else None)
 
     #Fetch K-Line data for a specific symbol and interval
     symbol = 'BTCUSDT'
@@ -17,13 +19,10 @@ def main():
 
     if df_kline is not None:
         # df_kline has columns: ['symbol', 'open', 'high', 'low', 'close', 'volume', 'ts']
-        #Confirm Data Types
-        df_kline['close'] = pd.to_numeric(df_kline['close'], errors='coerce')
-        df_kline['ts'] = pd.to_datetime(df_kline['ts'])
-
+        # already typed (float OHLCV, UTC datetime ts) and sorted ascending by get_kline_data
 
         #Initialize the Indicator with DF we just pulled
-        indicators = Indicator(df_kline)
+        indicators = Indicator(df_kline, copy=False)
 
         #Calculate EMA with a span of 5
         ema5 = indicators.ema(span=5)
@@ -42,4 +41,8 @@ def main():
         print (df_with_indicators)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Fetch BTCUSDT Kline data and print a few indicators.')
+    parser.add_argument('--cache', action='store_true',
+                        help='Serve repeat requests within the same bar from the response cache')
+    args = parser.parse_args()
+    main(cache=args.cache)
\ No newline at end of file
@@ -1,83 +1,61 @@
-import os
 import pandas as pd
 
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from utils.storage_manager import StorageManager
 
-def get_most_recent_folder(path):
+def load_latest_processed(storage_manager, symbol, timeframe):
     """
-    Retrieves the most recently modified folder within the given path.
+    Loads the most recently written processed Parquet file for a series.
+
+    Uses the StorageManager catalog instead of listing folders and comparing mtimes.
 
     Args:
-        path (str): The directory path to search.
+        storage_manager (StorageManager): The storage manager.
+        symbol (str): The trading symbol, e.g. 'BTCUSDT'
+        timeframe (str): The timeframe folder name, e.g. '15m'
 
     Returns:
-        str: The path to the most recent folder.
+        tuple[Path, pandas.DataFrame]: The file and the loaded DataFrame.
     """
-    folders = [os.path.join(path, d) for d in os.listdir(path) 
-               if os.path.isdir(os.path.join(path, d))]
-    if not folders:
-        raise FileNotFoundError("No folders found in the base storage path.")
-    most_recent_folder = max(folders, key=os.path.getmtime)
-    return most_recent_folder
+    file_path = storage_manager.find_latest('processed', symbol, timeframe)
+    if file_path is None:
+        raise FileNotFoundError(f"No processed Parquet file catalogued for {symbol} {timeframe}.")
+    return file_path, storage_manager.read_parquet(file_path)
 
-def load_most_recent_parquet(storage_path):
+def load_bar_view(storage_manager, symbol, timeframe, start=None, end=None):
     """
-    Loads the most recent Parquet file from the specified storage path.
+    Wraps a window of the memory-mapped bar store as a DataFrame, without reading Parquet.
+
+    The price columns are read-only views shared with every other process mapping the
+    same series; call .copy() before modifying them in place.
 
     Args:
-        storage_path (str): The directory path to search for Parquet files.
+        storage_manager (StorageManager): The storage manager.
+        symbol (str): The trading symbol, e.g. 'BTCUSDT'
+        timeframe (str): The timeframe folder name, e.g. '15m'
+        start: Inclusive start of the window (epoch ms, datetime or string), None for all.
+        end: Exclusive end of the window, None for all.
 
     Returns:
-        pandas.DataFrame: The loaded DataFrame from the Parquet file.
+        pandas.DataFrame: The bars in the window.
     """
-    parquet_files = [os.path.join(storage_path, f) 
-                    for f in os.listdir(storage_path) 
-                    if f.endswith('.parquet')]
-    
-    if not parquet_files:
-        raise FileNotFoundError("No Parquet files found in the most recent folder.")
-    
-    most_recent_parquet = max(parquet_files, key=os.path.getmtime)
-    df = pd.read_parquet(most_recent_parquet)
-    return df
+    if not storage_manager.has_bar_store(symbol, timeframe):
+        raise FileNotFoundError(f"No bar store for {symbol} {timeframe}, run utils/bar_store.py first.")
+    return storage_manager.get_bar_store(symbol, timeframe).to_frame(start, end)
 
 if __name__ == "__main__":
     storage_manager = StorageManager()
-    
-    # Retrieve the base storage path from StorageManager
-    base_storage_path = storage_manager.get_processed_path()  # Use the new method
-    
-    print(f"Base Storage Path: {base_storage_path}")  # Debug statement
-    
-    # Dynamically get the most recent folder within the base storage path
-    try:
-        storage_path = get_most_recent_folder(base_storage_path)
-        print(f"Most Recent Folder: {storage_path}")  # Debug statement
-    except FileNotFoundError as e:
-        print(e)
-        sys.exit(1)
-    
-    #todo- Specify the timeframe you want to navigate to
-    timeframe = '15m'
-    timeframe_path = os.path.join(storage_path, timeframe)
-
-        # Check if the timeframe folder exists
-    if not os.path.exists(timeframe_path):
-        print(f"Timeframe folder not found: {timeframe_path}")
-        sys.exit(1)
 
-    print(f'Navigating into Timeframe folder: {timeframe_path}')
+    #todo- Specify the symbol and timeframe you want to load
+    symbol = 'BTCUSDT'
+    timeframe = '15m'
 
-    # List files in the most recent folder for debugging
-    print(f"Files in {timeframe_path}:")
-    for file in os.listdir(timeframe_path):
-        print(f" - {file}")
-    
     # Load the most recent Parquet file
     try:
-        df = load_most_recent_parquet(storage_path)
+        file_path, df = load_latest_processed(storage_manager, symbol, timeframe)
+        print(f"Most Recent File: {file_path}")
         print(df.info())
     except FileNotFoundError as e:
-        print(e)
\ No newline at end of file
+        print(e)
+        sys.exit(1)
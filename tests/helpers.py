@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+
+def make_bars(periods, start='2024-10-01', freq='1min', seed=None, symbol='BTCUSDT'):
+    """
+    OHLCV bars in the typed layout the API client returns and the storage layer reads.
+
+    Args:
+        periods (int): Number of bars.
+        start (str): Open time of the first bar (UTC).
+        freq (str): Bar length, e.g. '1min' or '15min'.
+        seed (int): Closes are a random walk from 100 with this seed; None gives a
+                    100, 101, 102, ... ramp so tests can assert exact values.
+        symbol (str): The symbol column.
+
+    Returns:
+        DataFrame: symbol, open, high, low, close, volume, ts
+    """
+    if seed is None:
+        close = 100 + np.arange(periods, dtype=np.float64)
+    else:
+        close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, periods))
+    return pd.DataFrame({
+        'symbol': pd.Categorical([symbol] * periods),
+        'open': close - 0.5, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': np.ones(periods),
+        'ts': pd.date_range(start, periods=periods, freq=freq, tz='UTC').as_unit('ms')
+    })
@@ -0,0 +1,46 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pandas as pd
+from api_clients.api_client_bitunix import ApiBitunix
+from api_clients.mock_bitunix import MockBitunixServer
+
+
+class TestApiBitunix(unittest.TestCase):
+    def setUp(self):
+        self.server = MockBitunixServer(bars=50, seed=1).start()
+        self.client = ApiBitunix(base_url=self.server.base_url, backoff_factor=0, backoff_jitter=0)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_get_kline_data_is_typed_and_sorted(self):
+        df = self.client.get_kline_data('BTCUSDT', '15')
+
+        #50 bars plus the stale first row, which gets dropped
+        self.assertEqual(len(df), 50)
+        self.assertTrue(df['ts'].is_monotonic_increasing)
+        self.assertEqual(str(df['ts'].dtype), 'datetime64[ms, UTC]')
+        self.assertEqual(df['close'].dtype, 'float64')
+        self.assertEqual(df['ts'].diff().dropna().unique().tolist(), [pd.Timedelta(minutes=15)])
+
+    def test_session_reuses_connections(self):
+        for _ in range(3):
+            self.client.get_kline_data('ETHUSDT', '1')
+        stats = self.client.get_stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['new_connections'], 1)
+        self.assertEqual(stats['reused_connections'], 2)
+
+    def test_retries_on_server_errors(self):
+        self.server.error_rate = 0.3
+        for _ in range(5):
+            self.assertIsNotNone(self.client.get_kline_data('SOLUSDT', '5'))
+        self.assertGreater(self.server.counts['errors'], 0)
+
+    def test_get_latest_price(self):
+        self.assertIsNotNone(self.client.get_latest_price('BTCUSDT'))
+        self.assertIsNone(self.client.get_latest_price(''))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+from pathlib import Path
+import pandas as pd
+import pyarrow.parquet as pq
+from utils.storage_manager import StorageManager
+from utils.async_writer import AsyncWriter, WriteError
+
+
+class TestAsyncWriter(unittest.TestCase):
+    def setUp(self):
+        self.test_base_path = 'test_storage'
+        self.storage_manager = StorageManager(base_path=self.test_base_path)
+        self.df = pd.DataFrame({
+            'close': [float(i) for i in range(1000)],
+            'ts': pd.date_range('2024-10-01', periods=1000, freq='1min', tz='UTC')
+        })
+        self.path = self.storage_manager.get_kline_path(date_type='Date', date='10-01-2024',
+                                                        symbol='BTCUSDT', timeframe='1m')
+
+    def tearDown(self):
+        self.storage_manager.catalog.close()
+        shutil.rmtree(self.test_base_path)
+
+    def test_parquet_options_and_flush(self):
+        with AsyncWriter(self.storage_manager, compression='zstd', compression_level=5, row_group_size=250) as writer:
+            targets = writer.save(self.df, 'BTCUSDT_1m', self.path)
+            writer.flush()
+            self.assertEqual(writer.stats()['written'], 1)
+
+        metadata = pq.ParquetFile(targets['parquet']).metadata
+        self.assertEqual(metadata.num_row_groups, 4)
+        self.assertEqual(metadata.row_group(0).column(0).compression, 'ZSTD')
+        self.assertFalse((self.path / 'BTCUSDT_1m.csv').exists())
+        self.assertEqual(self.storage_manager.find_latest('raw', 'BTCUSDT', '1m'), targets['parquet'])
+
+    def test_csv_is_opt_in(self):
+        with AsyncWriter(self.storage_manager, formats=('parquet', 'csv'), compression='snappy') as writer:
+            targets = writer.save(self.df, 'BTCUSDT_1m', self.path)
+        self.assertTrue(targets['csv'].exists())
+        self.assertEqual(len(pd.read_csv(targets['csv'])), 1000)
+
+    def test_same_file_writes_keep_order(self):
+        with AsyncWriter(self.storage_manager, max_workers=4) as writer:
+            for n in range(1, 6):
+                writer.save(self.df.head(n), 'BTCUSDT_1m', self.path)
+        self.assertEqual(len(pd.read_parquet(self.path / 'BTCUSDT_1m.parquet')), 5)
+
+    def test_errors_surface_on_flush(self):
+        writer = AsyncWriter(self.storage_manager)
+        # A file where the target folder should be
+        blocker = Path(self.test_base_path) / 'blocker'
+        blocker.write_text('')
+        writer.save(self.df, 'BTCUSDT_1m', blocker / 'folder')
+        with self.assertRaises(WriteError) as ctx:
+            writer.flush()
+        self.assertEqual(len(ctx.exception.errors), 1)
+        # Errors are reported once, the writer keeps working
+        writer.save(self.df, 'BTCUSDT_1m', self.path)
+        writer.close()
+        self.assertEqual(writer.stats()['failed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pathlib import Path
+import shutil
+import pandas as pd
+from utils.storage_manager import StorageManager
+from api_clients.backfill import KlineBackfiller
+from api_clients.api_client_bitunix import parse_kline_payload
+
+
+class FakeApi:
+    """Serves 1m bars for any window, newest first like the real endpoint"""
+
+    def __init__(self, fail_pages=None):
+        self.calls = []
+        self.fail_pages = set(fail_pages or [])
+
+    def get_kline_data(self, symbol, interval='1', start_time=None, end_time=None, limit=None, drop_first=True):
+        self.calls.append(start_time)
+        if start_time in self.fail_pages:
+            return None
+        ts = pd.date_range(pd.Timestamp(start_time, unit='ms', tz='UTC'),
+                           pd.Timestamp(end_time, unit='ms', tz='UTC'), freq='1min')
+        rows = [{'symbol': symbol, 'open': '1', 'high': '2', 'low': '0.5', 'close': str(i),
+                 'volume': '3', 'ts': t.strftime('%Y-%m-%dT%H:%M:%SZ')} for i, t in enumerate(ts)]
+        return parse_kline_payload(rows[::-1], drop_first=drop_first)
+
+
+class TestKlineBackfiller(unittest.TestCase):
+    def setUp(self):
+        self.test_base_path = 'test_storage'
+        self.storage_manager = StorageManager(base_path=self.test_base_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_base_path)
+
+    def test_backfill_writes_deduplicated_history(self):
+        backfiller = KlineBackfiller(api=FakeApi(), storage_manager=self.storage_manager,
+                                     page_size=60, requests_per_second=1000)
+        file_path = backfiller.backfill('BTCUSDT', '1', '2024-10-01 00:30', '2024-10-01 05:00')
+
+        df = pd.read_parquet(file_path)
+        self.assertEqual(len(df), 270)
+        self.assertTrue(df['ts'].is_monotonic_increasing)
+        self.assertFalse(df['ts'].duplicated().any())
+        self.assertEqual(file_path.parent, Path(self.test_base_path) / 'Kline' / 'Historical' / 'BTCUSDT' / '1m')
+
+    def test_backfill_resumes_from_checkpoint(self):
+        first_api = FakeApi()
+        backfiller = KlineBackfiller(api=first_api, storage_manager=self.storage_manager,
+                                     page_size=60, requests_per_second=1000)
+        pages = backfiller.plan_pages('1', 1727740800000, 1727740800000 + 4 * 3_600_000)
+        first_api.fail_pages = {pages[2][0]}
+
+        self.assertIsNone(backfiller.backfill('BTCUSDT', '1', 1727740800000, 1727740800000 + 4 * 3_600_000))
+        self.assertEqual(len(first_api.calls), 4)
+
+        second_api = FakeApi()
+        backfiller.api = second_api
+        file_path = backfiller.backfill('BTCUSDT', '1', 1727740800000, 1727740800000 + 4 * 3_600_000)
+
+        #Only the failed page is refetched
+        self.assertEqual(second_api.calls, [pages[2][0]])
+        self.assertEqual(len(pd.read_parquet(file_path)), 240)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import numpy as np
+from utils.storage_manager import StorageManager
+from utils.bar_store import BarStore
+from data_processing.indicators import Indicator
+from tests.helpers import make_bars
+
+
+class TestBarStore(unittest.TestCase):
+    def setUp(self):
+        self.test_base_path = 'test_storage'
+        self.storage_manager = StorageManager(base_path=self.test_base_path)
+
+    def tearDown(self):
+        self.storage_manager.catalog.close()
+        shutil.rmtree(self.test_base_path)
+
+    def test_append_and_zero_copy_slice(self):
+        store = self.storage_manager.get_bar_store('BTCUSDT', '1m')
+        self.assertEqual(store.append(make_bars(10, '2024-10-01')), 10)
+        # Overlapping batch, only the 5 new bars land
+        self.assertEqual(store.append(make_bars(10, '2024-10-01 00:05')), 5)
+        self.assertEqual(len(store), 15)
+
+        df = store.to_frame('2024-10-01 00:03', '2024-10-01 00:08')
+        self.assertEqual(len(df), 5)
+        self.assertEqual(df['close'].tolist(), [103.0, 104.0, 105.0, 106.0, 107.0])
+        self.assertEqual(str(df['ts'].dtype), 'datetime64[ms, UTC]')
+        self.assertEqual(df['symbol'].iloc[0], 'BTCUSDT')
+
+        maps = store.arrays()
+        self.assertTrue(np.shares_memory(df['close'].to_numpy(), maps['close']))
+        self.assertTrue(np.shares_memory(df['ts'].array._ndarray, maps['ts']))
+
+        # Another reader of the same folder sees the same bars
+        reader = BarStore(store.path)
+        self.assertEqual(reader.to_frame()['ts'].tolist(), store.to_frame()['ts'].tolist())
+
+    def test_indicator_wraps_view(self):
+        store = self.storage_manager.get_bar_store('BTCUSDT', '1m')
+        store.append(make_bars(30, '2024-10-01'))
+        df = store.to_frame()
+
+        indicator = Indicator(df, copy=False)
+        indicator.add_indicator('SMA5', indicator.sma(5))
+        self.assertTrue(np.shares_memory(indicator.get_dataframe()['close'].to_numpy(), store.arrays()['close']))
+        self.assertNotIn('SMA5', df.columns)
+        self.assertAlmostEqual(indicator.get_dataframe()['SMA5'].iloc[-1], 127.0)
+
+    def test_append_historical_feeds_store(self):
+        self.storage_manager.append_historical(make_bars(10, '2024-10-01'), 'BTCUSDT', '1m')
+        self.assertEqual(self.storage_manager.sync_bar_store('BTCUSDT', '1m'), 10)
+
+        self.storage_manager.append_historical(make_bars(5, '2024-10-01 00:10'), 'BTCUSDT', '1m')
+        store = self.storage_manager.get_bar_store('BTCUSDT', '1m')
+        self.assertEqual(len(store), 15)
+        self.assertEqual(self.storage_manager.sync_bar_store('BTCUSDT', '1m'), 0)
+
+        # A backfill before the first bar rebuilds the store
+        self.storage_manager.merge_historical(make_bars(5, '2024-09-30 23:55'), 'BTCUSDT', '1m')
+        store = self.storage_manager.get_bar_store('BTCUSDT', '1m')
+        self.assertEqual(len(store), 20)
+        self.assertTrue(np.all(np.diff(store.arrays()['ts']) == 60_000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import pandas as pd
+from utils.storage_manager import StorageManager
+
+
+class TestStorageCatalog(unittest.TestCase):
+    def setUp(self):
+        self.test_base_path = 'test_storage'
+        self.storage_manager = StorageManager(base_path=self.test_base_path)
+        self.bars = pd.DataFrame({
+            'close': [1.0, 2.0, 3.0],
+            'ts': pd.date_range('2024-10-01', periods=3, freq='15min', tz='UTC')
+        })
+
+    def tearDown(self):
+        self.storage_manager.catalog.close()
+        shutil.rmtree(self.test_base_path)
+
+    def test_saves_are_catalogued(self):
+        path = self.storage_manager.get_processed_path(date='10-01-2024', symbol='BTCUSDT', timeframe='15m')
+        file_path = self.storage_manager.save_parquet(self.bars, 'BTCUSDT_15m.parquet', path)
+
+        row = self.storage_manager.catalog.get(file_path)
+        self.assertEqual((row['kind'], row['symbol'], row['timeframe']), ('processed', 'BTCUSDT', '15m'))
+        self.assertEqual(row['row_count'], 3)
+        self.assertEqual(row['ts_max'] - row['ts_min'], 30 * 60_000)
+        self.assertEqual(self.storage_manager.find_latest('processed', 'BTCUSDT', '15m'), file_path)
+        self.assertIsNone(self.storage_manager.find_latest('processed', 'ETHUSDT', '15m'))
+
+    def test_find_files_by_time_range(self):
+        for day in ['10-01-2024', '10-02-2024']:
+            bars = self.bars.assign(ts=pd.date_range(pd.Timestamp(day, tz='UTC'), periods=3, freq='15min'))
+            path = self.storage_manager.get_kline_path(date_type='Date', date=day, symbol='ETHUSDT', timeframe='15m')
+            self.storage_manager.save_parquet(bars, 'ETHUSDT_15m.parquet', path)
+
+        files = self.storage_manager.find_files(kind='raw', symbol='ETHUSDT', timeframe='15m',
+                                                start='2024-10-02', end='2024-10-03')
+        self.assertEqual(len(files), 1)
+        self.assertIn('10-02-2024', str(files[0]))
+
+    def test_rebuild_catalog(self):
+        path = self.storage_manager.get_kline_path(date_type='Historical', symbol='SOLUSDT', timeframe='60m')
+        self.bars.to_parquet(path / 'SOLUSDT_60m.parquet', index=False)
+        self.assertIsNone(self.storage_manager.find_latest('raw', 'SOLUSDT', '60m'))
+
+        self.assertEqual(self.storage_manager.rebuild_catalog(), 1)
+        self.assertEqual(self.storage_manager.find_latest('raw', 'SOLUSDT', '60m'), path / 'SOLUSDT_60m.parquet')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from utils.storage_manager import StorageManager
+from utils.compaction import compact
+
+
+class TestCompaction(unittest.TestCase):
+    def setUp(self):
+        self.test_base_path = 'test_storage'
+        self.storage_manager = StorageManager(base_path=self.test_base_path)
+
+    def tearDown(self):
+        self.storage_manager.catalog.close()
+        shutil.rmtree(self.test_base_path)
+
+    def write_snapshot(self, day, start, periods):
+        ts = pd.date_range(start, periods=periods, freq='15min', tz='UTC').as_unit('ms')
+        df = pd.DataFrame({
+            'symbol': pd.Categorical(['BTCUSDT'] * periods),
+            'open': np.arange(periods, dtype=float), 'high': 1.0, 'low': 0.0, 'close': 1.0, 'volume': 1.0,
+            'ts': ts
+        })
+        # The snapshot is taken 5 minutes into its last bar, so that bar is still forming
+        df.loc[df.index[-1], 'close'] = -1.0
+        path = self.storage_manager.get_kline_path(date_type='Date', date=day, symbol='BTCUSDT', timeframe='15m')
+        file_path = self.storage_manager.save_parquet(df, 'BTCUSDT_15m.parquet', path)
+        taken = (ts[-1] + pd.Timedelta(minutes=5)).timestamp()
+        os.utime(file_path, (taken, taken))
+        return file_path
+
+    def test_merges_overlapping_snapshots(self):
+        first = self.write_snapshot('10-01-2024', '2024-10-01', 96)
+        second = self.write_snapshot('10-02-2024', '2024-10-01 12:00', 96)
+
+        reports = compact(self.storage_manager, prune=True, row_group_size=50)
+        report = reports[('BTCUSDT', '15m')]
+        self.assertEqual(report['files'], 2)
+        # 48 + 96 distinct bars, minus the bar still open in the newest snapshot
+        self.assertEqual(report['rows_out'], 143)
+
+        history = self.storage_manager.load_historical('BTCUSDT', '15m')
+        self.assertTrue(history['ts'].is_monotonic_increasing)
+        self.assertFalse(history['ts'].duplicated().any())
+        self.assertFalse((history['close'] == -1.0).any())
+        self.assertEqual(pq.ParquetFile(self.storage_manager.get_historical_file('BTCUSDT', '15m')).num_row_groups, 3)
+
+        self.assertFalse(first.exists() or second.exists())
+        self.assertFalse((self.storage_manager.base_path / 'Kline' / 'Date' / '10-01-2024').exists())
+        self.assertIsNone(self.storage_manager.catalog.get(first))
+
+    def test_keeps_snapshots_without_prune(self):
+        first = self.write_snapshot('10-01-2024', '2024-10-01', 10)
+        compact(self.storage_manager)
+        self.assertTrue(first.exists())
+        self.assertEqual(len(self.storage_manager.load_historical('BTCUSDT', '15m')), 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import tempfile
+from data_processing import daily_cruncher
+from data_processing.indicator_plan import IndicatorPlan
+from utils.storage_manager import StorageManager
+from tests.helpers import make_bars
+
+
+class TestDailyCruncher(unittest.TestCase):
+    def setUp(self):
+        # The cruncher works on ./storage
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir)
+
+    def test_incremental_run(self):
+        storage_manager = StorageManager()
+        date = daily_cruncher.get_todays_date()
+        path = storage_manager.get_kline_path(date_type='Date', date=date, symbol='BTCUSDT', timeframe='15m')
+        bars = make_bars(1000, freq='15min', seed=4)
+        storage_manager.save_parquet(bars.iloc[:900], 'BTCUSDT_15m.parquet', path)
+        daily_cruncher.main(use_cache=False, workers=1, incremental=True)
+
+        storage_manager.save_parquet(bars, 'BTCUSDT_15m.parquet', path)
+        result = daily_cruncher.main(use_cache=False, workers=1, incremental=True, verify=True)[0]['result']
+        self.assertEqual(result['recomputed'], 100)
+        self.assertTrue(result['verified'])
+
+        processed = storage_manager.read_parquet(
+            storage_manager.get_processed_path(date=date, symbol='BTCUSDT', timeframe='15m') / 'BTCUSDT_15m.parquet')
+        self.assertEqual(len(processed), 1000)
+        plan = IndicatorPlan.from_config()
+        self.assertTrue(daily_cruncher.outputs_match(plan, processed, plan.apply(bars)))
+
+        # A rerun with nothing new does no compute or write
+        result = daily_cruncher.main(use_cache=False, workers=1, incremental=True)[0]['result']
+        self.assertEqual(result['recomputed'], 0)
+        self.assertNotIn('write', result)
+        storage_manager.catalog.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
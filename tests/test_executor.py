@@ -0,0 +1,89 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import time
+import shutil
+import tempfile
+import pandas as pd
+from data_processing.executor import TaskExecutor, compute_frames
+from data_processing.indicator_plan import IndicatorPlan, DEFAULT_SPEC
+from data_processing import daily_cruncher
+from utils.storage_manager import StorageManager
+from tests.helpers import make_bars
+
+
+def started_at(task):
+    time.sleep(0.01)
+    if task == 'boom':
+        raise ValueError('boom')
+    return time.time()
+
+
+class TestTaskExecutor(unittest.TestCase):
+    def test_largest_first_and_errors(self):
+        tasks = ['small', 'huge', 'boom', 'medium']
+        with TaskExecutor(max_workers=1) as executor:
+            results = executor.map(started_at, tasks, sizes=[1, 100, 0, 10])
+        self.assertEqual([r['task'] for r in results], tasks)
+        order = sorted((r['result'], r['task']) for r in results if r['result'] is not None)
+        self.assertEqual([task for _, task in order], ['huge', 'medium', 'small'])
+        self.assertIn('boom', results[2]['error'])
+        self.assertEqual(len({r['pid'] for r in results}), 1)
+        report = TaskExecutor.report(results)
+        self.assertIn('4 tasks, 1 failed', report)
+        self.assertNotIn('boom', report)
+
+    def test_compute_frames_shared_memory(self):
+        plan = IndicatorPlan(DEFAULT_SPEC)
+        frames = {('BTCUSDT', '15m'): make_bars(3000, freq='15min', seed=1),
+                  ('ETHUSDT', '240m'): make_bars(200, freq='15min', seed=2)}
+        with TaskExecutor(max_workers=2) as executor:
+            outputs, results = compute_frames(executor, plan, frames)
+        self.assertEqual([r['result'] for r in results], [3000, 200])
+        for key, df in frames.items():
+            pd.testing.assert_frame_equal(outputs[key], plan.apply(df))
+
+
+class TestCruncherExecutor(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir)
+
+    def test_main_processes_every_file(self):
+        storage_manager = StorageManager()
+        date = daily_cruncher.get_todays_date()
+        for symbol, timeframe, rows in [('BTCUSDT', '15m', 2000), ('ETHUSDT', '240m', 100)]:
+            path = storage_manager.get_kline_path(date_type='Date', date=date, symbol=symbol, timeframe=timeframe)
+            storage_manager.save_parquet(make_bars(rows, freq='15min', seed=3), f'{symbol}_{timeframe}.parquet', path)
+
+        results = daily_cruncher.main(use_cache=False, workers=2)
+        by_symbol = {r['task'][0]: r for r in results}
+        self.assertEqual(set(by_symbol), {'BTCUSDT', 'ETHUSDT'})
+        self.assertEqual(by_symbol['BTCUSDT']['size'], 2000)
+        self.assertEqual(by_symbol['BTCUSDT']['result']['rows'], 2000)
+        self.assertEqual(len(storage_manager.find_files(kind='processed')), 2)
+        storage_manager.catalog.close()
+
+    def test_unreadable_input_counts_as_failed(self):
+        storage_manager = StorageManager()
+        date = daily_cruncher.get_todays_date()
+        paths = {}
+        for symbol in ['BTCUSDT', 'ETHUSDT']:
+            path = storage_manager.get_kline_path(date_type='Date', date=date, symbol=symbol, timeframe='15m')
+            paths[symbol] = storage_manager.save_parquet(make_bars(200, freq='15min', seed=5), f'{symbol}_15m.parquet', path)
+        # Still catalogued, gone from disk
+        paths['ETHUSDT'].unlink()
+
+        for panel in (False, True):
+            results = daily_cruncher.main(panel=panel, use_cache=False, workers=1)
+            self.assertEqual(sum(1 for r in results if r['error']), 1)
+            self.assertIn(', 1 failed', TaskExecutor.report(results))
+        storage_manager.catalog.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+from unittest import mock
+import numpy as np
+import pandas as pd
+from data_processing.indicator_cache import IndicatorCache, fingerprint
+from data_processing.indicator_plan import IndicatorPlan, DEFAULT_SPEC
+from data_processing.indicators import Indicator
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = 'test_indicator_cache'
+        rng = np.random.default_rng(5)
+        self.df = pd.DataFrame({'close': 100 + np.cumsum(rng.normal(0, 1, 2000))})
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_fingerprint(self):
+        close = self.df['close'].to_numpy()
+        self.assertEqual(fingerprint(close), fingerprint(close.copy()))
+        self.assertNotEqual(fingerprint(close), fingerprint(close.astype(np.float32)))
+        changed = close.copy()
+        changed[-1] += 1e-9
+        self.assertNotEqual(fingerprint(close), fingerprint(changed))
+
+    def test_indicator_memoized_across_runs(self):
+        expected = Indicator(self.df).rsi(14)
+        cache = IndicatorCache(cache_dir=self.cache_dir)
+        self.assertTrue(Indicator(self.df, cache=cache).rsi(14).equals(expected))
+        self.assertTrue(Indicator(self.df, cache=cache).rsi(periods=14).equals(expected))
+        self.assertEqual(cache.stats()['memory_hits'], 1)
+
+        # A fresh process only has the disk tier
+        fresh = IndicatorCache(cache_dir=self.cache_dir)
+        with mock.patch.object(pd.Series, 'rolling', side_effect=AssertionError('recomputed')):
+            result = Indicator(self.df, cache=fresh).rsi(14)
+        self.assertTrue(result.equals(expected))
+        self.assertEqual(fresh.stats()['disk_hits'], 1)
+
+        # Results are copies, editing one leaves the cache intact
+        result.iloc[:] = 0
+        self.assertTrue(Indicator(self.df, cache=fresh).rsi(14).equals(expected))
+
+        # Different data or params miss
+        Indicator(self.df.iloc[:-1], cache=fresh).rsi(14)
+        Indicator(self.df, cache=fresh).rsi(13)
+        self.assertEqual(fresh.stats()['misses'], 2)
+
+    def test_plan_memoized(self):
+        plan = IndicatorPlan(DEFAULT_SPEC)
+        expected = plan.apply(self.df)
+        plan.apply(self.df, cache=IndicatorCache(cache_dir=self.cache_dir))
+        cache = IndicatorCache(cache_dir=self.cache_dir)
+        with mock.patch.object(IndicatorPlan, '_rsi', side_effect=AssertionError('recomputed')):
+            result = plan.apply(self.df, cache=cache)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_disk_size_bound(self):
+        entry = np.zeros(10_000)
+        cache = IndicatorCache(max_entries=1, cache_dir=self.cache_dir, max_bytes=3 * entry.nbytes)
+        for i in range(6):
+            cache.put(cache.make_key(str(i), 'x'), entry)
+            # Keep key 0 recently used so it survives eviction
+            os.utime(cache._disk_path(cache.make_key('0', 'x')))
+        files = os.listdir(self.cache_dir)
+        self.assertLessEqual(sum(os.path.getsize(os.path.join(self.cache_dir, f)) for f in files), 3 * entry.nbytes)
+        self.assertTrue(IndicatorCache(cache_dir=self.cache_dir).get(cache.make_key('0', 'x'))[0])
+        self.assertFalse(IndicatorCache(cache_dir=self.cache_dir).get(cache.make_key('1', 'x'))[0])
+
+    def test_memory_size_bound(self):
+        entry = np.zeros(10_000)
+        cache = IndicatorCache(cache_dir=None, max_memory_bytes=3 * entry.nbytes)
+        for i in range(6):
+            cache.put(cache.make_key(str(i), 'x'), entry)
+        self.assertEqual(cache.stats()['entries'], 3)
+        self.assertEqual(cache.stats()['memory_bytes'], 3 * entry.nbytes)
+        self.assertFalse(cache.get(cache.make_key('2', 'x'))[0])
+        self.assertTrue(cache.get(cache.make_key('5', 'x'))[0])
+
+        # Larger than the whole tier, never held in memory
+        cache.put(cache.make_key('big', 'x'), np.zeros(40_000))
+        self.assertEqual(cache.stats()['entries'], 3)
+
+        # Disk only: served from disk, nothing kept in the process
+        disk_only = IndicatorCache(max_entries=0, cache_dir=self.cache_dir)
+        disk_only.put(disk_only.make_key('0', 'x'), entry)
+        self.assertTrue(disk_only.get(disk_only.make_key('0', 'x'))[0])
+        self.assertEqual(disk_only.stats()['entries'], 0)
+        self.assertEqual(disk_only.stats()['disk_hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pandas as pd
+from data_processing.indicators import Indicator
+from data_processing.indicator_plan import IndicatorPlan, DEFAULT_SPEC, expand_spec
+
+
+class TestIndicatorPlan(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        close = 60000 + np.cumsum(rng.normal(0, 25, 3000))
+        close[[500, 501, 1700]] = np.nan
+        self.df = pd.DataFrame({'close': close})
+        self.indicator = Indicator(self.df)
+
+    def assert_matches(self, result, expected):
+        np.testing.assert_allclose(result, expected, rtol=1e-9)
+        self.assertTrue(result.isna().equals(expected.isna()))
+
+    def test_default_spec_matches_indicator(self):
+        result = IndicatorPlan(DEFAULT_SPEC).apply(self.df)
+        self.assertEqual(list(result.columns), ['close', 'RSI_3', 'RSI_5', 'RSI_8', 'RSI_13', 'RSI_21', 'WMA_10',
+                                               'HMA_20', 'EMA20', 'UpperEnvelope', 'LowerEnvelope',
+                                               'Stoch_RSI_%K', 'Stoch_RSI_%D'])
+        for period in [3, 5, 8, 13, 21]:
+            self.assert_matches(result[f'RSI_{period}'], self.indicator.rsi(period))
+        self.assert_matches(result['WMA_10'], self.indicator.wma(10))
+        self.assert_matches(result['HMA_20'], self.indicator.hma(20))
+
+        ma, upper, lower = self.indicator.moving_average_envelopes(window=20, percentage=0.02, ma_type='ema')
+        self.assert_matches(result['EMA20'], ma)
+        self.assert_matches(result['UpperEnvelope'], upper)
+        self.assert_matches(result['LowerEnvelope'], lower)
+
+        stoch = self.indicator.stocastic_rsi(periods=14, smooth_k=3, smooth_d=3)
+        self.assert_matches(result['Stoch_RSI_%K'], stoch['StochRSI_%K'])
+        self.assert_matches(result['Stoch_RSI_%D'], stoch['StochRSI_%D'])
+
+    def test_default_names_and_expansion(self):
+        spec = [{'name': 'sma', 'params': {'window': [5, 10]}},
+                {'name': 'ema', 'params': {'span': 9}},
+                {'name': 'envelope', 'params': {'window': 20}}]
+        self.assertEqual([name for name, _, _ in expand_spec(spec)], ['sma', 'sma', 'ema', 'envelope'])
+
+        plan = IndicatorPlan(spec)
+        self.assertEqual(plan.columns, ['SMA5', 'SMA10', 'EMA9', 'SMA20', 'UpperEnvelope_20', 'LowerEnvelope_20'])
+        result = plan.apply(self.df)
+        self.assert_matches(result['SMA5'], self.indicator.sma(5))
+        self.assert_matches(result['SMA10'], self.indicator.sma(10))
+        self.assert_matches(result['EMA9'], self.indicator.ema(9))
+        self.assert_matches(result['UpperEnvelope_20'], self.indicator.moving_average_envelopes(20)[1])
+
+    def test_incremental_matches_full(self):
+        plan = IndicatorPlan(DEFAULT_SPEC)
+        self.assertEqual(plan.warmup, 31)
+        df = self.df.assign(ts=pd.date_range('2024-10-01', periods=len(self.df), freq='15min', tz='UTC'))
+        full = plan.apply(df)
+
+        # Last run saw 200 fewer bars, and its last bar was still open (close since revised)
+        earlier = df.iloc[:-200].copy()
+        earlier.loc[earlier.index[-1], 'close'] += 5
+        result, first_new = plan.apply_incremental(df, plan.apply(earlier))
+        self.assertEqual(first_new, len(df) - 201)
+        self.assertEqual(list(result.columns), list(full.columns))
+        self.assertTrue(result.index.equals(full.index))
+        for column in plan.columns:
+            self.assert_matches(result[column], full[column])
+        self.assertTrue(result['EMA20'].equals(full['EMA20']))
+
+        # Nothing new: the previous output comes back untouched
+        unchanged, first_new = plan.apply_incremental(df, full)
+        self.assertIs(unchanged, full)
+        self.assertEqual(first_new, len(df))
+
+        # No usable previous output
+        self.assertEqual(plan.apply_incremental(df, None)[1], 0)
+        self.assertEqual(plan.apply_incremental(df, df.iloc[:100])[1], 0)
+
+    def test_rejects_bad_specs(self):
+        with self.assertRaises(ValueError):
+            IndicatorPlan([{'name': 'macd'}])
+        with self.assertRaises(ValueError):
+            IndicatorPlan([{'name': 'rsi', 'params': {'periods': [3, 5]}, 'columns': ['RSI']}])
+        with self.assertRaises(ValueError):
+            IndicatorPlan([{'name': 'sma', 'params': {'window': 10}}, {'name': 'sma', 'params': {'window': 10}}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import tempfile
+from benchmarks import indicator_suite
+
+
+class TestIndicatorSuite(unittest.TestCase):
+    def test_compare(self):
+        baseline = [{'case': 'rsi', 'rows': 1000, 'seconds': 0.010, 'peak_mb': 1.0},
+                    {'case': 'sma', 'rows': 1000, 'seconds': 0.001, 'peak_mb': 1.0}]
+        current = [{'case': 'rsi', 'rows': 1000, 'seconds': 0.0105, 'peak_mb': 1.0},
+                   # 3x slower but under min_seconds, only memory counts
+                   {'case': 'sma', 'rows': 1000, 'seconds': 0.003, 'peak_mb': 1.5},
+                   {'case': 'hma', 'rows': 1000, 'seconds': 1.0, 'peak_mb': 9.0}]
+        regressions = indicator_suite.compare(current, baseline, threshold=0.10, min_seconds=0.005)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('sma @ 1000 rows: peak memory', regressions[0])
+
+        current[0]['seconds'] = 0.02
+        self.assertEqual(len(indicator_suite.compare(current, baseline, threshold=0.10)), 2)
+
+    def test_run_and_compare_history(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history = os.path.join(tmp, 'history.json')
+            argv = ['--sizes', '500', '--repeat', '1', '--history', history]
+            self.assertEqual(indicator_suite.main(argv), 0)
+            runs = json.load(open(history))
+            self.assertEqual({r['case'] for r in runs[0]['results']}, set(indicator_suite.CASES))
+
+            # Doctor the baseline so the new run looks like a big regression
+            for result in runs[0]['results']:
+                result['seconds'] /= 100
+                result['peak_mb'] /= 100
+            indicator_suite.save_history(runs, history)
+            self.assertEqual(indicator_suite.main(argv + ['--compare', '--min-seconds', '0']), 1)
+            self.assertEqual(len(json.load(open(history))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
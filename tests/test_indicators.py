@@ -0,0 +1,106 @@
+import unittest, os, sys
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pandas as pd
+from data_processing.indicators import Indicator
+
+
+def reference_wma(series, window):
+    #The original rolling().apply() implementation
+    weights = np.arange(1, window + 1)
+    return series.rolling(window).apply(lambda prices: np.dot(prices, weights) / weights.sum(), raw=True)
+
+
+def reference_hma(series, window):
+    diff = 2 * reference_wma(series, int(window / 2)) - reference_wma(series, window)
+    return reference_wma(diff, int(np.sqrt(window)))
+
+
+class TestIndicator(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        close = 60000 + np.cumsum(rng.normal(0, 25, 3000))
+        close[[500, 501, 1700]] = np.nan
+        self.df = pd.DataFrame({'close': close})
+        self.indicator = Indicator(self.df)
+
+    def test_wma_matches_reference(self):
+        for window in [1, 2, 3, 9, 21, 200]:
+            expected = reference_wma(self.df['close'], window)
+            result = self.indicator.wma(window)
+            np.testing.assert_allclose(result, expected, rtol=1e-12)
+            self.assertTrue(result.isna().equals(expected.isna()))
+            self.assertTrue(result.index.equals(expected.index))
+
+    def test_wma_shorter_than_window(self):
+        self.assertTrue(Indicator(self.df.head(5)).wma(10).isna().all())
+
+    def test_hma_matches_reference(self):
+        for window in [4, 9, 16, 55]:
+            expected = reference_hma(self.df['close'], window)
+            result = self.indicator.hma(window)
+            np.testing.assert_allclose(result, expected, rtol=1e-12)
+            self.assertTrue(result.isna().equals(expected.isna()))
+
+    def test_chunked_rolling_matches_pandas(self):
+        with mock.patch('data_processing.indicators.ROLLING_CHUNK', 256):
+            indicator = Indicator(self.df)
+            np.testing.assert_allclose(indicator.sma(20), self.df['close'].rolling(20).mean(), rtol=1e-12)
+            self.assertTrue(indicator.rsi(14).equals(self.indicator.rsi(14)))
+
+
+class TestLeanIndicator(unittest.TestCase):
+    """copy=False + float32 + preallocated outputs, against the default float64 results"""
+
+    # float32 holds ~7 significant digits: price-scale averages stay within 1e-6 relative.
+    # RSI / Stochastic RSI are built from bar-to-bar diffs, which lose more precision
+    # (a 60000 close is only exact to ~0.004), so they're compared in absolute points (0-100 scale)
+    PRICE_RTOL = 1e-6
+    RSI_ATOL = 0.1
+    STOCH_ATOL = 0.5
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        close = 60000 + np.cumsum(rng.normal(0, 25, 20000))
+        close[[500, 501, 1700]] = np.nan
+        self.df = pd.DataFrame({'close': close, 'volume': np.ones(len(close))})
+        self.full = Indicator(self.df)
+        self.lean = Indicator(self.df, copy=False, dtype=np.float32, outputs=['RSI_14', 'WMA_10'])
+
+    def assert_close(self, result, expected, **tolerance):
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, expected, **tolerance)
+        self.assertTrue(result.isna().equals(expected.isna()))
+
+    def test_no_copy_of_source(self):
+        indicator = Indicator(self.df, copy=False)
+        self.assertTrue(np.shares_memory(indicator.df['volume'].to_numpy(), self.df['volume'].to_numpy()))
+        indicator.add_indicator('RSI_14', indicator.rsi(14))
+        self.assertNotIn('RSI_14', self.df.columns)
+
+    def test_float32_tolerances(self):
+        for window in [10, 20]:
+            self.assert_close(self.lean.sma(window), self.full.sma(window), rtol=self.PRICE_RTOL)
+            self.assert_close(self.lean.ema(window), self.full.ema(window), rtol=self.PRICE_RTOL)
+            self.assert_close(self.lean.wma(window), self.full.wma(window), rtol=self.PRICE_RTOL)
+            self.assert_close(self.lean.hma(window), self.full.hma(window), rtol=self.PRICE_RTOL)
+        for periods in [3, 14]:
+            self.assert_close(self.lean.rsi(periods), self.full.rsi(periods), rtol=0, atol=self.RSI_ATOL)
+        lean, full = self.lean.stocastic_rsi(), self.full.stocastic_rsi()
+        for column in full.columns:
+            self.assert_close(lean[column], full[column], rtol=0, atol=self.STOCH_ATOL)
+
+    def test_preallocated_outputs(self):
+        self.lean.add_indicator('RSI_14', self.lean.rsi(14))
+        self.lean.add_indicator('EMA20', self.lean.ema(20))
+        df = self.lean.get_dataframe()
+        self.assertEqual(list(df.columns), ['close', 'volume', 'EMA20', 'RSI_14', 'WMA_10'])
+        self.assertEqual(df['RSI_14'].dtype, np.float32)
+        self.assertTrue(df['RSI_14'].equals(self.lean.rsi(14)))
+        # Requested but never added
+        self.assertTrue(df['WMA_10'].isna().all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import pandas as pd
+from utils.storage_manager import StorageManager
+from utils.migrate_storage import migrate
+
+
+class TestMigrateStorage(unittest.TestCase):
+    def setUp(self):
+        self.test_base_path = 'test_storage'
+        self.storage_manager = StorageManager(base_path=self.test_base_path)
+        self.bars = pd.DataFrame({
+            'symbol': 'BTCUSDT',
+            'close': [float(i) for i in range(96)],
+            'ts': pd.date_range('2024-10-01', periods=96, freq='15min', tz='UTC')
+        })
+
+    def tearDown(self):
+        self.storage_manager.catalog.close()
+        shutil.rmtree(self.test_base_path)
+
+    def test_remove_clears_historical_watermark(self):
+        self.storage_manager.append_historical(self.bars, 'BTCUSDT', '15m')
+        self.assertEqual(self.storage_manager.get_watermark('BTCUSDT', '15m'), self.bars['ts'].iloc[-1])
+
+        self.assertEqual(migrate(self.storage_manager, remove=True), 1)
+        self.assertEqual(self.storage_manager.get_historical_parts('BTCUSDT', '15m'), [])
+        self.assertIsNone(self.storage_manager.get_watermark('BTCUSDT', '15m'))
+
+        # The history can be refilled from scratch
+        self.assertEqual(self.storage_manager.append_historical(self.bars, 'BTCUSDT', '15m'), 96)
+
+    def test_remove_drops_catalog_entries(self):
+        path = self.storage_manager.get_kline_path(date_type='Date', date='10-01-2024', symbol='BTCUSDT', timeframe='15m')
+        file_path = self.storage_manager.save_parquet(self.bars, 'BTCUSDT_15m.parquet', path)
+        self.assertIsNotNone(self.storage_manager.catalog.get(file_path))
+
+        self.assertEqual(migrate(self.storage_manager, remove=True), 1)
+        self.assertFalse(file_path.exists())
+        self.assertIsNone(self.storage_manager.catalog.get(file_path))
+        self.assertEqual(self.storage_manager.find_files(kind='raw', under=path.parent.parent), [])
+        self.assertEqual(len(self.storage_manager.read_dataset('BTCUSDT', '15m')), 96)
+
+
+if __name__ == '__main__':
+    unittest.main()
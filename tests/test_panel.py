@@ -0,0 +1,41 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+from data_processing.indicator_plan import IndicatorPlan, DEFAULT_SPEC
+from data_processing.panel import build_panel, compute_panel
+from tests.helpers import make_bars
+
+
+class TestPanel(unittest.TestCase):
+    def setUp(self):
+        self.plan = IndicatorPlan(DEFAULT_SPEC)
+        self.frames = {
+            'BTCUSDT': make_bars(400, '2024-10-01', freq='15min', seed=1),
+            'ETHUSDT': make_bars(400, '2024-10-01', freq='15min', seed=2),
+            # Listed later and with a NaN close of its own
+            'ARBUSDT': make_bars(250, '2024-10-02', freq='15min', seed=3),
+            # Missing bars mid-range, computed on its own
+            'SOLUSDT': make_bars(400, '2024-10-01', freq='15min', seed=4).drop(index=range(100, 110)).reset_index(drop=True),
+        }
+        self.frames['ARBUSDT'].loc[60, 'close'] = np.nan
+
+    def test_build_panel_alignment(self):
+        ts, symbols, close, rows = build_panel(self.frames)
+        self.assertEqual(len(ts), 400)
+        self.assertEqual(close.shape, (400, 4))
+        self.assertTrue(np.isnan(close[:96, symbols.index('ARBUSDT')]).all())
+        self.assertEqual(rows['ARBUSDT'][0], 96)
+
+    def test_matches_per_symbol_plan(self):
+        results = compute_panel(self.plan, self.frames)
+        self.assertEqual(list(results), list(self.frames))
+        for symbol, df in self.frames.items():
+            expected = self.plan.apply(df)
+            self.assertEqual(list(results[symbol].columns), list(expected.columns))
+            for column in self.plan.columns:
+                np.testing.assert_allclose(results[symbol][column], expected[column], rtol=1e-9, err_msg=column)
+                self.assertTrue(results[symbol][column].isna().equals(expected[column].isna()), column)
+
+
+if __name__ == '__main__':
+    unittest.main()
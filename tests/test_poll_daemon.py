@@ -0,0 +1,67 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import threading
+import pandas as pd
+from api_clients.poll_daemon import BarClosePoller, next_bar_close
+
+
+def ms(value):
+    return pd.Timestamp(value, tz='UTC').value // 1_000_000
+
+
+class FakeApi:
+    list_trading_symbols = ['BTCUSDT', 'ETHUSDT']
+    list_time_intervals = ['1', '15', '240', 'M']
+
+
+class TestBarClosePoller(unittest.TestCase):
+    def setUp(self):
+        self.poller = BarClosePoller(api=FakeApi(), storage_manager=object(), grace_seconds=2)
+
+    def tearDown(self):
+        self.poller.executor.shutdown(wait=True)
+
+    def test_next_bar_close(self):
+        now = ms('2024-10-01 03:07:30')
+        self.assertEqual(next_bar_close('1', now), ms('2024-10-01 03:08'))
+        self.assertEqual(next_bar_close('15', now), ms('2024-10-01 03:15'))
+        self.assertEqual(next_bar_close('240', now), ms('2024-10-01 04:00'))
+        self.assertEqual(next_bar_close('D', now), ms('2024-10-02'))
+        #2024-10-07 is a Monday
+        self.assertEqual(next_bar_close('W', now), ms('2024-10-07'))
+
+    def test_intervals_without_fixed_length_are_skipped(self):
+        self.assertEqual(self.poller.intervals, ['1', '15', '240'])
+
+    def test_due_intervals_are_coalesced(self):
+        self.poller.build_schedule(ms('2024-10-01 03:59:30'))
+
+        #Nothing is due until the grace period after the close has passed
+        self.assertEqual(self.poller.pop_due(ms('2024-10-01 04:00:01')), [])
+        self.assertEqual(sorted(self.poller.pop_due(ms('2024-10-01 04:00:02'))), ['1', '15', '240'])
+
+        #Only the 1m series comes due a minute later
+        self.assertEqual(self.poller.pop_due(ms('2024-10-01 04:01:02')), ['1'])
+
+    def test_in_flight_series_are_skipped(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_poll(symbol, interval):
+            calls.append((symbol, interval))
+            release.wait(5)
+            with self.poller._lock:
+                self.poller.in_flight.discard((symbol, interval))
+
+        self.poller.poll_series = slow_poll
+        first = self.poller.dispatch(['1'])
+        second = self.poller.dispatch(['1'])
+        release.set()
+        for future in first:
+            future.result()
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pandas as pd
+from data_processing.resampler import resample_ohlcv, validate_resampled
+from api_clients.api_client_bitunix import ApiBitunix
+from api_clients.mock_bitunix import MockBitunixServer
+
+
+class TestResampler(unittest.TestCase):
+    def setUp(self):
+        self.bars = pd.DataFrame({
+            'open': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0],
+            'high': [1.5, 2.5, 9.0, 4.5, 5.5, 6.5, 7.5],
+            'low': [0.5, 1.5, 2.5, 0.1, 4.5, 5.5, 6.5],
+            'close': [2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0],
+            'volume': [1.0, 1.0, 1.0, 1.0, 2.0, 2.0, 2.0],
+            'ts': pd.date_range('2024-10-01 00:01', periods=7, freq='1min', tz='UTC')
+        })
+
+    def test_buckets_are_aligned_and_aggregated(self):
+        out = resample_ohlcv(self.bars, '3', drop_incomplete=False)
+
+        #00:01-00:02 | 00:03-00:05 | 00:06-00:07
+        self.assertEqual(out['ts'].dt.strftime('%H:%M').tolist(), ['00:00', '00:03', '00:06'])
+        self.assertEqual(out['open'].tolist(), [1.0, 3.0, 6.0])
+        self.assertEqual(out['high'].tolist(), [2.5, 9.0, 7.5])
+        self.assertEqual(out['low'].tolist(), [0.5, 0.1, 5.5])
+        self.assertEqual(out['close'].tolist(), [3.0, 6.0, 8.0])
+        self.assertEqual(out['volume'].tolist(), [2.0, 4.0, 4.0])
+
+    def test_incomplete_buckets_are_dropped(self):
+        out = resample_ohlcv(self.bars, '3')
+        self.assertEqual(out['open'].tolist(), [3.0])
+
+    def test_matches_fetched_higher_timeframe(self):
+        with MockBitunixServer(bars=600) as server:
+            client = ApiBitunix(base_url=server.base_url)
+            one_minute = client.get_kline_data('BTCUSDT', '1')
+            fifteen = client.get_kline_data('BTCUSDT', '15')
+            client.close()
+
+        derived = resample_ohlcv(one_minute, '15')
+        report = validate_resampled(derived, fifteen)
+        self.assertGreater(report['compared'], 30)
+        self.assertTrue(report['ok'], report)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import pandas as pd
+from api_clients.response_cache import BarBoundaryCache
+from api_clients.api_client_bitunix import ApiBitunix
+from api_clients.mock_bitunix import MockBitunixServer
+
+
+def ms(value):
+    return pd.Timestamp(value, tz='UTC').value // 1_000_000
+
+
+class TestBarBoundaryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = 'test_cache'
+        self.cache = BarBoundaryCache(max_entries=2, cache_dir=self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_entry_expires_at_next_bar_close(self):
+        now = ms('2024-10-01 00:07')
+        key, expires_at = self.cache.make_key('kline', 'BTCUSDT', '15', now_ms=now)
+        self.assertEqual(expires_at, ms('2024-10-01 00:15'))
+
+        self.cache.put(key, {'code': '0'}, expires_at)
+        self.assertEqual(self.cache.get(key, now_ms=ms('2024-10-01 00:14:59')), {'code': '0'})
+        self.assertIsNone(self.cache.get(key, now_ms=ms('2024-10-01 00:15')))
+
+        #Same request in the next bar is a different key
+        next_key, _ = self.cache.make_key('kline', 'BTCUSDT', '15', now_ms=ms('2024-10-01 00:16'))
+        self.assertNotEqual(key, next_key)
+
+    def test_disk_tier_survives_new_instance(self):
+        now = ms('2024-10-01 00:07')
+        key, expires_at = self.cache.make_key('kline', 'ETHUSDT', '60', now_ms=now)
+        self.cache.put(key, [1, 2, 3], expires_at)
+
+        other = BarBoundaryCache(cache_dir=self.cache_dir)
+        self.assertEqual(other.get(key, now_ms=now), [1, 2, 3])
+        self.assertEqual(other.stats()['disk_hits'], 1)
+
+    def test_client_serves_repeats_from_cache(self):
+        with MockBitunixServer(bars=20) as server:
+            client = ApiBitunix(base_url=server.base_url, cache=BarBoundaryCache())
+            first = client.get_kline_data('BTCUSDT', '60')
+            second = client.get_kline_data('BTCUSDT', '60')
+            client.close()
+
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(server.counts['requests'], 1)
+        self.assertEqual(client.get_stats()['cache']['memory_hits'], 1)
+    def test_disk_tier_is_per_host(self):
+        with MockBitunixServer(bars=20) as first_server, MockBitunixServer(bars=20) as second_server:
+            first = ApiBitunix(base_url=first_server.base_url, cache=BarBoundaryCache(cache_dir=self.cache_dir))
+            second = ApiBitunix(base_url=second_server.base_url, cache=BarBoundaryCache(cache_dir=self.cache_dir))
+            first.get_kline_data('BTCUSDT', '60')
+            second.get_kline_data('BTCUSDT', '60')
+            first.close()
+            second.close()
+
+        self.assertEqual(first_server.counts['requests'], 1)
+        self.assertEqual(second_server.counts['requests'], 1)
+        self.assertEqual(second.get_stats()['cache']['disk_hits'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.storage_manager import StorageManager
+from utils.schema import to_storage, from_storage, convert_tree
+from utils.compaction import compact
+from tests.helpers import make_bars
+
+
+class TestStorageSchema(unittest.TestCase):
+    def setUp(self):
+        self.test_base_path = 'test_storage'
+        self.storage_manager = StorageManager(base_path=self.test_base_path)
+
+    def tearDown(self):
+        self.storage_manager.catalog.close()
+        shutil.rmtree(self.test_base_path)
+
+    def test_round_trip(self):
+        bars = make_bars(500)
+        stored = to_storage(bars, price_dtype=np.float32)
+        self.assertEqual(stored['ts'].dtype, np.int64)
+        self.assertEqual(stored['close'].dtype, np.float32)
+        self.assertEqual(stored['volume'].dtype, np.float32)
+        self.assertEqual(str(bars['ts'].dtype), 'datetime64[ms, UTC]')
+
+        restored = from_storage(stored.copy())
+        self.assertTrue(restored['ts'].equals(bars['ts']))
+        np.testing.assert_allclose(restored['close'], bars['close'], rtol=1e-6)
+
+    def test_writes_use_storage_schema(self):
+        path = self.storage_manager.get_kline_path(date_type='Historical', symbol='BTCUSDT', timeframe='1m')
+        file_path = self.storage_manager.save_parquet(make_bars(500), 'BTCUSDT_1m.parquet', path)
+
+        schema = pq.read_schema(file_path)
+        self.assertEqual(schema.field('ts').type, pa.int64())
+        self.assertEqual(schema.field('close').type, pa.float64())
+        self.assertEqual(schema.field('volume').type, pa.float32())
+        self.assertTrue(pa.types.is_dictionary(schema.field('symbol').type))
+
+        loaded = self.storage_manager.load_historical('BTCUSDT', '1m')
+        self.assertEqual(str(loaded['ts'].dtype), 'datetime64[ms, UTC]')
+        self.assertEqual(self.storage_manager.get_watermark('BTCUSDT', '1m'), make_bars(500)['ts'].iloc[-1])
+
+    def test_convert_legacy_file(self):
+        # The layout the API used to hand back: everything as strings
+        legacy = make_bars(500).astype(str)
+        path = self.storage_manager.get_kline_path(date_type='Date', date='10-01-2024', symbol='BTCUSDT', timeframe='1m')
+        legacy_path = path / 'BTCUSDT_1m.parquet'
+        legacy.to_parquet(legacy_path, index=False)
+
+        report = convert_tree(self.storage_manager)
+        self.assertEqual(report['converted'], 1)
+        self.assertEqual(pq.read_schema(legacy_path).field('ts').type, pa.int64())
+        self.assertEqual(convert_tree(self.storage_manager)['converted'], 0)
+
+        df = self.storage_manager.read_parquet(legacy_path)
+        self.assertTrue(df['ts'].equals(make_bars(500)['ts']))
+        self.assertEqual(df['close'].iloc[-1], make_bars(500)['close'].iloc[-1])
+
+    def test_convert_keeps_write_time(self):
+        # Two legacy 15m snapshots, each taken 7 minutes into its last (still forming) bar
+        taken = {}
+        for day, start in [('10-02-2024', '2024-10-01 12:00'), ('10-01-2024', '2024-10-01')]:
+            bars = make_bars(10, start, freq='15min')
+            bars.loc[bars.index[-1], 'close'] = -1.0
+            path = self.storage_manager.get_kline_path(date_type='Date', date=day, symbol='BTCUSDT', timeframe='15m')
+            file_path = path / 'BTCUSDT_15m.parquet'
+            bars.astype(str).to_parquet(file_path, index=False)
+            taken[file_path] = (bars['ts'].iloc[-1] + pd.Timedelta(minutes=7)).timestamp()
+            os.utime(file_path, (taken[file_path], taken[file_path]))
+
+        self.assertEqual(convert_tree(self.storage_manager)['converted'], 2)
+        for file_path, mtime in taken.items():
+            self.assertEqual(file_path.stat().st_mtime, mtime)
+            self.assertEqual(self.storage_manager.catalog.get(file_path)['written_at'], mtime)
+        newest = max(taken, key=taken.get)
+        self.assertEqual(self.storage_manager.find_latest('raw', 'BTCUSDT', '15m'), newest)
+
+        compact(self.storage_manager)
+        history = self.storage_manager.load_historical('BTCUSDT', '15m')
+        # 9 closed bars in each, none overlapping
+        self.assertEqual(len(history), 18)
+        self.assertFalse((history['close'] == -1.0).any())
+
+
+if __name__ == '__main__':
+    unittest.main()
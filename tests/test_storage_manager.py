@@ -106,5 +106,69 @@ class TestStorageManager(unittest.TestCase):
         self.assertEqual(path, expected_path)
         self.assertTrue(path.exists())
 
+    def test_append_historical_is_idempotent(self):
+        symbol = 'BTCUSDT'
+        timeframe = '15m'
+        bars = pd.DataFrame({
+            'close': [1.0, 2.0, 3.0],
+            'ts': pd.date_range('2024-10-01', periods=3, freq='15min', tz='UTC')
+        })
+
+        self.assertIsNone(self.storage_manager.get_watermark(symbol, timeframe))
+        self.assertEqual(self.storage_manager.append_historical(bars, symbol, timeframe), 3)
+        self.assertEqual(self.storage_manager.get_watermark(symbol, timeframe), bars['ts'].iloc[-1])
+
+        #Same bars again plus one new one - only the new one lands
+        more = pd.concat([bars, pd.DataFrame({'close': [4.0], 'ts': [bars['ts'].iloc[-1] + pd.Timedelta('15min')]})])
+        self.assertEqual(self.storage_manager.append_historical(more, symbol, timeframe), 1)
+        self.assertEqual(self.storage_manager.append_historical(more, symbol, timeframe), 0)
+
+        loaded = self.storage_manager.load_historical(symbol, timeframe)
+        self.assertEqual(loaded['close'].tolist(), [1.0, 2.0, 3.0, 4.0])
+
+    def test_partitioned_dataset_range_read(self):
+        bars = pd.DataFrame({
+            'symbol': 'BTCUSDT',
+            'open': range(96),
+            'close': [float(i) for i in range(96)],
+            'ts': pd.date_range('2024-10-01', periods=96, freq='60min', tz='UTC')
+        })
+        written = self.storage_manager.write_partitioned(bars, 'BTCUSDT', '60m')
+        self.assertEqual(len(written), 4)
+        self.assertEqual(written[0], Path(self.test_base_path) / 'Kline' / 'Dataset' / 'symbol=BTCUSDT' /
+                         'timeframe=60m' / 'date=2024-10-01' / 'data.parquet')
+
+        #Rewriting the same bars does not duplicate them
+        self.storage_manager.write_partitioned(bars, 'BTCUSDT', '60m')
+
+        df = self.storage_manager.read_dataset('BTCUSDT', '60m', start='2024-10-02 12:00',
+                                               end='2024-10-03 06:00', columns=['close'])
+        self.assertEqual(list(df.columns), ['ts', 'close'])
+        self.assertEqual(df['close'].tolist(), [float(i) for i in range(36, 54)])
+
+    def test_load_bars_range_and_chunks(self):
+        bars = pd.DataFrame({
+            'symbol': pd.Categorical(['BTCUSDT'] * 100),
+            'close': [float(i) for i in range(100)],
+            'ts': pd.date_range('2024-10-01', periods=100, freq='15min', tz='UTC').as_unit('ms')
+        })
+        path = self.storage_manager.get_kline_path(date_type='Historical', symbol='BTCUSDT', timeframe='15m')
+        self.storage_manager.save_parquet(bars.iloc[:60], 'BTCUSDT_15m.parquet', path, row_group_size=10)
+        self.storage_manager.save_parquet(bars.iloc[50:], 'part-1.parquet', path, row_group_size=10)
+
+        df = self.storage_manager.load_bars('BTCUSDT', '15m', start=bars['ts'][45], end=bars['ts'][70],
+                                            columns=['close'])
+        self.assertEqual(list(df.columns), ['ts', 'close'])
+        self.assertEqual(df['close'].tolist(), [float(i) for i in range(45, 70)])
+        self.assertEqual(str(df['ts'].dtype), 'datetime64[ms, UTC]')
+
+        chunks = list(self.storage_manager.load_bars('BTCUSDT', '15m', iterator=True, batch_size=10))
+        self.assertEqual(pd.concat(chunks)['close'].tolist(), [float(i) for i in range(100)])
+        self.assertTrue(all(len(chunk) <= 10 for chunk in chunks))
+
+        #Reads never create folders
+        self.assertTrue(self.storage_manager.load_bars('ETHUSDT', '15m').empty)
+        self.assertFalse((Path(self.test_base_path) / 'Kline' / 'Historical' / 'ETHUSDT').exists())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+import unittest, os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import numpy as np
+import pandas as pd
+from data_processing.indicators import Indicator
+from data_processing.streaming_indicators import (StreamingIndicators, EMAState, SMAState, WMAState, HMAState,
+                                                  RSIState, EnvelopeState, StochRSIState)
+
+
+def make_states():
+    return {
+        'EMA5': EMAState(5), 'EMA20': EMAState(20), 'SMA10': SMAState(10), 'WMA9': WMAState(9),
+        'HMA16': HMAState(16), 'RSI_14': RSIState(14), 'ENV': EnvelopeState(20, 0.02, 'sma'),
+        'ENV_EMA': EnvelopeState(20, 0.02, 'ema'), 'STOCH': StochRSIState(14, 3, 3),
+    }
+
+
+class TestStreamingIndicators(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        close = 60000 + np.cumsum(rng.normal(0, 25, 1500))
+        close[[300, 301, 900]] = np.nan
+        # A flat stretch: zero losses / zero RSI range
+        close[1200:1230] = close[1199]
+        self.df = pd.DataFrame({
+            'close': close,
+            'ts': pd.date_range('2024-10-01', periods=len(close), freq='15min', tz='UTC')
+        })
+        indicator = Indicator(self.df)
+        ma, upper, lower = indicator.moving_average_envelopes(20, 0.02, 'sma')
+        ema_ma, ema_upper, ema_lower = indicator.moving_average_envelopes(20, 0.02, 'ema')
+        stoch = indicator.stocastic_rsi(14, 3, 3)
+        self.expected = {
+            'EMA5': indicator.ema(5), 'EMA20': indicator.ema(20), 'SMA10': indicator.sma(10),
+            'WMA9': indicator.wma(9), 'HMA16': indicator.hma(16), 'RSI_14': indicator.rsi(14),
+            'ENV': (ma, upper, lower), 'ENV_EMA': (ema_ma, ema_upper, ema_lower),
+            'STOCH': (stoch['StochRSI_%K'], stoch['StochRSI_%D']),
+        }
+        self.state_dir = 'test_streaming_state'
+
+    def tearDown(self):
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def check(self, outputs, start=0):
+        for name, expected in self.expected.items():
+            columns = expected if isinstance(expected, tuple) else (expected,)
+            for i, column in enumerate(columns):
+                got = [out[name][i] if isinstance(out[name], tuple) else out[name] for out in outputs]
+                np.testing.assert_allclose(got, column.to_numpy()[start:start + len(got)], rtol=1e-9, atol=1e-9,
+                                           err_msg=name)
+
+    def test_matches_batch_bar_for_bar(self):
+        stream = StreamingIndicators(make_states())
+        outputs = [stream.update(row) for row in self.df.to_dict('records')]
+        self.check(outputs)
+
+    def test_snapshot_and_restore(self):
+        stream = StreamingIndicators(make_states())
+        stream.warm_up(self.df.iloc[:1000])
+        file_path = os.path.join(self.state_dir, 'BTCUSDT_15m.json')
+        stream.save(file_path)
+
+        restored = StreamingIndicators.load(file_path)
+        self.assertEqual(restored.last_ts, self.df['ts'].iloc[999].value // 1_000_000)
+        outputs = [restored.update(row) for row in self.df.iloc[1000:].to_dict('records')]
+        self.check(outputs, start=1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1 +1,3 @@
-from .storage_manager import StorageManager
\ No newline at end of file
+from .storage_manager import StorageManager
+from .rate_limiter import RateLimiter
+from .async_writer import AsyncWriter, WriteError
@@ -0,0 +1,187 @@
+import queue
+import logging
+import threading
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Output formats the writer knows how to produce from one DataFrame
+WRITER_FORMATS = ('parquet', 'csv')
+
+
+class WriteError(Exception):
+    """Raised by AsyncWriter.flush/close when queued writes failed"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        summary = '; '.join(f'{description}: {error}' for description, error in errors[:5])
+        more = f' (+{len(errors) - 5} more)' if len(errors) > 5 else ''
+        super().__init__(f'{len(errors)} background write(s) failed: {summary}{more}')
+
+
+class AsyncWriter:
+    """
+    Write-behind pool that takes serialization and disk I/O off the fetch/compute loop.
+
+    save() queues a DataFrame and returns straight away; worker threads encode and
+    write it through the StorageManager (atomic Parquet, catalogued) while the caller
+    moves on to the next request or calculation. Jobs for the same file always go to
+    the same worker, so two snapshots of one file land in submission order.
+
+    flush() is the barrier: it waits for everything queued so far and raises
+    WriteError listing any writes that failed. close() flushes and stops the workers.
+    """
+
+    def __init__(self, storage_manager, max_workers=2, max_queue=64, formats=('parquet',), compression='zstd',
+                 compression_level=None, row_group_size=None):
+        """
+        Initializes the AsyncWriter and starts its worker threads.
+
+        Args:
+            storage_manager (StorageManager): Does the actual writes.
+            max_workers (int): Worker threads.
+            max_queue (int): Pending jobs per worker before save() blocks (back-pressure).
+            formats (tuple[str]): Formats save() writes, any of 'parquet', 'csv'.
+            compression (str): Parquet codec, e.g. 'zstd', 'snappy' or None.
+            compression_level (int): Codec level (zstd 1-22), None for the codec default.
+            row_group_size (int): Rows per Parquet row group, None for the pyarrow default.
+        """
+        unknown = set(formats) - set(WRITER_FORMATS)
+        if unknown:
+            raise ValueError(f'Unknown formats {sorted(unknown)}, expected any of {WRITER_FORMATS}')
+
+        self.storage_manager = storage_manager
+        self.formats = tuple(formats)
+        self.parquet_options = {'compression': compression}
+        if compression_level is not None:
+            self.parquet_options['compression_level'] = compression_level
+        if row_group_size is not None:
+            self.parquet_options['row_group_size'] = row_group_size
+
+        self._errors = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.metrics = {'submitted': 0, 'written': 0, 'failed': 0}
+
+        self._queues = [queue.Queue(maxsize=max_queue) for _ in range(max_workers)]
+        self._workers = [
+            threading.Thread(target=self._work, args=(q,), name=f'AsyncWriter-{n}', daemon=True)
+            for n, q in enumerate(self._queues)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _work(self, jobs):
+        while True:
+            job = jobs.get()
+            try:
+                if job is None:
+                    return
+                description, fn, args, kwargs = job
+                try:
+                    fn(*args, **kwargs)
+                    self._count('written')
+                except Exception as e:
+                    logger.error(f'Background write {description} failed: {e}')
+                    with self._lock:
+                        self._errors.append((description, e))
+                        self.metrics['failed'] += 1
+            finally:
+                jobs.task_done()
+
+    def _count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def submit(self, fn, *args, key=None, **kwargs):
+        """
+        Queues any write call, e.g. submit(sm.write_partitioned, df, symbol, timeframe).
+
+        Args:
+            fn (callable): The write to run on a worker.
+            key (str): Jobs with the same key run in order on the same worker, defaults to fn's name.
+        """
+        if self._closed:
+            raise RuntimeError('AsyncWriter is closed')
+        key = str(key if key is not None else getattr(fn, '__name__', fn))
+        jobs = self._queues[zlib.crc32(key.encode()) % len(self._queues)]
+        jobs.put((key, fn, args, kwargs))
+        self._count('submitted')
+
+    def save(self, df, name, path):
+        """
+        Queues df to be written as path/name.<ext> in every configured format.
+
+        The caller must not modify df in place afterwards (pandas copy-on-write
+        makes ordinary column assignments safe).
+
+        Args:
+            df (DataFrame): The data to write.
+            name (str): File name without extension, e.g. 'BTCUSDT_15m'.
+            path (Path): Target folder.
+
+        Returns:
+            dict: {format: Path} of the files that will be written.
+        """
+        targets = {}
+        for fmt in self.formats:
+            file_path = path / f'{name}.{fmt}'
+            if fmt == 'parquet':
+                self.submit(self.storage_manager.save_parquet, df, file_path.name, path, key=str(file_path),
+                            **self.parquet_options)
+            else:
+                self.submit(self.storage_manager.save_dataframe, df, file_path.name, path, key=str(file_path))
+            targets[fmt] = file_path
+        return targets
+
+    def flush(self):
+        """
+        Blocks until every queued write has finished.
+
+        Raises:
+            WriteError: If any write since the last flush failed.
+        """
+        for jobs in self._queues:
+            jobs.join()
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise WriteError(errors)
+
+    def close(self):
+        """Flushes, then stops the workers. Raises WriteError like flush."""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            for jobs in self._queues:
+                jobs.put(None)
+            for worker in self._workers:
+                worker.join()
+
+    def stats(self):
+        """
+        Returns job counters.
+
+        Returns:
+            dict: submitted, written, failed, pending
+        """
+        with self._lock:
+            stats = dict(self.metrics)
+        stats['pending'] = sum(jobs.unfinished_tasks for jobs in self._queues)
+        return stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        #Don't hide the original exception behind a write error
+        try:
+            self.close()
+        except WriteError as e:
+            logger.error(e)
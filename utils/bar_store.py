@@ -0,0 +1,234 @@
+import os, sys
+import json
+import logging
+import threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.schema import ts_to_epoch_ms, to_epoch_ms
+
+logger = logging.getLogger(__name__)
+
+# Fixed on-disk schema: one raw little-endian column file per field
+BAR_COLUMNS = (
+    ('ts', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+)
+
+HEADER_FILE = 'header.json'
+STORE_VERSION = 1
+
+TS_DTYPE = pd.DatetimeTZDtype('ms', 'UTC')
+
+
+class BarStore:
+    """
+    Append-only, memory-mapped columnar store for one symbol/timeframe.
+
+    Each column lives in its own raw binary file (ts as int64 epoch ms, prices and
+    volume as float64) next to a small JSON header holding the schema and the row
+    count. Reads map the files with np.memmap, so slices by time range are views
+    into the OS page cache: nothing is deserialized, and every process reading the
+    same hot series shares the same pages instead of holding a private copy.
+
+    Appends write only the new rows to the end of each column file and then swap
+    in the header, so readers never see a half-written bar. One writer per store.
+    """
+
+    def __init__(self, path, symbol=None, timeframe=None):
+        """
+        Initializes the BarStore, creating an empty store if the folder has none.
+
+        Args:
+            path (str or Path): The store folder.
+            symbol (str): The trading symbol, recorded in the header.
+            timeframe (str): The timeframe, recorded in the header.
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps = None
+        self._maps_length = None
+
+        if (self.path / HEADER_FILE).exists():
+            self.header = self._read_header()
+        else:
+            self.header = {
+                'version': STORE_VERSION,
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'columns': [[name, dtype] for name, dtype in BAR_COLUMNS],
+                'length': 0,
+                'last_ts': None,
+            }
+            self._write_header(self.header)
+
+    def _column_file(self, name):
+        return self.path / f'{name}.bin'
+
+    def _read_header(self):
+        with open(self.path / HEADER_FILE) as f:
+            header = json.load(f)
+        if [tuple(c) for c in header['columns']] != list(BAR_COLUMNS):
+            raise ValueError(f'{self.path} has an unexpected column schema: {header["columns"]}')
+        return header
+
+    def _write_header(self, header):
+        tmp_path = self.path / f'{HEADER_FILE}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(header, f)
+        os.replace(tmp_path, self.path / HEADER_FILE)
+
+    def refresh(self):
+        """Re-reads the header so rows appended by another process become visible"""
+        self.header = self._read_header()
+
+    def __len__(self):
+        return self.header['length']
+
+    @property
+    def last_ts(self):
+        """The newest bar's open time as epoch ms, or None if the store is empty"""
+        return self.header['last_ts']
+
+    def append(self, df):
+        """
+        Appends bars newer than the last stored bar.
+
+        Rows at or before the stored last_ts are dropped, so re-appending an
+        overlapping batch is a no-op for the overlap.
+
+        Args:
+            df (DataFrame): Bars with 'ts' and OHLCV columns.
+
+        Returns:
+            int: Number of bars appended.
+        """
+        if df is None or df.empty:
+            return 0
+
+        ts = ts_to_epoch_ms(df['ts']).to_numpy()
+        order = np.argsort(ts, kind='stable')
+        ts = ts[order]
+        keep = np.ones(len(ts), dtype=bool)
+        keep[1:] = ts[1:] != ts[:-1]
+        with self._lock:
+            if self.header['last_ts'] is not None:
+                keep &= ts > self.header['last_ts']
+            rows = order[keep]
+            if not len(rows):
+                return 0
+
+            length = self.header['length']
+            for name, dtype in BAR_COLUMNS:
+                values = ts[keep] if name == 'ts' else df[name].to_numpy(dtype=np.float64)[rows]
+                with open(self._column_file(name), 'ab') as f:
+                    #Drop anything past the header length left by an interrupted append
+                    f.truncate(length * np.dtype(dtype).itemsize)
+                    f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+            header = dict(self.header, length=length + len(rows), last_ts=int(ts[keep][-1]))
+            self._write_header(header)
+            self.header = header
+        return len(rows)
+
+    def _columns(self):
+        """Returns the memory-mapped columns for the current length (mapped once per length)"""
+        length = self.header['length']
+        with self._lock:
+            if self._maps is None or self._maps_length != length:
+                if length == 0:
+                    self._maps = {name: np.empty(0, dtype=dtype) for name, dtype in BAR_COLUMNS}
+                else:
+                    self._maps = {
+                        name: np.memmap(self._column_file(name), dtype=dtype, mode='r', shape=(length,))
+                        for name, dtype in BAR_COLUMNS
+                    }
+                self._maps_length = length
+            return self._maps
+
+    def locate(self, start=None, end=None):
+        """
+        Finds the row range for a time window with a binary search on ts.
+
+        Args:
+            start: Inclusive lower bound (epoch ms, datetime or string), None for the first bar.
+            end: Exclusive upper bound (epoch ms, datetime or string), None for the last bar.
+
+        Returns:
+            tuple[int, int]: (first row, row after the last)
+        """
+        ts = self._columns()['ts']
+        lo = 0 if start is None else int(np.searchsorted(ts, to_epoch_ms(start), side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, to_epoch_ms(end), side='left'))
+        return lo, max(lo, hi)
+
+    def arrays(self, start=None, end=None, columns=None):
+        """
+        Returns read-only views of the columns for a time window.
+
+        Args:
+            start: Inclusive lower bound, see locate.
+            end: Exclusive upper bound, see locate.
+            columns (list[str]): Columns to return, defaults to all.
+
+        Returns:
+            dict[str, ndarray]: Column name -> view into the memory map (ts as int64 epoch ms).
+        """
+        lo, hi = self.locate(start, end)
+        maps = self._columns()
+        return {name: maps[name][lo:hi] for name in (columns or [name for name, _ in BAR_COLUMNS])}
+
+    def to_frame(self, start=None, end=None, columns=None):
+        """
+        Wraps a time window as a DataFrame without copying the data.
+
+        'ts' comes back as datetime64[ms, UTC] and 'symbol' as a category, like the
+        frames from get_kline_data. The columns are read-only views into the memory
+        map; new columns (e.g. indicators) can still be added to the frame.
+
+        Args:
+            start: Inclusive lower bound, see locate.
+            end: Exclusive upper bound, see locate.
+            columns (list[str]): Columns to include, defaults to all.
+
+        Returns:
+            DataFrame: The bars in the window.
+        """
+        data = {}
+        for name, values in self.arrays(start, end, columns).items():
+            if name == 'ts':
+                values = pd.array(values.view('M8[ms]'), copy=False).view(TS_DTYPE)
+            data[name] = pd.Series(values, name=name, copy=False)
+        df = pd.DataFrame(data, copy=False)
+        if self.header.get('symbol') is not None:
+            df.insert(0, 'symbol', pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), [self.header['symbol']]))
+        return df
+
+
+if __name__ == '__main__':
+    import argparse
+    from utils.storage_manager import StorageManager
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Sync memory-mapped bar stores from the Historical Parquet files.')
+    parser.add_argument('--base-path', default='storage')
+    parser.add_argument('--symbols', nargs='*', default=None, help='Defaults to every symbol under Historical')
+    args = parser.parse_args()
+
+    sm = StorageManager(base_path=args.base_path)
+    historical_root = sm.base_path / 'Kline' / 'Historical'
+    for series_dir in sorted(historical_root.glob('*/*')):
+        if not series_dir.is_dir():
+            continue
+        symbol, timeframe = series_dir.parent.name, series_dir.name
+        if args.symbols and symbol not in args.symbols:
+            continue
+        appended = sm.sync_bar_store(symbol, timeframe)
+        logger.info(f'{symbol} {timeframe}: {appended} bars appended')
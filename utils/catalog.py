@@ -0,0 +1,217 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Top-level storage folder -> catalog kind
+KIND_BY_FOLDER = {'Kline': 'raw', 'processed': 'processed', 'Indicator': 'indicator'}
+
+# File types the catalog tracks
+CATALOG_SUFFIXES = ('.parquet', '.csv', '.png')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path        TEXT PRIMARY KEY,
+    symbol      TEXT,
+    timeframe   TEXT,
+    kind        TEXT NOT NULL,
+    ts_min      INTEGER,
+    ts_max      INTEGER,
+    row_count   INTEGER,
+    schema_hash TEXT,
+    written_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_series ON files (kind, symbol, timeframe, written_at);
+CREATE INDEX IF NOT EXISTS files_range ON files (symbol, timeframe, ts_min, ts_max);
+"""
+
+
+def schema_hash(df):
+    """Short hash of a DataFrame's column names and dtypes"""
+    signature = ';'.join(f'{name}:{dtype}' for name, dtype in df.dtypes.items())
+    return hashlib.sha1(signature.encode()).hexdigest()[:16]
+
+
+def ts_range_ms(df):
+    """Returns (min, max) of the 'ts' column as epoch ms, or (None, None)"""
+    if df is None or 'ts' not in df.columns or df.empty:
+        return None, None
+    ts = df['ts']
+    if not pd.api.types.is_integer_dtype(ts):
+        ts = pd.to_datetime(ts, utc=True)
+        return ts.min().value // 1_000_000, ts.max().value // 1_000_000
+    return int(ts.min()), int(ts.max())
+
+
+class StorageCatalog:
+    """
+    SQLite index of every file StorageManager writes.
+
+    Each row records the file's symbol, timeframe, kind (raw/processed/indicator/plot),
+    ts range, row count, schema hash and write time, so lookups like "latest processed
+    BTCUSDT 15m" or "all raw files covering a range" are indexed queries instead of
+    directory walks.
+    """
+
+    def __init__(self, db_path):
+        """
+        Initializes the StorageCatalog.
+
+        Args:
+            db_path (str or Path): The SQLite file (created if missing).
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            #WAL lets other processes read while one writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def record(self, path, kind, symbol=None, timeframe=None, df=None, written_at=None):
+        """
+        Inserts or replaces the entry for a file (one transaction).
+
+        Args:
+            path (str or Path): The file written.
+            kind (str): 'raw', 'processed', 'indicator' or 'plot'.
+            symbol (str): The trading symbol.
+            timeframe (str): The timeframe folder name.
+            df (DataFrame): The data written, used for ts range / row count / schema hash.
+            written_at (float): Epoch seconds, defaults to now.
+        """
+        ts_min, ts_max = ts_range_ms(df)
+        row = (
+            str(path), symbol, timeframe, kind, ts_min, ts_max,
+            len(df) if df is not None else None,
+            schema_hash(df) if df is not None else None,
+            written_at if written_at is not None else time.time()
+        )
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+
+    def remove(self, path):
+        """Drops the entry for a deleted file"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM files WHERE path = ?', (str(path),))
+
+    def get(self, path):
+        """
+        Returns the entry for one file.
+
+        Returns:
+            dict: The catalog row, or None if the file is not catalogued.
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM files WHERE path = ?', (str(path),)).fetchone()
+        return dict(row) if row else None
+
+    def files(self, kind=None, symbol=None, timeframe=None, under=None, suffix=None, start=None, end=None,
+              limit=None):
+        """
+        Queries catalogued files.
+
+        Args:
+            kind (str): Filter on kind.
+            symbol (str): Filter on symbol.
+            timeframe (str): Filter on timeframe.
+            under (str or Path): Only files below this directory.
+            suffix (str): Only files with this extension, e.g. '.parquet'.
+            start (int): Only files whose ts range reaches at least this epoch ms.
+            end (int): Only files whose ts range starts before this epoch ms.
+            limit (int): Max rows to return.
+
+        Returns:
+            list[dict]: Matching rows, newest write first.
+        """
+        clauses, params = [], []
+        for column, value in (('kind', kind), ('symbol', symbol), ('timeframe', timeframe)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if under is not None:
+            prefix = os.path.join(str(under), '')
+            clauses.append('substr(path, 1, ?) = ?')
+            params += [len(prefix), prefix]
+        if suffix is not None:
+            clauses.append('substr(path, ?) = ?')
+            params += [-len(suffix), suffix]
+        if start is not None:
+            clauses.append('ts_max >= ?')
+            params.append(int(start))
+        if end is not None:
+            clauses.append('ts_min < ?')
+            params.append(int(end))
+
+        query = 'SELECT * FROM files'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        query += ' ORDER BY written_at DESC'
+        if limit is not None:
+            query += f' LIMIT {int(limit)}'
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params).fetchall()]
+
+    def latest(self, kind, symbol, timeframe, suffix='.parquet'):
+        """
+        Returns the most recently written file of a kind for a series.
+
+        Returns:
+            dict: The catalog row, or None.
+        """
+        rows = self.files(kind=kind, symbol=symbol, timeframe=timeframe, suffix=suffix, limit=1)
+        return rows[0] if rows else None
+
+
+def describe_path(base_path, file_path):
+    """
+    Works out (kind, symbol, timeframe) from where a file sits in the storage tree.
+
+    Handles the nested layouts (.../SYMBOL/TF/file) and the partitioned
+    dataset (symbol=/timeframe=/date=).
+
+    Returns:
+        tuple[str, str, str]: kind, symbol, timeframe (symbol/timeframe may be None)
+    """
+    parts = Path(file_path).relative_to(base_path).parts
+    if Path(file_path).suffix == '.png':
+        kind = 'plot'
+    else:
+        kind = KIND_BY_FOLDER.get(parts[0], parts[0]) if parts else None
+
+    symbol, timeframe = None, None
+    for part in parts:
+        if part.startswith('symbol='):
+            symbol = part[len('symbol='):]
+        elif part.startswith('timeframe='):
+            timeframe = part[len('timeframe='):]
+    if symbol is None and len(parts) >= 3:
+        symbol, timeframe = parts[-3], parts[-2]
+    return kind, symbol, timeframe
+
+
+if __name__ == '__main__':
+    import sys
+    import argparse
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from utils.storage_manager import StorageManager
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Rebuild the storage catalog from the files on disk.')
+    parser.add_argument('--base-path', default='storage')
+    args = parser.parse_args()
+
+    StorageManager(base_path=args.base_path).rebuild_catalog()
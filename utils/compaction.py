@@ -0,0 +1,171 @@
+"""
+Compacts the daily Kline snapshots into the Historical dataset.
+
+Every run of Daily_Saver writes a full snapshot per series under
+Kline/Date/MM-DD-YYYY/SYMBOL/TF/, and consecutive snapshots overlap almost
+entirely. Compaction merges all snapshots of a series into the single sorted,
+ts-deduplicated Kline/Historical/SYMBOL/TF/SYMBOL_TF.parquet (large row groups,
+written to a temp file and renamed), one series at a time so memory stays
+bounded by the largest series.
+
+    python utils/compaction.py --dry-run
+    python utils/compaction.py --prune
+"""
+import os, sys
+import logging
+import argparse
+from collections import defaultdict
+import pandas as pd
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.storage_manager import StorageManager
+from utils.constants import INTERVAL_MINUTES, timeframe_to_interval
+from utils.schema import from_storage
+
+logger = logging.getLogger(__name__)
+
+# Historical files are read as one sequential scan, so favour few large row groups
+ROW_GROUP_SIZE = 1_000_000
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def find_snapshots(storage_manager):
+    """
+    Lists the daily snapshot Parquet files, grouped by series.
+
+    Returns:
+        dict: {(symbol, timeframe): [Path, ...]} with each list oldest write first
+    """
+    date_root = storage_manager.base_path / 'Kline' / 'Date'
+    series = defaultdict(list)
+    if date_root.exists():
+        for file_path in date_root.glob('*/*/*/*.parquet'):
+            series[(file_path.parent.parent.name, file_path.parent.name)].append(file_path)
+    return {key: sorted(files, key=os.path.getmtime) for key, files in sorted(series.items())}
+
+
+def read_snapshot(file_path, timeframe):
+    """
+    Reads one snapshot and normalises it to the typed Kline schema.
+
+    The bar that was still forming when the snapshot was taken is dropped (it
+    closed at a different price), judged against the file's write time.
+
+    Returns:
+        DataFrame: Closed bars from the snapshot.
+    """
+    df = pd.read_parquet(file_path)
+    if 'ts' not in df.columns or df.empty:
+        return None
+
+    df = from_storage(df)
+    for column in PRICE_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+
+    interval = timeframe_to_interval(timeframe)
+    if interval in INTERVAL_MINUTES:
+        written_at = pd.Timestamp(os.path.getmtime(file_path), unit='s', tz='UTC')
+        df = df[df['ts'] + pd.Timedelta(minutes=INTERVAL_MINUTES[interval]) <= written_at]
+    return df
+
+
+def compact_series(storage_manager, symbol, timeframe, files, prune=False, row_group_size=ROW_GROUP_SIZE):
+    """
+    Merges a series' snapshots into its Historical file.
+
+    Args:
+        storage_manager (StorageManager): The storage manager.
+        symbol (str): The trading symbol.
+        timeframe (str): The timeframe folder name, e.g. '15m'.
+        files (list[Path]): The series' snapshots, oldest first (newest copy of a bar wins).
+        prune (bool): Delete the snapshots once the merged file is in place.
+        row_group_size (int): Rows per Parquet row group in the merged file.
+
+    Returns:
+        dict: {'files': n, 'rows_in': n, 'rows_out': n, 'bytes_in': n, 'bytes_out': n}
+    """
+    frames = []
+    for file_path in files:
+        try:
+            df = read_snapshot(file_path, timeframe)
+        except Exception as e:
+            logger.error(f'Could not read {file_path}, leaving it in place: {e}')
+            files = [f for f in files if f != file_path]
+            continue
+        if df is not None and not df.empty:
+            frames.append(df)
+
+    report = {
+        'files': len(files),
+        'rows_in': sum(len(df) for df in frames),
+        'bytes_in': sum(f.stat().st_size for f in files),
+    }
+    if frames:
+        merged = pd.concat(frames, ignore_index=True)
+        if 'symbol' in merged.columns:
+            merged['symbol'] = merged['symbol'].astype('category')
+        file_path = storage_manager.merge_historical(merged, symbol, timeframe, row_group_size=row_group_size)
+        report['rows_out'] = pq.ParquetFile(file_path).metadata.num_rows
+        report['bytes_out'] = file_path.stat().st_size
+    else:
+        report['rows_out'], report['bytes_out'] = 0, 0
+
+    if prune:
+        for file_path in files:
+            file_path.unlink()
+            storage_manager.catalog.remove(file_path)
+            _remove_empty_dirs(file_path.parent, storage_manager.base_path / 'Kline' / 'Date')
+    return report
+
+
+def _remove_empty_dirs(path, stop):
+    while path != stop and path.exists() and not any(path.iterdir()):
+        path.rmdir()
+        path = path.parent
+
+
+def compact(storage_manager, symbols=None, prune=False, dry_run=False, row_group_size=ROW_GROUP_SIZE):
+    """
+    Compacts every series found under Kline/Date, one series at a time.
+
+    Args:
+        storage_manager (StorageManager): The storage manager.
+        symbols (list[str]): Only these symbols, defaults to all.
+        prune (bool): Delete each series' snapshots after it is compacted.
+        dry_run (bool): Only list what would be compacted.
+        row_group_size (int): Rows per Parquet row group in the merged files.
+
+    Returns:
+        dict: {(symbol, timeframe): report} for every series compacted
+    """
+    reports = {}
+    for (symbol, timeframe), files in find_snapshots(storage_manager).items():
+        if symbols and symbol not in symbols:
+            continue
+        if dry_run:
+            print(f'{symbol} {timeframe}: {len(files)} snapshots -> {storage_manager.get_historical_file(symbol, timeframe)}')
+            continue
+        report = compact_series(storage_manager, symbol, timeframe, files, prune=prune, row_group_size=row_group_size)
+        logger.info(f'{symbol} {timeframe}: {report}')
+        reports[(symbol, timeframe)] = report
+    return reports
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Merge daily Kline snapshots into the deduplicated Historical dataset.')
+    parser.add_argument('--base-path', default='storage')
+    parser.add_argument('--symbols', nargs='*', default=None, help='Defaults to every symbol found')
+    parser.add_argument('--prune', action='store_true', help='Delete snapshots once they are compacted')
+    parser.add_argument('--dry-run', action='store_true', help='Only list what would be compacted')
+    parser.add_argument('--row-group-size', type=int, default=ROW_GROUP_SIZE)
+    args = parser.parse_args()
+
+    reports = compact(StorageManager(base_path=args.base_path), symbols=args.symbols, prune=args.prune,
+                      dry_run=args.dry_run, row_group_size=args.row_group_size)
+    if reports:
+        bytes_in = sum(r['bytes_in'] for r in reports.values())
+        bytes_out = sum(r['bytes_out'] for r in reports.values())
+        print(f'Compacted {len(reports)} series: {bytes_in} bytes of snapshots -> {bytes_out} bytes of history')
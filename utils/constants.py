@@ -2,4 +2,74 @@ from enum import Enum
 
 class DataType(Enum):
     DATE = 'Date'
-    HISTORICAL = 'Historical'
\ No newline at end of file
+    HISTORICAL = 'Historical'
+
+# Bitunix interval code -> bar length in minutes
+# 'M' is left out on purpose, calendar months are not a fixed length
+INTERVAL_MINUTES = {
+    '1': 1, '3': 3, '5': 5, '15': 15, '30': 30,
+    '60': 60, '120': 120, '240': 240, '360': 360, '720': 720,
+    'D': 1440, 'W': 10080,
+}
+
+# Bars are aligned to multiples of their length since the epoch, except weekly
+# bars which open on Monday 00:00 UTC (the epoch was a Thursday)
+BAR_OFFSET_MS = {'W': 4 * 86_400_000}
+
+def interval_to_minutes(interval):
+    """
+    Converts a Bitunix interval code ('15', 'D', ...) to minutes.
+
+    Args:
+        interval (str): The interval code.
+
+    Returns:
+        int: The bar length in minutes.
+    """
+    interval = str(interval)
+    if interval not in INTERVAL_MINUTES:
+        raise ValueError(f'Interval {interval} has no fixed length in minutes')
+    return INTERVAL_MINUTES[interval]
+
+def timeframe_label(interval):
+    """
+    Converts an interval code to the timeframe folder name used in storage ('15' -> '15m').
+
+    Args:
+        interval (str): The interval code.
+
+    Returns:
+        str: The timeframe label.
+    """
+    interval = str(interval)
+    return f'{interval}m' if interval.isdigit() else interval
+
+def timeframe_to_interval(timeframe):
+    """
+    Converts a timeframe folder name back to its interval code ('15m' -> '15').
+
+    Args:
+        timeframe (str): The timeframe label.
+
+    Returns:
+        str: The interval code.
+    """
+    timeframe = str(timeframe)
+    return timeframe[:-1] if timeframe.endswith('m') and timeframe[:-1].isdigit() else timeframe
+
+
+
+def next_bar_close(interval, now_ms):
+    """
+    Returns the first bar close strictly after now_ms.
+
+    Args:
+        interval (str): The interval code, e.g. '15'
+        now_ms (int): Current time, epoch milliseconds
+
+    Returns:
+        int: The next close, epoch milliseconds
+    """
+    step = interval_to_minutes(interval) * 60_000
+    offset = BAR_OFFSET_MS.get(str(interval), 0)
+    return ((now_ms - offset) // step + 1) * step + offset
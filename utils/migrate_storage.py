@@ -0,0 +1,104 @@
+"""
+Migrates the nested Kline tree into the Hive-partitioned dataset.
+
+    Kline/Date/MM-DD-YYYY/SYMBOL/TF/SYMBOL_TF.parquet  ->  Kline/Dataset/symbol=/timeframe=/date=YYYY-MM-DD/
+    Kline/Historical/SYMBOL/TF/*.parquet               ->  (same)
+
+Overlapping daily snapshots are merged and de-duplicated by 'ts' on the way in.
+The source files are left alone unless --remove is passed; a Historical series
+whose files are all removed also loses its watermark, so appends start over.
+
+    python utils/migrate_storage.py --dry-run
+    python utils/migrate_storage.py --base-path storage
+"""
+import os, sys
+import logging
+import argparse
+from pathlib import Path
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.storage_manager import StorageManager
+
+logger = logging.getLogger(__name__)
+
+
+def find_kline_files(storage_manager):
+    """
+    Lists every Kline Parquet file in the old nested layout.
+
+    Returns:
+        list[tuple[str, str, Path]]: (symbol, timeframe, file) for each file found
+    """
+    found = []
+    kline_root = storage_manager.base_path / 'Kline'
+
+    date_root = kline_root / 'Date'
+    if date_root.exists():
+        for file_path in sorted(date_root.glob('*/*/*/*.parquet')):
+            found.append((file_path.parent.parent.name, file_path.parent.name, file_path))
+
+    historical_root = kline_root / 'Historical'
+    if historical_root.exists():
+        for file_path in sorted(historical_root.glob('*/*/*.parquet')):
+            found.append((file_path.parent.parent.name, file_path.parent.name, file_path))
+
+    return found
+
+
+def migrate(storage_manager, dry_run=False, remove=False):
+    """
+    Copies every old-layout Kline file into the partitioned dataset.
+
+    Args:
+        storage_manager (StorageManager): The storage manager.
+        dry_run (bool): Only list what would be migrated.
+        remove (bool): Delete each source file once it has been migrated.
+
+    Returns:
+        int: Number of files migrated
+    """
+    files = find_kline_files(storage_manager)
+    historical_root = storage_manager.base_path / 'Kline' / 'Historical'
+    emptied = set()
+    migrated = 0
+
+    for symbol, timeframe, file_path in files:
+        if dry_run:
+            print(f'{file_path} -> {storage_manager.get_dataset_path(symbol, timeframe)}')
+            continue
+        try:
+            df = storage_manager.read_parquet(file_path)
+        except Exception as e:
+            logger.error(f'Could not read {file_path}: {e}')
+            continue
+        if 'ts' not in df.columns or df.empty:
+            logger.info(f'Skipping {file_path}, no bars')
+            continue
+
+        storage_manager.write_partitioned(df, symbol, timeframe)
+        migrated += 1
+        if remove:
+            file_path.unlink()
+            storage_manager.catalog.remove(file_path)
+            if historical_root in file_path.parents:
+                emptied.add((symbol, timeframe))
+
+    #A watermark with no Historical files behind it would make append_historical skip those bars forever
+    for symbol, timeframe in sorted(emptied):
+        if not storage_manager.get_historical_parts(symbol, timeframe):
+            storage_manager.clear_watermark(symbol, timeframe)
+
+    logger.info(f'Migrated {migrated} of {len(files)} files')
+    return migrated
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Migrate Kline files into the partitioned dataset layout.')
+    parser.add_argument('--base-path', default='storage')
+    parser.add_argument('--dry-run', action='store_true', help='Only list what would be migrated')
+    parser.add_argument('--remove', action='store_true', help='Delete source files after migrating them')
+    args = parser.parse_args()
+
+    migrate(StorageManager(base_path=args.base_path), dry_run=args.dry_run, remove=args.remove)
@@ -0,0 +1,73 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket shared by every worker that talks to an API.
+
+    Each call to acquire() takes one token. Tokens refill at `rate` per second
+    up to `burst`, so short bursts go out immediately and sustained load is
+    held at `rate` requests per second.
+    """
+
+    def __init__(self, rate=10, burst=None):
+        """
+        Initializes the RateLimiter.
+
+        Args:
+            rate (float): Sustained requests per second allowed.
+            burst (int): Max tokens that can be saved up (defaults to rate).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """
+        Blocks until a token is available, then takes it.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def try_acquire(self):
+        """
+        Takes a token if one is available, without waiting.
+
+        Returns:
+            bool: True if a token was taken.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
@@ -0,0 +1,177 @@
+"""
+Canonical on-disk schema for Kline and processed Parquet files.
+
+    ts      int64 epoch milliseconds (bar open time, UTC)
+    open/high/low/close   float64, or float32 when the StorageManager is set up for it
+    volume  float32
+    symbol  dictionary encoded (pandas category), or left out where the path holds it
+
+Every Parquet write in StorageManager goes through to_storage, and every read
+goes through from_storage, which turns 'ts' back into datetime64[ms, UTC].
+Any other columns (indicators) are written as they are.
+
+Existing files can be rewritten in place with the converter:
+
+    python utils/schema.py --dry-run
+    python utils/schema.py --base-path storage [--float32-prices]
+"""
+import os, sys
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+VOLUME_DTYPE = np.float32
+TS_DTYPE = 'datetime64[ms, UTC]'
+
+
+# The one place timestamps are turned into epoch milliseconds: columns with
+# ts_to_epoch_ms, single values (range bounds, watermarks) with to_epoch_ms.
+
+def ts_to_epoch_ms(ts):
+    """
+    Converts a 'ts' column in any of the stored forms (UTC datetimes, ISO strings,
+    epoch ms integers or floats) to int64 epoch milliseconds.
+
+    Returns:
+        Series (same index) for a Series, otherwise an int64 ndarray.
+    """
+    if pd.api.types.is_integer_dtype(ts):
+        ms = np.asarray(ts, dtype=np.int64)
+    elif pd.api.types.is_float_dtype(ts):
+        ms = np.round(np.asarray(ts, dtype=np.float64)).astype(np.int64)
+    else:
+        ms = pd.DatetimeIndex(pd.to_datetime(ts, utc=True)).as_unit('ms').asi8
+    return pd.Series(ms, index=ts.index) if isinstance(ts, pd.Series) else ms
+
+
+def to_epoch_ms(value):
+    """
+    Converts a datetime, date string or epoch-ms number to epoch milliseconds (naive = UTC).
+    """
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return ts.value // 1_000_000
+
+
+def to_storage(df, price_dtype=np.float64):
+    """
+    Converts a frame to the canonical on-disk schema.
+
+    Args:
+        df (DataFrame): Bars (or processed bars with extra indicator columns).
+        price_dtype: np.float64 (default) or np.float32 for open/high/low/close.
+
+    Returns:
+        DataFrame: A new frame in the storage schema (the input is not modified).
+    """
+    out = df.copy(deep=False)
+    if 'ts' in out.columns:
+        out['ts'] = ts_to_epoch_ms(out['ts'])
+    for column in PRICE_COLUMNS:
+        if column in out.columns:
+            out[column] = _to_float(out[column], price_dtype)
+    if 'volume' in out.columns:
+        out['volume'] = _to_float(out['volume'], VOLUME_DTYPE)
+    if 'symbol' in out.columns and not isinstance(out['symbol'].dtype, pd.CategoricalDtype):
+        out['symbol'] = out['symbol'].astype('category')
+    return out
+
+
+def from_storage(df):
+    """
+    Converts a frame read from storage back to the in-memory form: 'ts' as
+    datetime64[ms, UTC]. Files written before the schema existed are handled too.
+
+    Args:
+        df (DataFrame): Frame as read from Parquet.
+
+    Returns:
+        DataFrame: The same frame, 'ts' converted in place.
+    """
+    if 'ts' in df.columns and str(df['ts'].dtype) != TS_DTYPE:
+        df['ts'] = pd.to_datetime(ts_to_epoch_ms(df['ts']), unit='ms', utc=True).dt.as_unit('ms')
+    if 'symbol' in df.columns and not isinstance(df['symbol'].dtype, pd.CategoricalDtype):
+        df['symbol'] = df['symbol'].astype('category')
+    return df
+
+
+def matches_storage(df, price_dtype=np.float64):
+    """True if a frame read from disk is already in the storage schema"""
+    dtypes = df.dtypes
+    if 'ts' in dtypes and dtypes['ts'] != np.int64:
+        return False
+    if any(column in dtypes and dtypes[column] != np.dtype(price_dtype) for column in PRICE_COLUMNS):
+        return False
+    if 'volume' in dtypes and dtypes['volume'] != VOLUME_DTYPE:
+        return False
+    return 'symbol' not in dtypes or isinstance(dtypes['symbol'], pd.CategoricalDtype)
+
+
+def _to_float(series, dtype):
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors='coerce')
+    return series.astype(dtype)
+
+
+def convert_tree(storage_manager, dry_run=False):
+    """
+    Rewrites every Parquet file under the storage tree into the storage schema.
+
+    Files already in the schema are skipped. Each rewrite is atomic and re-catalogued,
+    and keeps the file's original mtime: compaction judges which bars were still
+    forming, and which copy of a bar is newest, by it.
+
+    Args:
+        storage_manager (StorageManager): The storage manager (its price_dtype is used).
+        dry_run (bool): Only report what would be converted.
+
+    Returns:
+        dict: {'converted': n, 'skipped': n, 'bytes_before': n, 'bytes_after': n}
+    """
+    report = {'converted': 0, 'skipped': 0, 'bytes_before': 0, 'bytes_after': 0}
+    for file_path in sorted(storage_manager.base_path.rglob('*.parquet')):
+        parts = file_path.relative_to(storage_manager.base_path).parts
+        if file_path.name.startswith('.') or 'cache' in parts or '_backfill' in parts:
+            continue
+        try:
+            df = pd.read_parquet(file_path)
+        except Exception as e:
+            logger.error(f'Could not read {file_path}: {e}')
+            continue
+        if matches_storage(df, storage_manager.price_dtype):
+            report['skipped'] += 1
+            continue
+
+        stat = file_path.stat()
+        size_before = stat.st_size
+        if dry_run:
+            print(f'{file_path}: {dict(df.dtypes.astype(str))}')
+            report['converted'] += 1
+            continue
+        storage_manager._write_atomic(df, file_path, written_at=stat.st_mtime)
+        report['converted'] += 1
+        report['bytes_before'] += size_before
+        report['bytes_after'] += file_path.stat().st_size
+    return report
+
+
+if __name__ == '__main__':
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from utils.storage_manager import StorageManager
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Rewrite stored Parquet files into the compact storage schema.')
+    parser.add_argument('--base-path', default='storage')
+    parser.add_argument('--float32-prices', action='store_true', help='Store open/high/low/close as float32')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the files that would be rewritten')
+    args = parser.parse_args()
+
+    sm = StorageManager(base_path=args.base_path, price_dtype=np.float32 if args.float32_prices else np.float64)
+    print(convert_tree(sm, dry_run=args.dry_run))
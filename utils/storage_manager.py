@@ -1,27 +1,48 @@
 import os
+import uuid
+import shutil
+import json
+import threading
 from datetime import datetime
 from pathlib import Path
 import logging
+import numpy as np
 import pandas as pd
+from .catalog import StorageCatalog, CATALOG_SUFFIXES, describe_path
+from .bar_store import BarStore, HEADER_FILE
+from .schema import to_storage, from_storage, to_epoch_ms
 
 class StorageManager:
     """
     A class to manage storage of data files, organizing them into a directory.
     """
 
-    def __init__(self, base_path='storage'):
+    def __init__(self, base_path='storage', price_dtype=np.float64):
         """
         Initializes the StorageManager with a base_path
 
         Args:
             base_path (str): The base directory for storing files.
+            price_dtype: Dtype for open/high/low/close in Parquet files, np.float64 or np.float32
+                         (see utils/schema.py for the full storage schema).
         """
 
         self.base_path = Path(base_path)
+        self.price_dtype = price_dtype
         self.base_path.mkdir(parents=True, exist_ok=True)
         self.logger = logging.getLogger(__name__)
 
-    def get_kline_path(self, date_type=None, date=None, symbol=None, timeframe=None):
+        #Guards the watermark file when several threads append at once
+        self._watermark_lock = threading.Lock()
+
+        #Index of every file written through this class, see find_latest / find_files
+        self.catalog = StorageCatalog(self.base_path / 'catalog.sqlite')
+
+        #Open memory-mapped bar stores, see get_bar_store
+        self._bar_stores = {}
+        self._bar_store_lock = threading.Lock()
+
+    def get_kline_path(self, date_type=None, date=None, symbol=None, timeframe=None, create=True):
         #todo - switch this date(str) to be in YYYY-MM-DD format
         #bring in a global list of symbols to parse for - 
         """
@@ -32,6 +53,7 @@ class StorageManager:
             date(str): The date string in MM-DD-YYYY format
             symbol (str): The trading symbol, e.g. 'BTCUSDT'
             timeframe (str): The timeframe, '1', '3', M
+            create (bool): Create the directory, pass False when only reading
 
         Returns:
             Path: the full directory path
@@ -52,14 +74,15 @@ class StorageManager:
         if timeframe:
             path = path / timeframe
 
-        path.mkdir(parents=True, exist_ok=True)
+        if create:
+            path.mkdir(parents=True, exist_ok=True)
         return path
     
 
 
 
 
-    def get_indicator_path(self, date=None, symbol=None, timeframe=None):
+    def get_indicator_path(self, date=None, symbol=None, timeframe=None, create=True):
         """
         Constructs the directory path for Indicator object data
         
@@ -67,6 +90,7 @@ class StorageManager:
             date(str): The date string in 'MM-DD-YYYY' format
             symbol (str): The trading symbol
             timeframe (str): The timeframe
+            create (bool): Create the directory, pass False when only reading
 
         Returns:
             Path: the full directory path
@@ -83,7 +107,8 @@ class StorageManager:
         if timeframe:
             path = path / timeframe
 
-        path.mkdir(parents=True, exist_ok=True)
+        if create:
+            path.mkdir(parents=True, exist_ok=True)
         return path
     
     def save_dataframe(self, df, filename, path):
@@ -98,8 +123,615 @@ class StorageManager:
 
         file_path = path/filename
         df.to_csv(file_path, index=False)
+        self._record(file_path, df)
         self.logger.info(f"Data saved to {file_path}")
+
+    def save_parquet(self, df, filename, path, **parquet_options):
+        """
+        Saves a DataFrame to a Parquet file (written to a temp name, then renamed).
+
+        Args:
+            df (DataFrame): The DataFrame to save.
+            filename (str): The name of the file
+            path (Path): The directory path where the file will be saved
+            **parquet_options: Passed to to_parquet, e.g. compression='zstd',
+                               compression_level=3, row_group_size=100_000
+
+        Returns:
+            Path: The file path
+        """
+        file_path = path / filename
+        self._write_atomic(df, file_path, **parquet_options)
+        self.logger.info(f"Data saved to {file_path}")
+        return file_path
+
+    def _record(self, file_path, df=None, written_at=None):
+        #Catalog entry for a file that was just written
+        kind, symbol, timeframe = describe_path(self.base_path, file_path)
+        self.catalog.record(file_path, kind, symbol=symbol, timeframe=timeframe, df=df, written_at=written_at)
+
+    def find_latest(self, kind, symbol, timeframe, suffix='.parquet'):
+        """
+        Looks up the most recently written file of a kind for a series in the catalog.
+
+        Args:
+            kind (str): 'raw', 'processed', 'indicator' or 'plot'
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+            suffix (str): File extension
+
+        Returns:
+            Path: The file, or None if nothing is catalogued.
+        """
+        row = self.catalog.latest(kind, symbol, timeframe, suffix=suffix)
+        return Path(row['path']) if row else None
+
+    def find_files(self, kind=None, symbol=None, timeframe=None, start=None, end=None, under=None, suffix='.parquet'):
+        """
+        Looks up catalogued files, optionally only those whose bars overlap [start, end).
+
+        Args:
+            kind (str): 'raw', 'processed', 'indicator' or 'plot'
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name
+            start: Range start (anything pd.Timestamp accepts, naive = UTC)
+            end: Range end, exclusive
+            under (Path): Only files below this directory
+            suffix (str): File extension
+
+        Returns:
+            list[Path]: Matching files, newest write first.
+        """
+        rows = self.catalog.files(kind=kind, symbol=symbol, timeframe=timeframe, under=under, suffix=suffix,
+                                  start=to_epoch_ms(start) if start is not None else None,
+                                  end=to_epoch_ms(end) if end is not None else None)
+        return [Path(row['path']) for row in rows]
+
+    def rebuild_catalog(self):
+        """
+        Re-indexes every file under base_path (for trees written before the catalog existed).
+
+        Returns:
+            int: Files catalogued
+        """
+        count = 0
+        for file_path in sorted(self.base_path.rglob('*')):
+            if file_path.suffix not in CATALOG_SUFFIXES or file_path.name.startswith('.'):
+                continue
+            if 'cache' in file_path.relative_to(self.base_path).parts or '_backfill' in file_path.parts:
+                continue
+            df = None
+            if file_path.suffix == '.parquet':
+                try:
+                    df = pd.read_parquet(file_path)
+                except Exception as e:
+                    self.logger.error(f"Could not read {file_path}: {e}")
+            kind, symbol, timeframe = describe_path(self.base_path, file_path)
+            self.catalog.record(file_path, kind, symbol=symbol, timeframe=timeframe, df=df,
+                                written_at=file_path.stat().st_mtime)
+            count += 1
+        self.logger.info(f"Catalogued {count} files under {self.base_path}")
+        return count
     
+    def get_historical_file(self, symbol, timeframe):
+        """
+        Returns the single Parquet file that holds the full history of a series.
+
+        Args:
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+
+        Returns:
+            Path: Kline/Historical/SYMBOL/TF/SYMBOL_TF.parquet
+        """
+        path = self.get_kline_path(date_type='Historical', symbol=symbol, timeframe=timeframe, create=False)
+        return path / f'{symbol}_{timeframe}.parquet'
+
+    def get_historical_parts(self, symbol, timeframe):
+        """
+        Lists every Parquet file that makes up the Historical dataset of a series:
+        the base SYMBOL_TF.parquet plus any part-*.parquet appended since.
+
+        Returns:
+            list[Path]: Files in write order (base first)
+        """
+        base_file = self.get_historical_file(symbol, timeframe)
+        if not base_file.parent.exists():
+            return []
+        parts = sorted(base_file.parent.glob('part-*.parquet'))
+        return ([base_file] if base_file.exists() else []) + parts
+
+    def load_historical(self, symbol, timeframe):
+        """
+        Loads the full Historical dataset for a series.
+
+        Returns:
+            DataFrame: Bars de-duplicated by 'ts' and sorted ascending, or None if nothing is stored.
+        """
+        files = self.get_historical_parts(symbol, timeframe)
+        if not files:
+            return None
+        df = pd.concat([self.read_parquet(f) for f in files], ignore_index=True)
+        return df.drop_duplicates(subset='ts', keep='last').sort_values('ts').reset_index(drop=True)
+
+    def read_parquet(self, file_path, columns=None):
+        """
+        Reads a Parquet file written by this class, back in memory form ('ts' as UTC datetimes).
+
+        Args:
+            file_path (Path): The file.
+            columns (list[str]): Columns to load, None for all.
+
+        Returns:
+            DataFrame: The file's data.
+        """
+        return from_storage(pd.read_parquet(file_path, columns=columns))
+
+    def _write_atomic(self, df, file_path, written_at=None, **parquet_options):
+        #Every Parquet file is written in the compact storage schema (int64 ms ts, float32 volume, ...)
+        df = to_storage(df, self.price_dtype)
+        #Write to a temp name then rename, a crash never leaves a half-written file behind
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = file_path.with_name(f'.{file_path.name}.{uuid.uuid4().hex}.tmp')
+        df.to_parquet(tmp_path, index=False, **parquet_options)
+        if written_at is not None:
+            #Rewrites of existing data keep their original write time (compaction and find_latest rely on it)
+            os.utime(tmp_path, (written_at, written_at))
+        os.replace(tmp_path, file_path)
+        self._record(file_path, df, written_at=written_at)
+
+    def merge_historical(self, df, symbol, timeframe, **parquet_options):
+        """
+        Merges new bars into the Historical file for a series.
+
+        Used when bars can land anywhere in the range (backfills). Everything stored
+        is rewritten into the base file: bars are de-duplicated by 'ts' (newest copy
+        wins), sorted ascending, and the appended part files are folded in.
+
+        Args:
+            df (DataFrame): Bars to merge, must have a 'ts' column
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+            **parquet_options: Passed to to_parquet, e.g. row_group_size=1_000_000
+
+        Returns:
+            Path: The Historical file path
+        """
+        file_path = self.get_historical_file(symbol, timeframe)
+        parts = self.get_historical_parts(symbol, timeframe)
+
+        if parts:
+            existing = pd.concat([self.read_parquet(f) for f in parts], ignore_index=True)
+            df = pd.concat([existing, df], ignore_index=True)
+
+        df = df.drop_duplicates(subset='ts', keep='last').sort_values('ts').reset_index(drop=True)
+
+        self._write_atomic(df, file_path, **parquet_options)
+        for part in parts:
+            if part != file_path:
+                part.unlink()
+                self.catalog.remove(part)
+
+        if not df.empty:
+            self.set_watermark(symbol, timeframe, df['ts'].iloc[-1])
+        if self.has_bar_store(symbol, timeframe):
+            self.sync_bar_store(symbol, timeframe, rebuild=True)
+        self.logger.info(f"Merged {len(df)} bars into {file_path}")
+        return file_path
+
+    def append_historical(self, df, symbol, timeframe):
+        """
+        Appends bars newer than the series watermark to the Historical dataset.
+
+        Only the new bars are written (as one part-*.parquet file), so the cost
+        grows with new data rather than with stored history. Bars at or before
+        the watermark are dropped, which makes re-running the same append a no-op.
+
+        Args:
+            df (DataFrame): Closed bars, must have a 'ts' column
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+
+        Returns:
+            int: Number of bars appended
+        """
+        watermark = self.get_watermark(symbol, timeframe)
+        if watermark is not None:
+            df = df[df['ts'] > watermark]
+        df = df.drop_duplicates(subset='ts', keep='last').sort_values('ts')
+
+        if df.empty:
+            self.logger.info(f"No new bars for {symbol} {timeframe}")
+            return 0
+
+        last_ts = df['ts'].iloc[-1]
+        part_path = self.get_historical_file(symbol, timeframe).parent / f'part-{to_epoch_ms(last_ts)}.parquet'
+        self._write_atomic(df, part_path)
+        self.set_watermark(symbol, timeframe, last_ts)
+        self.logger.info(f"Appended {len(df)} bars to {part_path}")
+
+        #Keep the memory-mapped copy current once a series has one
+        if self.has_bar_store(symbol, timeframe):
+            self.get_bar_store(symbol, timeframe).append(df)
+        return len(df)
+
+    def get_bar_store_path(self, symbol, timeframe):
+        """
+        Returns the folder of the memory-mapped bar store for a series.
+
+        Returns:
+            Path: BarStore/SYMBOL/TF
+        """
+        return self.base_path / 'BarStore' / symbol / timeframe
+
+    def has_bar_store(self, symbol, timeframe):
+        return (self.get_bar_store_path(symbol, timeframe) / HEADER_FILE).exists()
+
+    def get_bar_store(self, symbol, timeframe):
+        """
+        Opens (or creates) the memory-mapped bar store for a series.
+
+        Stores are cached per StorageManager so repeated reads reuse the same maps.
+
+        Args:
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+
+        Returns:
+            BarStore: The store
+        """
+        key = (symbol, timeframe)
+        with self._bar_store_lock:
+            store = self._bar_stores.get(key)
+            if store is None:
+                store = BarStore(self.get_bar_store_path(symbol, timeframe), symbol=symbol, timeframe=timeframe)
+                self._bar_stores[key] = store
+        return store
+
+    def sync_bar_store(self, symbol, timeframe, rebuild=False):
+        """
+        Appends Historical bars newer than the bar store's last bar to the store.
+
+        Args:
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+            rebuild (bool): Drop the store and rewrite it from all of Historical, needed
+                            when bars were merged in before the store's last bar (backfills).
+                            Processes that already mapped the old files keep reading them.
+
+        Returns:
+            int: Number of bars appended
+        """
+        if rebuild:
+            with self._bar_store_lock:
+                self._bar_stores.pop((symbol, timeframe), None)
+                shutil.rmtree(self.get_bar_store_path(symbol, timeframe), ignore_errors=True)
+        store = self.get_bar_store(symbol, timeframe)
+        start = pd.Timestamp(store.last_ts + 1, unit='ms', tz='UTC') if store.last_ts is not None else None
+        return store.append(self.load_bars(symbol, timeframe, start=start, columns=['open', 'high', 'low', 'close', 'volume']))
+
+    def _watermark_file(self):
+        return self.base_path / 'Kline' / 'Historical' / 'watermarks.json'
+
+    def _read_watermarks(self):
+        file_path = self._watermark_file()
+        if not file_path.exists():
+            return {}
+        with open(file_path) as f:
+            return json.load(f)
+
+    def get_watermark(self, symbol, timeframe):
+        """
+        Returns the 'ts' of the newest bar stored for a series.
+
+        Falls back to scanning the Historical files if the series has no
+        recorded watermark yet (e.g. history written before watermarks existed).
+
+        Returns:
+            Timestamp: UTC timestamp of the last stored bar, or None if nothing is stored.
+        """
+        with self._watermark_lock:
+            watermarks = self._read_watermarks()
+        key = f'{symbol}/{timeframe}'
+        if key in watermarks:
+            return pd.Timestamp(watermarks[key], unit='ms', tz='UTC')
+
+        files = self.get_historical_parts(symbol, timeframe)
+        if not files:
+            return None
+        last_ts = max(self.read_parquet(f, columns=['ts'])['ts'].max() for f in files)
+        self.set_watermark(symbol, timeframe, last_ts)
+        return last_ts
+
+    def set_watermark(self, symbol, timeframe, ts):
+        """
+        Records the 'ts' of the newest bar stored for a series.
+
+        Args:
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name
+            ts (Timestamp): The last stored bar time
+        """
+        with self._watermark_lock:
+            watermarks = self._read_watermarks()
+            watermarks[f'{symbol}/{timeframe}'] = to_epoch_ms(ts)
+            self._write_watermarks(watermarks)
+
+    def clear_watermark(self, symbol, timeframe):
+        """
+        Forgets the watermark of a series, e.g. once its Historical files are gone.
+
+        Args:
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name
+        """
+        with self._watermark_lock:
+            watermarks = self._read_watermarks()
+            if watermarks.pop(f'{symbol}/{timeframe}', None) is not None:
+                self._write_watermarks(watermarks)
+
+    def _write_watermarks(self, watermarks):
+        #Caller holds _watermark_lock
+        file_path = self._watermark_file()
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = file_path.with_name(f'.{file_path.name}.{uuid.uuid4().hex}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(watermarks, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, file_path)
+
+    def get_dataset_path(self, symbol=None, timeframe=None, date=None):
+        """
+        Constructs the directory path in the Hive-partitioned Kline dataset.
+
+        Layout: Kline/Dataset/symbol=SYMBOL/timeframe=TF/date=YYYY-MM-DD/
+        Each level is optional from the right, e.g. only symbol gives the symbol folder.
+
+        Args:
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+            date (str): The bar date in 'YYYY-MM-DD' format (UTC)
+
+        Returns:
+            Path: the directory path (not created)
+        """
+        path = self.base_path / 'Kline' / 'Dataset'
+        if symbol:
+            path = path / f'symbol={symbol}'
+            if timeframe:
+                path = path / f'timeframe={timeframe}'
+                if date:
+                    path = path / f'date={date}'
+        return path
+
+    def write_partitioned(self, df, symbol, timeframe):
+        """
+        Writes bars into the partitioned dataset, one file per UTC bar date.
+
+        Bars are merged with whatever the date partition already holds, de-duplicated
+        by 'ts' and sorted, so rewriting a day is idempotent and only touches that day.
+        The symbol lives in the partition path, so it is not stored in the file.
+
+        Args:
+            df (DataFrame): Bars with a UTC 'ts' column
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+
+        Returns:
+            list[Path]: The partition files written
+        """
+        df = df.drop(columns=['symbol'], errors='ignore')
+        ts = pd.to_datetime(df['ts'], utc=True)
+        written = []
+
+        for date, day in df.groupby(ts.dt.strftime('%Y-%m-%d')):
+            path = self.get_dataset_path(symbol, timeframe, date)
+            path.mkdir(parents=True, exist_ok=True)
+            file_path = path / 'data.parquet'
+
+            if file_path.exists():
+                day = pd.concat([self.read_parquet(file_path), day], ignore_index=True)
+            day = day.drop_duplicates(subset='ts', keep='last').sort_values('ts').reset_index(drop=True)
+
+            self._write_atomic(day, file_path)
+            written.append(file_path)
+
+        self.logger.info(f"Wrote {len(df)} bars for {symbol} {timeframe} into {len(written)} date partitions")
+        return written
+
+    def read_dataset(self, symbol, timeframe, start=None, end=None, columns=None):
+        """
+        Reads a time range of one series from the partitioned dataset.
+
+        Only the date partitions overlapping [start, end) are opened (pruned from the
+        directory names), the 'ts' filter is pushed down to the Parquet row groups,
+        and only the requested columns are decoded.
+
+        Args:
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+            start: Range start (anything pd.Timestamp accepts, naive = UTC), None for open
+            end: Range end, exclusive, None for open
+            columns (list[str]): Columns to load ('ts' is always included)
+
+        Returns:
+            DataFrame: Bars sorted by ascending 'ts' (empty if nothing matches)
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        start = _to_utc(start) if start is not None else None
+        end = _to_utc(end) if end is not None else None
+
+        series_path = self.get_dataset_path(symbol, timeframe)
+        files = []
+        if series_path.exists():
+            for date_dir in sorted(series_path.iterdir()):
+                if not date_dir.name.startswith('date='):
+                    continue
+                date = date_dir.name[len('date='):]
+                if start is not None and date < start.strftime('%Y-%m-%d'):
+                    continue
+                if end is not None and date > end.strftime('%Y-%m-%d'):
+                    continue
+                files.extend(str(f) for f in sorted(date_dir.glob('*.parquet')))
+
+        if columns is not None:
+            columns = list(dict.fromkeys(['ts'] + list(columns)))
+
+        if not files:
+            return pd.DataFrame(columns=columns or [])
+
+        partitioning = ds.partitioning(
+            pa.schema([('symbol', pa.string()), ('timeframe', pa.string()), ('date', pa.string())]),
+            flavor='hive'
+        )
+        dataset = ds.dataset(files, format='parquet', partitioning=partitioning,
+                             partition_base_dir=str(self.get_dataset_path()))
+
+        ts_type = dataset.schema.field('ts').type
+        condition = None
+        if start is not None:
+            condition = ds.field('ts') >= _ts_scalar(start, ts_type)
+        if end is not None:
+            upper = ds.field('ts') < _ts_scalar(end, ts_type)
+            condition = upper if condition is None else condition & upper
+
+        if columns is None:
+            #'date' only exists for pruning, the bars carry their own ts
+            columns = [name for name in dataset.schema.names if name != 'date']
+
+        table = dataset.to_table(columns=columns, filter=condition)
+        df = from_storage(table.to_pandas())
+        if 'symbol' in df.columns:
+            df['symbol'] = df['symbol'].astype('category')
+        return df.sort_values('ts').reset_index(drop=True)
+
+    def resolve_bar_files(self, symbol, timeframe, start=None, end=None):
+        """
+        Works out which stored Kline files cover a time range, from the catalog.
+
+        One layout is used per series, in order of preference: the Historical
+        dataset, then the partitioned Dataset, then the daily Date snapshots.
+        Historical files written before the catalog existed are still found.
+
+        Args:
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+            start: Range start (anything pd.Timestamp accepts, naive = UTC), None for open
+            end: Range end, exclusive, None for open
+
+        Returns:
+            list[dict]: Catalog rows ('path', 'ts_min', 'ts_max', 'written_at') in write order
+        """
+        start_ms = to_epoch_ms(start) if start is not None else None
+        end_ms = to_epoch_ms(end) if end is not None else None
+        rows = self.catalog.files(kind='raw', symbol=symbol, timeframe=timeframe, suffix='.parquet',
+                                  start=start_ms, end=end_ms)
+
+        by_layout = {'Historical': [], 'Dataset': [], 'Date': []}
+        for row in rows:
+            try:
+                layout = Path(row['path']).relative_to(self.base_path).parts[1]
+            except (ValueError, IndexError):
+                continue
+            if layout in by_layout:
+                by_layout[layout].append(row)
+
+        if not by_layout['Historical']:
+            catalogued = {row['path'] for row in self.catalog.files(kind='raw', symbol=symbol, timeframe=timeframe)}
+            by_layout['Historical'] = [
+                {'path': str(f), 'ts_min': None, 'ts_max': None, 'written_at': f.stat().st_mtime}
+                for f in self.get_historical_parts(symbol, timeframe) if str(f) not in catalogued
+            ]
+
+        for layout in ('Historical', 'Dataset', 'Date'):
+            if by_layout[layout]:
+                return sorted(by_layout[layout], key=lambda row: row['written_at'])
+        return []
+
+    def load_bars(self, symbol, timeframe, start=None, end=None, columns=None, iterator=False, batch_size=100_000):
+        """
+        Loads the bars of a series that fall in [start, end).
+
+        Only the files covering the range are opened (see resolve_bar_files), the
+        'ts' filter is pushed down so Parquet row groups outside the range are
+        skipped, and only the requested columns are decoded. The pieces are joined
+        as Arrow chunks and converted to pandas once.
+
+        Args:
+            symbol (str): The trading symbol
+            timeframe (str): The timeframe folder name, e.g. '15m'
+            start: Range start (anything pd.Timestamp accepts, naive = UTC), None for open
+            end: Range end, exclusive, None for open
+            columns (list[str]): Columns to load ('ts' is always included), None for all
+            iterator (bool): Return a generator of DataFrame chunks instead of one frame,
+                             for ranges that don't fit in memory.
+            batch_size (int): Max rows per chunk in iterator mode.
+
+        Returns:
+            DataFrame: Typed bars ('ts' datetime64[ms, UTC], 'symbol' category) sorted by
+                       ascending 'ts', de-duplicated by 'ts' (newest write wins).
+                       With iterator=True, a generator of such frames in ascending order.
+        """
+        files = self.resolve_bar_files(symbol, timeframe, start, end)
+        if columns is not None:
+            columns = list(dict.fromkeys(['ts'] + list(columns)))
+
+        if iterator:
+            return self._iter_bars(files, symbol, start, end, columns, batch_size)
+
+        tables = [self._scan_bar_file(row['path'], start, end, columns).to_table() for row in files]
+        tables = [table for table in tables if table.num_rows]
+        if not tables:
+            return _typed_bars(pd.DataFrame({'ts': pd.Series(dtype='datetime64[ms, UTC]')}), symbol, columns)
+
+        import pyarrow as pa
+        df = pa.concat_tables(tables, promote_options='permissive').to_pandas()
+        df = _typed_bars(df, symbol, columns)
+        if len(tables) > 1 and _overlapping(files):
+            df = df.drop_duplicates(subset='ts', keep='last')
+        if not df['ts'].is_monotonic_increasing:
+            df = df.sort_values('ts', kind='stable')
+        return df.reset_index(drop=True)
+
+    def _iter_bars(self, files, symbol, start, end, columns, batch_size):
+        #Files in ts order, rows at or before the last yielded bar are dropped
+        #so overlapping snapshots never yield the same bar twice
+        files = sorted(files, key=lambda row: (row['ts_min'] is None, row['ts_min'] or 0, row['written_at']))
+        last_ts = None
+        for row in files:
+            for batch in self._scan_bar_file(row['path'], start, end, columns, batch_size).to_batches():
+                if not batch.num_rows:
+                    continue
+                df = _typed_bars(batch.to_pandas(), symbol, columns)
+                if not df['ts'].is_monotonic_increasing:
+                    df = df.sort_values('ts', kind='stable')
+                if last_ts is not None:
+                    df = df[df['ts'] > last_ts]
+                if df.empty:
+                    continue
+                last_ts = df['ts'].iloc[-1]
+                yield df.reset_index(drop=True)
+
+    def _scan_bar_file(self, file_path, start, end, columns, batch_size=131_072):
+        #Arrow scanner over one file with the ts range pushed down to the row groups
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(str(file_path), format='parquet')
+        ts_type = dataset.schema.field('ts').type
+        condition = None
+        for bound, op in ((start, 'ge'), (end, 'lt')):
+            if bound is None:
+                continue
+            value = _ts_scalar(bound, ts_type)
+            term = ds.field('ts') >= value if op == 'ge' else ds.field('ts') < value
+            condition = term if condition is None else condition & term
+
+        if columns is not None:
+            columns = [name for name in columns if name in dataset.schema.names]
+        return dataset.scanner(columns=columns, filter=condition, batch_size=batch_size)
+
     def save_figure(self, fig, filename, path):
         """
         Saves a Matplotlib figure.
@@ -111,6 +743,7 @@ class StorageManager:
         """
         file_path = path / filename
         fig.savefig(file_path)
+        self._record(file_path)
         self.logger.info(f"Figure saved to {file_path}")
 
 
@@ -134,7 +767,7 @@ class StorageManager:
             self.logger.error(f"File not found: {file_path}")
             return None
 
-    def get_processed_path(self, date=None, symbol=None, timeframe=None):
+    def get_processed_path(self, date=None, symbol=None, timeframe=None, create=True):
         """
         Constructs the directory path for processed data
         
@@ -142,6 +775,7 @@ class StorageManager:
             date (str): The date string in 'MM-DD-YYYY' format
             symbol (str): the trading symbol
             timeframe (str): The TimeFrame
+            create (bool): Create the directory, pass False when only reading
         
         Returns:
             Path: The full directory
@@ -160,5 +794,36 @@ class StorageManager:
         if timeframe:
             path = path / timeframe
 
-        path.mkdir(parents=True, exist_ok=True)
-        return path
\ No newline at end of file
+        if create:
+            path.mkdir(parents=True, exist_ok=True)
+        return path
+
+
+def _to_utc(value):
+    """Converts anything pd.Timestamp accepts to a UTC Timestamp (naive = UTC)"""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+def _ts_scalar(value, ts_type):
+    """Arrow scalar for comparing a 'ts' column (epoch-ms int64 or timestamp) with a bound"""
+    import pyarrow as pa
+    if pa.types.is_integer(ts_type):
+        return pa.scalar(to_epoch_ms(value), type=ts_type)
+    return pa.scalar(_to_utc(value).to_pydatetime(), type=ts_type)
+
+
+def _typed_bars(df, symbol, columns=None):
+    """Normalises loaded bars: UTC ms 'ts', categorical 'symbol' (added if the file has none)"""
+    df = from_storage(df)
+    if (columns is None or 'symbol' in columns) and 'symbol' not in df.columns:
+        df.insert(0, 'symbol', pd.Categorical([symbol] * len(df)))
+    return df
+
+
+def _overlapping(files):
+    """True if the catalogued ts ranges of the files overlap (or are unknown)"""
+    ranges = sorted((row['ts_min'], row['ts_max']) for row in files if row['ts_min'] is not None)
+    if len(ranges) < len(files):
+        return True
+    return any(lo <= prev_hi for (_, prev_hi), (lo, _) in zip(ranges, ranges[1:]))